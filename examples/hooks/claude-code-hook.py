@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Report Claude Code tool events to Switchboard through the local sidecar.
+
+Configure as a Claude Code hook in .claude/settings.local.json (``-S`` skips
+site-packages, which the hook does not use, and cuts its start-up):
+
+    {
+      "hooks": {
+        "PreToolUse":  [{ "type": "command", "command": "python3 -S /path/to/claude-code-hook.py" }],
+        "PostToolUse": [{ "type": "command", "command": "python3 -S /path/to/claude-code-hook.py" }],
+        "Stop":        [{ "type": "command", "command": "python3 -S /path/to/claude-code-hook.py" }]
+      }
+    }
+
+The hook writes Claude Code's payload as one line to the sidecar's Unix
+socket (``EVENT_SOCKET``) and exits without waiting for a reply. The
+sidecar turns it into a Switchboard event, batches it and sends it upstream.
+Run one sidecar per machine, for example:
+
+    SWITCHBOARD_URL=http://localhost:59237 AGENT_ID=claude-code \\
+    SIDECAR_TOKEN=$(cat .switchboard-token) \\
+    EVENT_SOCKET=${XDG_RUNTIME_DIR:-/tmp}/switchboard-sidecar.sock EVENT_LISTEN_PORT=0 \\
+    POLICY_PATH=~/.cache/switchboard/policy.json SPOOL_DIR=~/.cache/switchboard/spool \\
+    python3 sidecar/switchboard-sidecar.py
+
+If no sidecar is listening, the payload is handed to claude-code-hook.sh in
+the background, which posts it to Switchboard directly.
+
+The hook imports nothing beyond what the interpreter loads at start-up
+(importing ``json`` and ``socket`` would take longer than everything else
+the hook does), so it never parses the payload.
+
+Environment variables:
+    SWITCHBOARD_SOCKET   — Sidecar socket (default: $XDG_RUNTIME_DIR/switchboard-sidecar.sock,
+                           or /tmp/switchboard-sidecar.sock)
+    SWITCHBOARD_AGENT_ID — Agent identifier, for a host-daemon sidecar (default: claude-code)
+    The fallback also reads those described in claude-code-hook.sh.
+"""
+
+import _socket
+import os
+import sys
+
+AGENT_ID = os.getenv("SWITCHBOARD_AGENT_ID", "claude-code")
+SOCKET_PATH = os.getenv("SWITCHBOARD_SOCKET") or os.path.join(
+    os.getenv("XDG_RUNTIME_DIR") or "/tmp", "switchboard-sidecar.sock"
+)
+
+
+def event_line(payload: bytes) -> bytes | None:
+    """``payload`` as one NDJSON line naming the agent; None if not a hook payload."""
+    body = payload.strip()
+    if not body.startswith(b"{") or not body.endswith(b"}") or b'"hook_event_name"' not in body:
+        return None
+    # JSON strings cannot hold raw line breaks, so these are only whitespace
+    body = body.replace(b"\r", b" ").replace(b"\n", b" ")
+    agent = AGENT_ID.replace("\\", "\\\\").replace('"', '\\"').encode()
+    # Appended, so it wins over any agent_id key already in the payload
+    separator = b"," if body[1:-1].strip() else b""
+    return body[:-1] + separator + b'"agent_id":"' + agent + b'"}\n'
+
+
+def send_to_sidecar(line: bytes) -> bool:
+    """Write ``line`` to the sidecar socket; False if no sidecar is listening.
+
+    The reply is not read: the sidecar queues the event whether or not the
+    hook is still there to hear about it.
+    """
+    sock = _socket.socket(_socket.AF_UNIX, _socket.SOCK_STREAM)
+    sock.settimeout(0.5)
+    try:
+        sock.connect(SOCKET_PATH)
+        sock.sendall(line)
+    except OSError:
+        return False
+    finally:
+        sock.close()
+    return True
+
+
+def hand_to_shell_hook(payload: bytes) -> None:
+    """Run claude-code-hook.sh on ``payload`` in a detached child; returns at once."""
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "claude-code-hook.sh")
+    if not os.path.exists(script) or os.fork():
+        return
+    import subprocess
+
+    try:
+        # Claude Code waits for the hook's output to close, so let go of it
+        os.setsid()
+        devnull = os.open(os.devnull, os.O_RDWR)
+        os.dup2(devnull, 1)
+        os.dup2(devnull, 2)
+        subprocess.run(["bash", script], input=payload, timeout=30, check=False)
+    except (OSError, subprocess.SubprocessError):
+        pass  # never surface reporting failures to the tool call
+    finally:
+        os._exit(0)
+
+
+def main() -> None:
+    payload = sys.stdin.buffer.read()
+    line = event_line(payload)
+    if line is not None and not send_to_sidecar(line):
+        hand_to_shell_hook(payload)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,11 @@
 #!/usr/bin/env bash
 # claude-code-hook.sh — Report Claude Code tool events to Switchboard
 #
+# Posts each event straight to Switchboard, forking jq and curl every time.
+# With a sidecar on the machine, use claude-code-hook.py instead: it hands
+# the event to the sidecar over a Unix socket, and falls back to this script
+# when no sidecar is listening.
+#
 # Configure as a Claude Code hook in .claude/settings.local.json:
 #   {
 #     "hooks": {
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""Measure bytes on the wire with and without response compression.
+
+Seeds a throwaway data directory (50 agents, 10k events, 10k telemetry
+entries), then requests the dashboard's cold-load set (page, stylesheet,
+first snapshot) and the large query endpoints in-process with each
+``Accept-Encoding``. Time to render is estimated as server time plus
+transfer time over a slow link (``--mbps``, default a 2 Mbit/s VPN); the
+dashboard renders once its page, stylesheet and first snapshot have arrived.
+
+Usage:
+    python3 scripts/bench-compression.py [--mbps 2] [--rtt-ms 80]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from switchboard import compression
+from switchboard.app import create_app
+from switchboard.v1 import services
+from switchboard.v1.models import (
+    AgentEvent,
+    AgentPolicy,
+    AgentRecord,
+    AgentStore,
+    AgentTelemetry,
+    EventStore,
+    TelemetryStore,
+)
+
+_DASHBOARD_LOAD = (
+    "/dashboard",
+    "/docs/shared.css",
+    "/api/v1/fleet/snapshot?events=25&telemetry=0",
+)
+_QUERIES = (
+    "/api/v1/events?limit=1000",
+    "/api/v1/fleet/telemetry?limit=500",
+    "/api/v1/fleet/status",
+)
+
+
+def _seed(data_dir: Path) -> None:
+    services._DATA_DIR = data_dir
+    services._AGENTS_FILE = data_dir / "agents.json"
+    services._EVENTS_FILE = data_dir / "events.json"
+    services._TELEMETRY_FILE = data_dir / "telemetry.json"
+
+    agents = AgentStore()
+    for i in range(50):
+        agent_id = f"agent-{i}"
+        agents.agents[agent_id] = AgentRecord(
+            agent_id=agent_id,
+            display_name=f"Agent {i}",
+            policy=AgentPolicy(agent_id=agent_id),
+            token="-",
+        )
+    services._save_agents(agents)
+    services._save_events(
+        EventStore(
+            events=[
+                AgentEvent(
+                    agent_id=f"agent-{i % 50}",
+                    action=("file_read", "api_call", "heartbeat")[i % 3],
+                    target=f"/workspace/src/module_{i % 200}.py",
+                    duration_ms=i % 900,
+                )
+                for i in range(10_000)
+            ]
+        )
+    )
+    services._save_telemetry(
+        TelemetryStore(
+            telemetry=[
+                AgentTelemetry(
+                    agent_id=f"agent-{i % 50}",
+                    network_rtt_ms=20.0 + i % 90,
+                    network_jitter_ms=1.0 + i % 12,
+                    observed_provider="anthropic",
+                )
+                for i in range(10_000)
+            ]
+        )
+    )
+
+
+def _fetch(client: TestClient, path: str, coding: str) -> tuple[int, float]:
+    """Wire bytes and best-of-3 server time (ms) for ``path``."""
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        resp = client.get(path, headers={"Accept-Encoding": coding})
+        best = min(best, time.perf_counter() - start)
+    return resp.num_bytes_downloaded, best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mbps", type=float, default=2.0)
+    parser.add_argument("--rtt-ms", type=float, default=80.0)
+    args = parser.parse_args()
+    bytes_per_ms = args.mbps * 1_000_000 / 8 / 1000
+
+    codings = ["identity", "gzip"]
+    if "br" in compression.available_encodings():
+        codings.append("br")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        _seed(Path(tmp))
+        client = TestClient(create_app())
+
+        print(f"link: {args.mbps:g} Mbit/s, {args.rtt_ms:g} ms RTT")
+        print(f"{'request':<46}" + "".join(f"{c:>12}" for c in codings))
+        totals = dict.fromkeys(codings, 0.0)
+        for path in _DASHBOARD_LOAD + _QUERIES:
+            row = []
+            for coding in codings:
+                size, server_ms = _fetch(client, path, coding)
+                row.append(f"{size / 1024:>10.1f}KB")
+                if path in _DASHBOARD_LOAD:
+                    totals[coding] += server_ms + size / bytes_per_ms
+            print(f"{path:<46}" + "".join(row))
+
+        # Transfer times summed (one slow link), plus a round trip for the page
+        # and one for the stylesheet and snapshot it requests
+        print(
+            f"{'dashboard time to render (est.)':<46}"
+            + "".join(f"{totals[c] + 2 * args.rtt_ms:>10.0f}ms" for c in codings)
+        )
+
+
+if __name__ == "__main__":
+    main()
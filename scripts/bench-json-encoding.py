@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""Benchmark response encoding for the event log and telemetry timeline.
+
+Compares FastAPI's default path (``model_dump`` -> ``jsonable_encoder`` ->
+``JSONResponse``) with the fast path used by ``GET /api/v1/events`` and
+``GET /api/v1/fleet/telemetry``. Runs in-process against synthetic rows; no
+server or data directory needed.
+
+Usage:
+    python3 scripts/bench-json-encoding.py [--rows 1000 10000] [--repeat 5]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from switchboard.v1 import encoding, services
+from switchboard.v1.models import (
+    AgentEvent,
+    AgentPolicy,
+    AgentRecord,
+    AgentStore,
+    AgentTelemetry,
+)
+
+
+def _events(n: int) -> list[AgentEvent]:
+    return [
+        AgentEvent(
+            agent_id=f"agent-{i % 50}",
+            action=("file_read", "api_call", "heartbeat")[i % 3],
+            target=f"/workspace/src/module_{i % 200}.py",
+            detail="read 4.2 KiB" if i % 2 else None,
+            duration_ms=i % 900,
+        )
+        for i in range(n)
+    ]
+
+
+def _telemetry_report(n: int) -> dict:
+    agents = AgentStore()
+    for i in range(50):
+        agent_id = f"agent-{i}"
+        agents.agents[agent_id] = AgentRecord(
+            agent_id=agent_id,
+            display_name=agent_id,
+            policy=AgentPolicy(agent_id=agent_id),
+            token="-",
+        )
+    entries = [
+        AgentTelemetry(
+            agent_id=f"agent-{i % 50}",
+            network_rtt_ms=20.0 + i % 90,
+            network_jitter_ms=1.0 + i % 12,
+            observed_provider="anthropic",
+            observed_model="claude-3",
+            observed_region="us-east-1",
+        )
+        for i in range(n)
+    ]
+    return services._telemetry_report(entries, agents, None)
+
+
+def _time(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"orjson: {'yes' if encoding.available() else 'no (stdlib json)'}")
+    print(f"{'payload':<12}{'rows':>8}{'before ms':>12}{'after ms':>11}{'speedup':>10}")
+    for n in args.rows:
+        events = _events(n)
+
+        # Defaults bind this round's rows, so the closures stay valid if deferred
+        def events_before(events=events):
+            payload = {
+                "ok": True,
+                "count": len(events),
+                "events": [e.model_dump() for e in events],
+            }
+            return JSONResponse(jsonable_encoder(payload)).body
+
+        def events_after(events=events):
+            return encoding.envelope(
+                {"ok": True, "count": len(events)},
+                "events",
+                services._EVENT_LIST.dump_json(events),
+            )
+
+        report = _telemetry_report(n)
+
+        def telemetry_before(report=report):
+            return JSONResponse(jsonable_encoder(report)).body
+
+        def telemetry_after(report=report):
+            return encoding.dumps(report)
+
+        for name, before, after in (
+            ("events", events_before, events_after),
+            ("telemetry", telemetry_before, telemetry_after),
+        ):
+            b = _time(before, args.repeat)
+            a = _time(after, args.repeat)
+            print(f"{name:<12}{n:>8}{b:>12.1f}{a:>11.1f}{b / a:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""Drive a steady event rate through a running sidecar and report how it copes.
+
+Sends ``--rate`` events per second for ``--seconds`` from ``--concurrency``
+client threads, each event on its own connection as a typical agent hook
+does. Reports achieved rate, submit latency percentiles and the status
+mix (202 queued, 503 back-pressure, errors). With ``--switchboard`` it then
+waits for the sidecar to drain and counts the events that reached the audit
+log.
+
+Usage:
+    python3 scripts/load-test-sidecar.py [--sidecar http://127.0.0.1:9100]
+        [--rate 1000] [--seconds 10] [--concurrency 16]
+        [--switchboard http://localhost:59237 --agent-id my-agent]
+"""
+
+import argparse
+import http.client
+import json
+import threading
+import time
+import uuid
+from collections import Counter
+from urllib.parse import urlsplit
+from urllib.request import urlopen
+
+
+def _worker(
+    host: str,
+    port: int,
+    run_id: str,
+    start: float,
+    interval: float,
+    offset: int,
+    stride: int,
+    count: int,
+    latencies: list[float],
+    statuses: Counter,
+    lock: threading.Lock,
+) -> None:
+    local_latencies = []
+    local_statuses: Counter = Counter()
+    for i in range(offset, count, stride):
+        # Open loop: each event has a fixed send time, so a slow response
+        # shows up as latency rather than as a lower offered rate.
+        delay = start + i * interval - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        body = json.dumps({
+            "action": "load_test",
+            "target": f"{run_id}/{i}",
+            "detail": "scripts/load-test-sidecar.py",
+        })
+        sent = time.perf_counter()
+        try:
+            conn = http.client.HTTPConnection(host, port, timeout=10)
+            conn.request("POST", "/events", body, {"Content-Type": "application/json"})
+            resp = conn.getresponse()
+            resp.read()
+            conn.close()
+            local_statuses[resp.status] += 1
+        except OSError as e:
+            local_statuses[type(e).__name__] += 1
+            continue
+        local_latencies.append((time.perf_counter() - sent) * 1000)
+    with lock:
+        latencies.extend(local_latencies)
+        statuses.update(local_statuses)
+
+
+def _delivered(switchboard: str, agent_id: str, run_id: str) -> int:
+    url = f"{switchboard}/api/v1/events?agent_id={agent_id}&action=load_test&limit=1000"
+    with urlopen(url, timeout=10) as resp:
+        events = json.load(resp)["events"]
+    return sum(1 for e in events if e["target"].startswith(run_id))
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * pct))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sidecar", default="http://127.0.0.1:9100")
+    parser.add_argument("--rate", type=int, default=1000, help="events per second")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--switchboard", help="also count delivered events here")
+    parser.add_argument("--agent-id", help="sidecar's agent, with --switchboard")
+    args = parser.parse_args()
+
+    parts = urlsplit(args.sidecar)
+    count = int(args.rate * args.seconds)
+    run_id = uuid.uuid4().hex[:8]
+    latencies: list[float] = []
+    statuses: Counter = Counter()
+    lock = threading.Lock()
+
+    start = time.perf_counter() + 0.1
+    threads = [
+        threading.Thread(
+            target=_worker,
+            args=(
+                parts.hostname, parts.port or 80, run_id, start, 1.0 / args.rate,
+                i, args.concurrency, count, latencies, statuses, lock,
+            ),
+        )
+        for i in range(args.concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print(f"offered   {args.rate}/s for {args.seconds:g}s ({count} events)")
+    print(f"achieved  {count / elapsed:.0f}/s")
+    print("statuses  " + ", ".join(f"{k}: {v}" for k, v in sorted(statuses.items(), key=str)))
+    if latencies:
+        print(
+            f"latency   p50 {_percentile(latencies, 0.50):.2f} ms  "
+            f"p99 {_percentile(latencies, 0.99):.2f} ms  max {latencies[-1]:.2f} ms"
+        )
+
+    if args.switchboard and args.agent_id:
+        # The audit query returns at most 1000 rows; count only while in range
+        deadline = time.monotonic() + 30
+        accepted = statuses.get(202, 0)
+        delivered = 0
+        while time.monotonic() < deadline:
+            delivered = _delivered(args.switchboard, args.agent_id, run_id)
+            if delivered >= min(accepted, 1000):
+                break
+            time.sleep(0.5)
+        print(f"delivered {delivered} of the last {min(accepted, 1000)} accepted events")
+
+
+if __name__ == "__main__":
+    main()
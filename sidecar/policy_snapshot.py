@@ -0,0 +1,91 @@
+"""Read the policy snapshot the Switchboard sidecar publishes next to its policy file.
+
+Standard library only; copy this file next to your agent.
+
+    from policy_snapshot import PolicySnapshotReader
+
+    snapshot = PolicySnapshotReader("/switchboard/policy.snap")
+    policy = snapshot.read()          # parsed once
+    ...
+    if snapshot.changed():            # one memory read, no syscall
+        policy = snapshot.read()      # re-parsed only when it changed
+
+Layout (little-endian), also documented in docs/sidecar.md:
+
+    offset  size  field
+    0       8     magic     b"SWBPOL01"
+    8       8     sequence  u64; odd while the sidecar is writing
+    16      8     version   i64; the policy version
+    24      4     length    u32; bytes of JSON body
+    28      4     flags     u32; bit 0 = stale, reopen the path
+    32      4     capacity  u32; bytes available for the body
+    36      28    reserved
+    64      ...   body      the policy as UTF-8 JSON
+
+A consistent read copies the body between two reads of an even, unchanged
+sequence.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import struct
+import time
+
+HEADER = struct.Struct("<8sQqIII")
+HEADER_SIZE = 64
+MAGIC = b"SWBPOL01"
+STALE = 1
+_SEQUENCE = struct.Struct("<Q")
+
+
+class PolicySnapshotReader:
+    """Maps the snapshot file and re-parses the policy only after it changes."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.policy: dict | None = None
+        self.version: int | None = None
+        self._map: mmap.mmap | None = None
+        self._sequence: int | None = None
+
+    def _open(self) -> bool:
+        try:
+            with open(self.path, "rb") as fh:
+                self._map = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return False  # not published yet
+        return True
+
+    def changed(self) -> bool:
+        """True if the policy may have moved on since the last ``read``."""
+        if self._map is None:
+            return True
+        return _SEQUENCE.unpack_from(self._map, 8)[0] != self._sequence
+
+    def read(self) -> dict | None:
+        """The current policy; the last one read if none is available right now."""
+        for _ in range(1000):
+            if self._map is None and not self._open():
+                return self.policy
+            before = _SEQUENCE.unpack_from(self._map, 8)[0]
+            if before == self._sequence:
+                return self.policy
+            if before & 1:
+                time.sleep(0)  # the sidecar is mid-write
+                continue
+            magic, _, version, length, flags, capacity = HEADER.unpack_from(self._map)
+            body = self._map[HEADER_SIZE:HEADER_SIZE + min(length, capacity)]
+            if _SEQUENCE.unpack_from(self._map, 8)[0] != before:
+                continue
+            if flags & STALE:
+                self._map.close()
+                self._map, self._sequence = None, None
+                continue
+            if magic != MAGIC:
+                raise ValueError(f"{self.path} is not a Switchboard policy snapshot")
+            self.policy = json.loads(body)
+            self.version, self._sequence = version, before
+            return self.policy
+        return self.policy
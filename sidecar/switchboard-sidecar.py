@@ -13,31 +13,45 @@ Usage:
     # Register a new agent (prints token):
     python switchboard-sidecar.py --register --tier L1
 
+    # Host daemon: serve every agent with a file in a directory
+    AGENTS_DIR=/etc/switchboard/agents python switchboard-sidecar.py
+
 What it does:
     1. Registers with Switchboard (or uses existing token)
-    2. Pulls policy and writes it locally for your agent to read
+    2. Pulls policy and writes it locally for your agent to read (also as a
+       memory-mapped snapshot, see policy_snapshot.py)
     3. Listens on localhost:9100 for events from your agent
-    4. Forwards events to Switchboard with auth
-    5. Sends heartbeats every 30s
+    4. Forwards events to Switchboard with auth (also taken on a Unix socket)
+    5. Checks in every 30s (liveness, telemetry, policy version)
 """
 
 from __future__ import annotations
 
+import bisect
+import hashlib
+import http.client
 import json
 import logging
+import mmap
 import os
+import queue
+import random
+import re
+import select
+import selectors
 import signal
+import socket
+import socketserver
+import struct
 import sys
 import threading
 import time
-from collections import deque
 from datetime import datetime, timezone
 from http.server import HTTPServer, BaseHTTPRequestHandler
 from pathlib import Path
-from statistics import pstdev
+from statistics import median
 from time import perf_counter
-from urllib.error import HTTPError, URLError
-from urllib.request import Request, urlopen
+from urllib.parse import parse_qs, urlsplit
 
 logging.basicConfig(
     level=logging.INFO,
@@ -56,12 +70,25 @@ def load_config() -> dict:
     config = {
         "switchboard_url": os.getenv("SWITCHBOARD_URL", "http://localhost:59237"),
         "agent_id": os.getenv("AGENT_ID", ""),
+        "agents_dir": os.getenv("AGENTS_DIR", ""),
         "sidecar_token": os.getenv("SIDECAR_TOKEN", ""),
         "admin_key": os.getenv("SWITCHBOARD_API_KEY", ""),
         "policy_format": os.getenv("POLICY_FORMAT", "json"),
         "policy_path": os.getenv("POLICY_PATH", "/switchboard/policy.json"),
+        "policy_snapshot": os.getenv("POLICY_SNAPSHOT", "true"),
         "event_listen_port": int(os.getenv("EVENT_LISTEN_PORT", "9100")),
+        "event_socket": os.getenv("EVENT_SOCKET", ""),
         "heartbeat_interval": int(os.getenv("HEARTBEAT_INTERVAL", "30")),
+        "policy_wait": int(os.getenv("POLICY_WAIT", "60")),
+        "pool_size": int(os.getenv("POOL_SIZE", "4")),
+        "probe_pings": int(os.getenv("PROBE_PINGS", "5")),
+        "backoff_max": float(os.getenv("BACKOFF_MAX", "60")),
+        "event_queue_size": int(os.getenv("EVENT_QUEUE_SIZE", "10000")),
+        "event_batch_size": int(os.getenv("EVENT_BATCH_SIZE", "100")),
+        "event_linger_ms": int(os.getenv("EVENT_LINGER_MS", "50")),
+        "listener_workers": int(os.getenv("LISTENER_WORKERS", "8")),
+        "spool_dir": os.getenv("SPOOL_DIR", "/var/spool/switchboard-sidecar"),
+        "spool_max_mb": int(os.getenv("SPOOL_MAX_MB", "256")),
         "tier": os.getenv("AGENT_TIER", "L0"),
         "display_name": os.getenv("AGENT_DISPLAY_NAME", ""),
         "allowed_actions": os.getenv("ALLOWED_ACTIONS", ""),
@@ -110,55 +137,581 @@ def load_config() -> dict:
             config["tier"] = sys.argv[i + 1]
         elif arg == "--agent-id" and i + 1 < len(sys.argv):
             config["agent_id"] = sys.argv[i + 1]
+        elif arg == "--agents-dir" and i + 1 < len(sys.argv):
+            config["agents_dir"] = sys.argv[i + 1]
         elif arg == "--port" and i + 1 < len(sys.argv):
             config["event_listen_port"] = int(sys.argv[i + 1])
         elif arg == "--telemetry-interval" and i + 1 < len(sys.argv):
             config["telemetry_interval"] = int(sys.argv[i + 1])
 
-    if not config["agent_id"]:
-        log.error("AGENT_ID is required (env var, config file, or --agent-id)")
+    if not config["agent_id"] and not config["agents_dir"]:
+        log.error(
+            "AGENT_ID is required (env var, config file, or --agent-id), "
+            "or AGENTS_DIR for host-daemon mode"
+        )
         sys.exit(1)
 
     return config
 
 
+# Agent ids usable as a directory name: no separators, no ``.`` or ``..``
+_AGENT_ID = re.compile(r"[A-Za-z0-9_.-]+")
+
+
+def load_agents(config: dict) -> list[dict]:
+    """Per-agent configs for host-daemon mode, one per ``*.json`` in ``agents_dir``.
+
+    Each file overrides the sidecar config for one agent, at least with its
+    ``sidecar_token`` (``{"agent_id": "ci-1", "sidecar_token": "..."}``);
+    ``agent_id`` defaults to the file name. Unless a file sets
+    ``policy_path``, the agent's policy goes to ``<agent_id>/`` next to
+    ``POLICY_PATH``.
+    """
+    base_policy = Path(config["policy_path"])
+    agents: dict[str, dict] = {}
+    for path in sorted(Path(config["agents_dir"]).glob("*.json")):
+        try:
+            overrides = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            log.error("Skipping agent file %s: %s", path, e)
+            continue
+        if not isinstance(overrides, dict):
+            log.error("Skipping agent file %s: not a JSON object", path)
+            continue
+        agent_id = str(overrides.get("agent_id") or path.stem)
+        if not _AGENT_ID.fullmatch(agent_id) or ".." in agent_id or agent_id == ".":
+            # The id names the agent's policy and spool directories
+            log.error("Skipping agent file %s: invalid agent_id %r", path, agent_id)
+            continue
+        if agent_id in agents:
+            log.error("Skipping agent file %s: agent '%s' listed twice", path, agent_id)
+            continue
+        agents[agent_id] = {
+            **config,
+            "sidecar_token": "",
+            "display_name": "",
+            "policy_path": str(base_policy.parent / agent_id / base_policy.name),
+            **overrides,
+            "agent_id": agent_id,
+            "agent_file": str(path),
+        }
+    return list(agents.values())
+
+
+def save_agent_token(config: dict) -> None:
+    """Write a newly registered token back to the agent's file, for restarts."""
+    path = Path(config["agent_file"])
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        data["sidecar_token"] = config["sidecar_token"]
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data, indent=2) + "\n", encoding="utf-8")
+        os.chmod(tmp, path.stat().st_mode)
+        os.replace(tmp, path)
+    except (OSError, ValueError) as e:
+        log.warning("Could not save the token for '%s' to %s: %s", config["agent_id"], path, e)
+
+
+# ---------------------------------------------------------------------------
+# Self-metrics (Prometheus text format)
+# ---------------------------------------------------------------------------
+
+# Upper bounds (seconds) shared by every latency histogram
+_LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+def _label_text(labels: tuple[tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        (k, v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in labels
+    )
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+class Metrics:
+    """Counters, gauges and fixed-bucket histograms for ``GET /metrics``.
+
+    Metrics are declared once with ``describe``; samples are keyed by their
+    label values. Gauges are callbacks read at scrape time, so they cost
+    nothing between scrapes. Thread-safe.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = _LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        # name -> (type, help), in declaration order
+        self._meta: dict[str, tuple[str, str]] = {}
+        self._values: dict[str, dict[tuple, float | list]] = {}
+        self._callbacks: dict[str, list[tuple[tuple, object]]] = {}
+
+    def describe(self, name: str, kind: str, help_text: str) -> None:
+        self._meta[name] = (kind, help_text)
+        self._values.setdefault(name, {})
+
+    def inc(self, name: str, value: float = 1, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._values[name]
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        slot = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._values[name]
+            counts = series.get(key)
+            if counts is None:
+                # one count per bucket, +Inf, then the sum
+                counts = series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            counts[slot] += 1
+            counts[-1] += seconds
+
+    def callback(self, name: str, read, **labels: str) -> None:
+        """Report ``read()`` as ``name`` at every scrape (None skips it)."""
+        self._callbacks.setdefault(name, []).append((tuple(sorted(labels.items())), read))
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            snapshot = {
+                name: {k: list(v) if isinstance(v, list) else v for k, v in series.items()}
+                for name, series in self._values.items()
+            }
+        for name, (kind, help_text) in self._meta.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for key, read in self._callbacks.get(name, ()):
+                value = read()
+                if value is not None:
+                    lines.append(f"{name}{_label_text(key)} {value:g}")
+            for key, value in snapshot[name].items():
+                if kind != "histogram":
+                    lines.append(f"{name}{_label_text(key)} {value:g}")
+                    continue
+                cumulative = 0
+                for bound, count in zip((*self.buckets, "+Inf"), value):
+                    cumulative += count
+                    le = bound if isinstance(bound, str) else f"{bound:g}"
+                    labels = _label_text((*key, ("le", le)))
+                    lines.append(f"{name}_bucket{labels} {cumulative}")
+                lines.append(f"{name}_sum{_label_text(key)} {value[-1]:g}")
+                lines.append(f"{name}_count{_label_text(key)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+for _name, _kind, _help in (
+    ("switchboard_sidecar_upstream_requests_total", "counter",
+     "Requests to Switchboard by operation and outcome (status class, error, short_circuit)"),
+    ("switchboard_sidecar_upstream_request_seconds", "histogram",
+     "Round-trip time of requests to Switchboard by operation"),
+    ("switchboard_sidecar_retries_total", "counter",
+     "Retries by cause (events, policy, stale_connection)"),
+    ("switchboard_sidecar_breaker_opens_total", "counter",
+     "Times the circuit breaker opened"),
+    ("switchboard_sidecar_breaker_open", "gauge",
+     "1 while the circuit breaker is short-circuiting requests"),
+    ("switchboard_sidecar_events_received_total", "counter",
+     "Events accepted from the agent"),
+    ("switchboard_sidecar_events_rejected_total", "counter",
+     "Events refused by the listener because the queue was full"),
+    ("switchboard_sidecar_events_forwarded_total", "counter",
+     "Events delivered to Switchboard"),
+    ("switchboard_sidecar_events_refused_total", "counter",
+     "Events Switchboard refused with a 4xx (not retried)"),
+    ("switchboard_sidecar_event_queue_depth", "gauge",
+     "Events waiting in memory to be forwarded"),
+    ("switchboard_sidecar_spool_events", "gauge",
+     "Events waiting in the disk spool"),
+    ("switchboard_sidecar_spool_bytes", "gauge",
+     "Size of the disk spool"),
+    ("switchboard_sidecar_listener_request_seconds", "histogram",
+     "Time the local listener took to answer the agent, by path"),
+    ("switchboard_sidecar_checks_total", "counter",
+     "Local policy decisions by result"),
+    ("switchboard_sidecar_policy_version", "gauge",
+     "Version of the policy in effect"),
+    ("switchboard_sidecar_probe_rtt_seconds", "histogram",
+     "Individual RTT probe pings to Switchboard"),
+    ("switchboard_sidecar_probe_last_seconds", "gauge",
+     "Latest RTT probe result by statistic (median, min, jitter, connect)"),
+    ("switchboard_sidecar_probe_failures_total", "counter",
+     "RTT probes that could not reach Switchboard"),
+):
+    metrics.describe(_name, _kind, _help)
+
+
+def _operation(path: str) -> str:
+    """Bounded label for an upstream request path."""
+    path, _, query = path.partition("?")
+    if path.endswith("/policy"):
+        return "policy_watch" if "wait=" in query else "policy"
+    return {
+        "/api/v1/events": "event",
+        "/api/v1/events/batch": "event_batch",
+        "/api/v1/checkin": "checkin",
+        "/api/v1/telemetry": "telemetry",
+        "/api/v1/agents": "register",
+        "/api/v1/policies": "policy_bulk",
+    }.get(path, "other")
+
+
 # ---------------------------------------------------------------------------
 # Switchboard HTTP client
 # ---------------------------------------------------------------------------
 
-def switchboard_request(
+def _lower_headers(headers) -> dict:
+    return {k.lower(): v for k, v in (headers or {}).items()}
+
+
+# Idle connections older than this are dropped rather than reused; servers
+# close idle keep-alive connections after a few seconds (uvicorn: 5).
+_POOL_IDLE_SECONDS = 4.0
+
+# Errors seen when a pooled connection was closed by the server while idle.
+# A request failing this way on a reused connection is retried on a fresh
+# one if Switchboard cannot have acted on it: the request was never fully
+# sent, or resending it is harmless (an idempotent method).
+_STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    BrokenPipeError,
+    ConnectionResetError,
+)
+_IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+def _closed_by_peer(conn: http.client.HTTPConnection) -> bool:
+    """True if an idle connection's socket is readable: the server closed it."""
+    try:
+        readable, _, _ = select.select([conn.sock], [], [], 0)
+    except (OSError, ValueError):
+        return True
+    return bool(readable)
+
+
+class Backoff:
+    """Exponential backoff with full jitter.
+
+    The n-th consecutive ``next()`` is drawn uniformly from
+    ``[0, min(cap, base * 2**n))``, so a fleet of sidecars that failed
+    together spreads its retries out instead of retrying in lockstep.
+    """
+
+    def __init__(self, base: float = 1.0, cap: float = 60.0):
+        self.base = base
+        self.cap = cap
+        self.attempts = 0
+
+    def next(self) -> float:
+        ceiling = min(self.cap, self.base * 2 ** min(self.attempts, 32))
+        self.attempts += 1
+        return random.uniform(0, ceiling)
+
+    def reset(self) -> None:
+        self.attempts = 0
+
+
+def _jittered(seconds: float, spread: float = 0.1) -> float:
+    """``seconds`` ± ``spread``, so periodic loops drift out of step."""
+    return seconds * random.uniform(1 - spread, 1 + spread)
+
+
+# Consecutive failures that open the circuit
+_BREAKER_THRESHOLD = 3
+
+# Statuses meaning Switchboard (or the proxy in front of it) is unavailable
+_UNAVAILABLE_STATUSES = (502, 503, 504)
+
+# Refusals of the sidecar's credentials rather than of the events it sends
+_AUTH_STATUSES = (401, 403)
+
+
+class CircuitBreaker:
+    """Stops all sidecar threads from calling Switchboard while it is down.
+
+    After ``_BREAKER_THRESHOLD`` consecutive failures the circuit opens for
+    a ``Backoff`` delay; calls made meanwhile fail at once without touching
+    the network. Once the delay passes, calls go through again: a success
+    closes the circuit, and a failure reopens it for a longer delay.
+    """
+
+    def __init__(self, cap: float = 60.0, clock=time.monotonic):
+        self._backoff = Backoff(base=2.0, cap=cap)
+        self._clock = clock
+        self._failures = 0
+        self._open_until = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """True unless the circuit is open right now."""
+        return self._clock() >= self._open_until
+
+    def opened_since_success(self) -> bool:
+        """True if the circuit has opened since the last successful call.
+
+        Stays true while trial calls go through after a pause, until one
+        succeeds; callers use it to avoid logging every failure of an outage.
+        """
+        return self._backoff.attempts > 0
+
+    def success(self) -> None:
+        with self._lock:
+            if self._backoff.attempts:
+                log.info("Switchboard reachable again; resuming requests")
+            self._failures = 0
+            self._backoff.reset()
+
+    def failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            # A failed trial after a pause reopens at once
+            if self._failures < _BREAKER_THRESHOLD and not self._backoff.attempts:
+                return
+            delay = self._backoff.next()
+            self._open_until = self._clock() + delay
+            metrics.inc("switchboard_sidecar_breaker_opens_total")
+            log.warning(
+                "Switchboard unavailable; pausing requests for %.1fs (attempt %d)",
+                delay, self._backoff.attempts,
+            )
+
+
+class ConnectionPool:
+    """Keep-alive HTTP(S) connections to Switchboard, shared by all threads.
+
+    Each request checks out a connection for its whole exchange, so threads
+    never interleave on one socket; up to ``size`` idle connections are kept
+    for reuse. Requests then cost one round trip instead of a TCP (and TLS)
+    handshake each.
+    """
+
+    def __init__(self, base_url: str, size: int = 4, backoff_max: float = 60.0):
+        parts = urlsplit(base_url)
+        if parts.scheme == "https":
+            self._connection_class = http.client.HTTPSConnection
+        else:
+            self._connection_class = http.client.HTTPConnection
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port
+        self.prefix = parts.path.rstrip("/")
+        self.size = size
+        self._idle: list[tuple[http.client.HTTPConnection, float]] = []
+        self._lock = threading.Lock()
+        self.breaker = CircuitBreaker(backoff_max)
+
+    def _checkout(self) -> tuple[http.client.HTTPConnection, bool]:
+        """An idle connection (reused=True) or a new, unconnected one."""
+        now = time.monotonic()
+        with self._lock:
+            while self._idle:
+                conn, idle_since = self._idle.pop()
+                if now - idle_since < _POOL_IDLE_SECONDS and not _closed_by_peer(conn):
+                    return conn, True
+                conn.close()
+        return self._connection_class(self.host, self.port), False
+
+    def _checkin(self, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append((conn, time.monotonic()))
+                return
+        conn.close()
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        body: bytes | None,
+        headers: dict,
+        timeout: float,
+    ) -> tuple[int, dict, bytes]:
+        """Send one request; returns (status, lower-cased headers, body).
+
+        Raises ``OSError`` or ``http.client.HTTPException`` if Switchboard
+        cannot be reached. A non-idempotent request (``POST``) whose
+        connection drops after it was sent is not resent here, since
+        Switchboard may already have acted on it.
+        """
+        while True:
+            conn, reused = self._checkout()
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+            sent = False
+            try:
+                conn.request(method, self.prefix + path, body=body, headers=headers)
+                sent = True
+                resp = conn.getresponse()
+                payload = resp.read()
+            except _STALE_CONNECTION_ERRORS:
+                conn.close()
+                if reused and (not sent or method in _IDEMPOTENT_METHODS):
+                    metrics.inc("switchboard_sidecar_retries_total", cause="stale_connection")
+                    continue
+                raise
+            except BaseException:
+                conn.close()
+                raise
+            if resp.will_close:
+                conn.close()
+            else:
+                self._checkin(conn)
+            return resp.status, _lower_headers(resp.headers), payload
+
+    def ping(
+        self, path: str, count: int, timeout: float = 5.0
+    ) -> tuple[float | None, list[tuple[int, float]]]:
+        """Time ``count`` back-to-back GETs of ``path`` on one connection.
+
+        Returns ``(connect_ms, [(status, rtt_ms), ...])``. ``connect_ms`` is
+        the TCP (and TLS) setup time if a new connection had to be opened,
+        None if a pooled one was reused; it is never part of an RTT.
+        """
+        while True:
+            conn, reused = self._checkout()
+            conn.timeout = timeout
+            connect_ms = None
+            samples: list[tuple[int, float]] = []
+            try:
+                if conn.sock is None:
+                    started = perf_counter()
+                    conn.connect()
+                    connect_ms = (perf_counter() - started) * 1000.0
+                else:
+                    conn.sock.settimeout(timeout)
+                for _ in range(count):
+                    started = perf_counter()
+                    conn.request("GET", self.prefix + path)
+                    resp = conn.getresponse()
+                    resp.read()
+                    samples.append((resp.status, (perf_counter() - started) * 1000.0))
+                    if resp.will_close:
+                        break
+            except _STALE_CONNECTION_ERRORS:
+                conn.close()
+                if reused and not samples:
+                    continue
+                raise
+            except BaseException:
+                conn.close()
+                raise
+            if resp.will_close:
+                conn.close()
+            else:
+                self._checkin(conn)
+            return connect_ms, samples
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            conn.close()
+
+
+_pools: dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def _switchboard_pool(config: dict) -> ConnectionPool:
+    url = config["switchboard_url"]
+    with _pools_lock:
+        pool = _pools.get(url)
+        if pool is None:
+            pool = _pools[url] = ConnectionPool(
+                url,
+                int(config.get("pool_size", 4)),
+                float(config.get("backoff_max", 60)),
+            )
+        return pool
+
+
+def _switchboard_open(
     config: dict,
     method: str,
     path: str,
     body: dict | None = None,
     use_token: bool = False,
-) -> dict | None:
-    """Make an HTTP request to Switchboard. Returns parsed JSON or None."""
-    url = f"{config['switchboard_url']}{path}"
-    headers = {"Content-Type": "application/json"}
+    headers: dict | None = None,
+    timeout: float = 10,
+) -> tuple[int, dict, bytes] | None:
+    """Send one request to Switchboard. Returns (status, headers, body) or None.
+
+    Non-2xx answers (including 304) are returned, not raised; header names
+    are lower-cased. None means Switchboard could not be reached, or that
+    the circuit breaker is open and the request was not attempted.
+    """
+    pool = _switchboard_pool(config)
+    operation = _operation(path)
+    if not pool.breaker.allow():
+        metrics.inc(
+            "switchboard_sidecar_upstream_requests_total",
+            operation=operation, outcome="short_circuit",
+        )
+        return None
+    request_headers = {"Content-Type": "application/json"}
 
     if use_token and config.get("sidecar_token"):
-        headers["Authorization"] = f"Bearer {config['sidecar_token']}"
+        request_headers["Authorization"] = f"Bearer {config['sidecar_token']}"
     elif config.get("admin_key"):
-        headers["X-Switchboard-Key"] = config["admin_key"]
+        request_headers["X-Switchboard-Key"] = config["admin_key"]
+    if headers:
+        request_headers.update(headers)
 
     data = json.dumps(body).encode() if body else None
-    req = Request(url, data=data, headers=headers, method=method)
 
+    started = perf_counter()
     try:
-        with urlopen(req, timeout=10) as resp:
-            return json.loads(resp.read().decode())
-    except HTTPError as e:
-        body_text = ""
-        try:
-            body_text = e.read().decode()
-        except Exception:
-            pass
-        log.error("Switchboard %s %s → %d: %s", method, path, e.code, body_text[:200])
+        result = pool.request(method, path, data, request_headers, timeout)
+    except (OSError, http.client.HTTPException) as e:
+        metrics.inc(
+            "switchboard_sidecar_upstream_requests_total",
+            operation=operation, outcome="error",
+        )
+        if not pool.breaker.opened_since_success():
+            log.error(
+                "Switchboard unreachable at %s%s: %s",
+                config["switchboard_url"], path, e,
+            )
+        pool.breaker.failure()
         return None
-    except URLError as e:
-        log.error("Switchboard unreachable at %s: %s", url, e.reason)
+    metrics.observe(
+        "switchboard_sidecar_upstream_request_seconds",
+        perf_counter() - started, operation=operation,
+    )
+    metrics.inc(
+        "switchboard_sidecar_upstream_requests_total",
+        operation=operation, outcome=f"{result[0] // 100}xx",
+    )
+    if result[0] in _UNAVAILABLE_STATUSES:
+        pool.breaker.failure()
+    else:
+        pool.breaker.success()
+    return result
+
+
+def switchboard_request(
+    config: dict,
+    method: str,
+    path: str,
+    body: dict | None = None,
+    use_token: bool = False,
+) -> dict | None:
+    """Make an HTTP request to Switchboard. Returns parsed JSON or None."""
+    result = _switchboard_open(config, method, path, body, use_token)
+    if result is None:
         return None
+    status, _, payload = result
+    if status >= 400:
+        log.error(
+            "Switchboard %s %s → %d: %s",
+            method, path, status, payload.decode(errors="replace")[:200],
+        )
+        return None
+    return json.loads(payload.decode())
 
 
 # ---------------------------------------------------------------------------
@@ -205,33 +758,138 @@ def register_agent(config: dict) -> str | None:
 # Policy sync
 # ---------------------------------------------------------------------------
 
-def pull_policy(config: dict) -> dict | None:
-    """Fetch current policy from Switchboard."""
-    result = switchboard_request(
-        config, "GET",
-        f"/api/v1/agents/{config['agent_id']}/policy",
-        use_token=True,
+def pull_policy(
+    config: dict,
+    etag: str | None = None,
+    wait: int = 0,
+    known_version: int | None = None,
+) -> tuple[int | None, dict | None, str | None]:
+    """Fetch current policy from Switchboard. Returns (status, policy, etag).
+
+    With a known ``etag`` the request is conditional: an unchanged policy
+    comes back as a bodiless 304 with ``policy`` None. With ``wait`` > 0 the
+    request long-polls until the policy moves past ``known_version`` or
+    ``wait`` seconds pass. ``status`` is None if Switchboard is unreachable.
+    """
+    path = f"/api/v1/agents/{config['agent_id']}/policy"
+    if wait > 0 and known_version is not None:
+        path += f"?wait={wait}&known_version={known_version}"
+    headers = {"If-None-Match": etag} if etag else None
+    result = _switchboard_open(
+        config, "GET", path, use_token=True, headers=headers, timeout=wait + 10
     )
-    return result
+    if result is None:
+        return None, None, etag
+    status, resp_headers, payload = result
+    if status == 304:
+        return status, None, etag
+    if status >= 400:
+        log.error(
+            "Switchboard GET %s → %d: %s",
+            path, status, payload.decode(errors="replace")[:200],
+        )
+        return status, None, etag
+    return status, json.loads(payload.decode()), resp_headers.get("etag")
+
+
+def adopt_policy(config: dict, decider: PolicyDecider, policy: dict) -> None:
+    """Make ``policy`` current: the local file, the snapshot and the in-memory copy."""
+    write_policy(config, policy)
+    snapshot = _policy_snapshot(config)
+    if snapshot is not None:
+        snapshot.publish(policy)
+    decider.update(policy)
+
+
+def refresh_policy(agent: HostedAgent) -> None:
+    """Pull ``agent``'s policy (conditionally) and adopt it if the version moved."""
+    current = agent.decider.policy.version if agent.decider.policy else None
+    _, policy, agent.policy_etag = pull_policy(agent.config, agent.policy_etag)
+    if policy and policy.get("version", -1) != current:
+        adopt_policy(agent.config, agent.decider, policy)
+
+
+def pull_policies(
+    config: dict, agents: list[HostedAgent], wait: int = 0
+) -> tuple[int | None, int]:
+    """Fetch the policies of ``agents`` in one request; adopt the changed ones.
+
+    Each agent's token and known version go along, so only changed policies
+    come back. With ``wait`` > 0 the request long-polls until one changes.
+    Returns ``(status, policies adopted)``; status is None if Switchboard is
+    unreachable.
+    """
+    by_id = {agent.agent_id: agent for agent in agents}
+    body = {
+        "agents": [
+            {
+                "agent_id": agent.agent_id,
+                "token": agent.config["sidecar_token"],
+                "known_version": agent.decider.policy.version if agent.decider.policy else None,
+            }
+            for agent in agents
+        ],
+        "wait": wait,
+    }
+    # Each entry is authorized by its own token; the header needs any one
+    # valid token, so skip those Switchboard has refused
+    bearer = next((agent for agent in agents if not agent.token_refused), agents[0])
+    result = _switchboard_open(
+        config, "POST", "/api/v1/policies", body,
+        headers={"Authorization": f"Bearer {bearer.config['sidecar_token']}"},
+        timeout=wait + 10,
+    )
+    if result is None:
+        return None, 0
+    status, _, payload = result
+    if status == 403:
+        bearer.token_refused = True  # the next attempt sends another agent's token
+    if status >= 300:
+        if status not in (404, 405):
+            log.error(
+                "Switchboard POST /api/v1/policies → %d: %s",
+                status, payload.decode(errors="replace")[:200],
+            )
+        return status, 0
+    data = json.loads(payload)
+    adopted = 0
+    for agent_id, policy in data.get("policies", {}).items():
+        agent = by_id.get(agent_id)
+        if agent is not None:
+            adopt_policy(agent.config, agent.decider, policy)
+            adopted += 1
+    forbidden = set(data.get("forbidden", ()))
+    for agent in agents:
+        agent.token_refused = agent.agent_id in forbidden
+        if agent.token_refused:
+            log.error("Switchboard refused the token of agent '%s'", agent.agent_id)
+    return status, adopted
+
+
+def _replace_file(path: Path, text: str) -> None:
+    """Write ``text`` to ``path`` atomically, so readers never see half a file."""
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
 
 
 def write_policy(config: dict, policy: dict) -> None:
-    """Write policy to local file in the configured format."""
+    """Write policy to local file in the configured format (atomically)."""
     path = Path(config["policy_path"])
     path.parent.mkdir(parents=True, exist_ok=True)
 
     fmt = config["policy_format"].lower()
 
     if fmt == "json":
-        path.write_text(json.dumps(policy, indent=2), encoding="utf-8")
+        _replace_file(path, json.dumps(policy, indent=2))
     elif fmt == "yaml" or fmt == "yml":
         try:
             import yaml
-            path.write_text(yaml.dump(policy, default_flow_style=False), encoding="utf-8")
+            _replace_file(path, yaml.dump(policy, default_flow_style=False))
         except ImportError:
             # Fallback: write JSON even if yaml was requested
             json_path = path.with_suffix(".json")
-            json_path.write_text(json.dumps(policy, indent=2), encoding="utf-8")
+            _replace_file(json_path, json.dumps(policy, indent=2))
             log.warning("PyYAML not installed, wrote JSON to %s", json_path)
             return
     elif fmt == "env":
@@ -245,7 +903,7 @@ def write_policy(config: dict, policy: dict) -> None:
         rl = policy.get("rate_limits", {})
         lines.append(f"HERALD_RATE_LIMIT_EVENTS={rl.get('events_per_minute', 60)}")
         lines.append(f"HERALD_RATE_LIMIT_API={rl.get('external_api_calls_per_minute', 10)}")
-        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        _replace_file(path, "\n".join(lines) + "\n")
     elif fmt == "toml":
         # Minimal TOML output without external deps
         lines = [
@@ -260,27 +918,321 @@ def write_policy(config: dict, policy: dict) -> None:
             f'events_per_minute = {policy.get("rate_limits", {}).get("events_per_minute", 60)}',
             f'external_api_calls_per_minute = {policy.get("rate_limits", {}).get("external_api_calls_per_minute", 10)}',
         ]
-        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        _replace_file(path, "\n".join(lines) + "\n")
     else:
         # Default to JSON
-        path.write_text(json.dumps(policy, indent=2), encoding="utf-8")
+        _replace_file(path, json.dumps(policy, indent=2))
 
     log.info("Policy written to %s (%s)", path, fmt)
 
 
-def policy_sync_loop(config: dict, stop_event: threading.Event) -> None:
-    """Periodically pull policy from Switchboard and write locally."""
-    last_version = -1
+def policy_sync_loop(
+    config: dict, stop_event: threading.Event, decider: PolicyDecider
+) -> None:
+    """Keep the local policy file current by long-polling Switchboard.
+
+    Each request parks for up to ``policy_wait`` seconds, so changes land
+    within a round trip and an idle agent costs one request per wait period.
+    On errors, or against a server that does not park requests, falls back
+    to polling every ``heartbeat_interval``. (With ``policy_wait`` 0 this
+    loop is not started; ``checkin_loop`` pulls the policy when its version
+    changes.)
+    """
+    wait = max(0, int(config.get("policy_wait", 0)))
+    last_version = decider.policy.version if decider.policy else -1
+    etag = None
+    backoff = Backoff(cap=float(config.get("backoff_max", 60)))
+    # Start at a random offset so a fleet started together stays spread out
+    stop_event.wait(random.uniform(0, config["heartbeat_interval"]))
     while not stop_event.is_set():
-        policy = pull_policy(config)
+        started = time.monotonic()
+        status, policy, etag = pull_policy(
+            config,
+            etag,
+            wait=wait,
+            known_version=last_version if last_version >= 0 else None,
+        )
         if policy and policy.get("version", -1) != last_version:
-            write_policy(config, policy)
+            adopt_policy(config, decider, policy)
             last_version = policy.get("version", -1)
-        stop_event.wait(config["heartbeat_interval"])
+
+        # A 304 that came back early means the server did not park the
+        # request (no long-poll support); pace ourselves instead.
+        parked = status == 304 and time.monotonic() - started >= wait / 2
+        if status is None or status >= 500:
+            metrics.inc("switchboard_sidecar_retries_total", cause="policy")
+            stop_event.wait(backoff.next())
+            continue
+        backoff.reset()
+        if wait and (status == 200 or parked):
+            continue
+        stop_event.wait(_jittered(config["heartbeat_interval"]))
+
+
+def bulk_policy_loop(
+    config: dict, stop_event: threading.Event, agents: list[HostedAgent]
+) -> None:
+    """Keep every hosted agent's policy current with one long-poll for all.
+
+    The host-daemon counterpart of ``policy_sync_loop``: each request names
+    every agent's known version and parks until any of them changes, so a
+    host costs one parked request per ``policy_wait`` however many agents it
+    serves. Against a Switchboard without ``POST /api/v1/policies``, each
+    agent's policy is polled conditionally every ``heartbeat_interval``.
+    """
+    wait = max(0, int(config.get("policy_wait", 0)))
+    interval = config["heartbeat_interval"]
+    backoff = Backoff(cap=float(config.get("backoff_max", 60)))
+    bulk = True
+    stop_event.wait(random.uniform(0, interval))
+    while not stop_event.is_set():
+        if not bulk:
+            for agent in agents:
+                refresh_policy(agent)
+            stop_event.wait(_jittered(interval))
+            continue
+
+        started = time.monotonic()
+        status, adopted = pull_policies(config, agents, wait)
+        if status in (404, 405):
+            log.info("Switchboard has no bulk policy endpoint; polling each agent's policy")
+            bulk = False
+            continue
+        if status is None or status >= 500:
+            metrics.inc("switchboard_sidecar_retries_total", cause="policy")
+            stop_event.wait(backoff.next())
+            continue
+        backoff.reset()
+        if status < 300 and (adopted or time.monotonic() - started >= wait / 2):
+            continue
+        stop_event.wait(_jittered(interval))
+
+
+# ---------------------------------------------------------------------------
+# Policy snapshot (memory-mapped, for agents that poll the policy)
+# ---------------------------------------------------------------------------
+
+# Header, little-endian: magic, sequence, version, body length, flags, body
+# capacity; padded to 64 bytes, then the policy as compact JSON. The layout
+# is documented in docs/sidecar.md and read by sidecar/policy_snapshot.py.
+_SNAPSHOT_HEADER = struct.Struct("<8sQqIII")
+_SNAPSHOT_HEADER_SIZE = 64
+_SNAPSHOT_MAGIC = b"SWBPOL01"
+# Flag: this file has been replaced; reopen the path
+_SNAPSHOT_STALE = 1
+
+
+class PolicySnapshot:
+    """The current policy in a memory-mapped file that agents poll cheaply.
+
+    Updates that fit are written in place under a seqlock: the sequence
+    number goes odd, the body, version and length are written, and it goes
+    even again. A reader that sees the same even sequence before and after
+    its copy has a consistent policy, and comparing the sequence with the
+    last one it parsed is a single memory read. A policy that outgrows the
+    file goes to a new, larger file that replaces it with ``os.replace``;
+    the old file is then flagged stale, with a final sequence bump, so
+    mapped readers reopen the path.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._map: mmap.mmap | None = None
+        self._capacity = 0
+        self._adopt_existing()
+
+    def _adopt_existing(self) -> None:
+        """Keep updating the file an earlier run left, which agents may have mapped."""
+        try:
+            with open(self.path, "r+b") as fh:
+                mapped = mmap.mmap(fh.fileno(), 0)
+        except (OSError, ValueError):
+            return
+        if len(mapped) < _SNAPSHOT_HEADER_SIZE:
+            mapped.close()
+            return
+        magic, seq, _, _, flags, capacity = _SNAPSHOT_HEADER.unpack_from(mapped)
+        if (
+            magic != _SNAPSHOT_MAGIC
+            or flags & _SNAPSHOT_STALE
+            or _SNAPSHOT_HEADER_SIZE + capacity != len(mapped)
+        ):
+            mapped.close()
+            return
+        if seq & 1:
+            # A write was cut short: leave the sequence even for readers
+            struct.pack_into("<Q", mapped, 8, seq + 1)
+        self._map, self._capacity = mapped, capacity
+
+    def _seq(self) -> int:
+        return struct.unpack_from("<Q", self._map, 8)[0]
+
+    def publish(self, policy: dict) -> None:
+        body = json.dumps(policy, separators=(",", ":")).encode()
+        version = int(policy.get("version", -1))
+        try:
+            if self._map is None or len(body) > self._capacity:
+                self._swap(body, version)
+                return
+            seq = self._seq() + 1
+            struct.pack_into("<Q", self._map, 8, seq)  # odd: write in progress
+            end = _SNAPSHOT_HEADER_SIZE + len(body)
+            self._map[_SNAPSHOT_HEADER_SIZE:end] = body
+            struct.pack_into("<qI", self._map, 16, version, len(body))
+            struct.pack_into("<Q", self._map, 8, seq + 1)
+        except OSError as e:
+            log.warning("Could not publish the policy snapshot to %s: %s", self.path, e)
+
+    def _swap(self, body: bytes, version: int) -> None:
+        # Room to grow: the next power of two holding twice this policy
+        size = max(4096, 1 << (_SNAPSHOT_HEADER_SIZE + 2 * len(body) - 1).bit_length())
+        capacity = size - _SNAPSHOT_HEADER_SIZE
+        header = _SNAPSHOT_HEADER.pack(_SNAPSHOT_MAGIC, 2, version, len(body), 0, capacity)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp, "wb") as fh:
+            fh.write(header.ljust(_SNAPSHOT_HEADER_SIZE, b"\0") + body)
+            fh.truncate(size)
+        os.replace(tmp, self.path)
+
+        old = self._map
+        with open(self.path, "r+b") as fh:
+            self._map = mmap.mmap(fh.fileno(), 0)
+        self._capacity = capacity
+        if old is not None:
+            struct.pack_into("<I", old, 28, _SNAPSHOT_STALE)
+            struct.pack_into("<Q", old, 8, struct.unpack_from("<Q", old, 8)[0] + 2)
+            old.close()
+
+
+_snapshots: dict[str, PolicySnapshot] = {}
+_snapshots_lock = threading.Lock()
+
+
+def _policy_snapshot(config: dict) -> PolicySnapshot | None:
+    """The agent's snapshot next to its policy file (``.snap``), unless disabled."""
+    if str(config.get("policy_snapshot", "true")).strip().lower() in {"", "0", "false", "no", "off"}:
+        return None
+    path = Path(config["policy_path"]).with_suffix(".snap")
+    with _snapshots_lock:
+        snapshot = _snapshots.get(str(path))
+        if snapshot is None:
+            snapshot = _snapshots[str(path)] = PolicySnapshot(path)
+        return snapshot
 
 
 # ---------------------------------------------------------------------------
-# Telemetry + heartbeat
+# Local policy decisions
+# ---------------------------------------------------------------------------
+
+# Actions counted against ``external_api_calls_per_minute``
+_EXTERNAL_API_ACTIONS = frozenset({"api_call"})
+
+
+class CompiledPolicy:
+    """A policy document prepared for lookups and for serving as-is."""
+
+    __slots__ = ("allowed", "body", "denied", "etag", "limits", "version")
+
+    def __init__(self, policy: dict):
+        self.version = policy.get("version", -1)
+        self.allowed = frozenset(policy.get("allowed_actions") or ())
+        self.denied = frozenset(policy.get("denied_actions") or ())
+        rate_limits = policy.get("rate_limits") or {}
+        self.limits = (
+            int(rate_limits.get("events_per_minute", 60)),
+            int(rate_limits.get("external_api_calls_per_minute", 10)),
+        )
+        self.body = json.dumps(policy, indent=2).encode()
+        self.etag = f'"{hashlib.sha256(self.body).hexdigest()[:16]}"'
+
+
+class RateWindow:
+    """Events seen over the trailing minute, in one-second buckets."""
+
+    def __init__(self):
+        self._counts = [0] * 60
+        self._seconds = [0] * 60
+
+    def add(self, now: float) -> None:
+        second = int(now)
+        slot = second % 60
+        if self._seconds[slot] != second:
+            self._seconds[slot], self._counts[slot] = second, 0
+        self._counts[slot] += 1
+
+    def count(self, now: float) -> int:
+        oldest = int(now) - 59
+        return sum(c for c, s in zip(self._counts, self._seconds) if s >= oldest)
+
+
+class PolicyDecider:
+    """Answers "may this agent do X now?" from the current policy, in memory.
+
+    Mirrors Switchboard's action rules: ``denied_actions`` always wins, a
+    non-empty ``allowed_actions`` is a whitelist, and heartbeats are never
+    blocked. Rate limits are judged against the events the agent has
+    forwarded through this sidecar in the trailing minute.
+    """
+
+    def __init__(self):
+        # Replaced whole on update, so readers never see a half-built policy
+        self.policy: CompiledPolicy | None = None
+        self._lock = threading.Lock()
+        self._events = RateWindow()
+        self._api_calls = RateWindow()
+
+    def update(self, policy: dict) -> None:
+        self.policy = CompiledPolicy(policy)
+
+    def load_file(self, path: Path) -> None:
+        """Adopt a JSON policy file left by an earlier run, if there is one."""
+        try:
+            policy = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if isinstance(policy, dict):
+            self.update(policy)
+
+    def record(self, action: str) -> None:
+        """Count a forwarded event against the rate limits."""
+        now = time.monotonic()
+        with self._lock:
+            self._events.add(now)
+            if action in _EXTERNAL_API_ACTIONS:
+                self._api_calls.add(now)
+
+    def check(self, action: str) -> dict:
+        """Decide ``action``; denied with reason ``no_policy`` until one is loaded."""
+        policy = self.policy
+        reason = None
+        if action == "heartbeat":
+            pass
+        elif policy is None:
+            reason = "no_policy"
+        elif action in policy.denied:
+            reason = "denied_action"
+        elif policy.allowed and action not in policy.allowed:
+            reason = "not_in_allowed_actions"
+        else:
+            now = time.monotonic()
+            with self._lock:
+                if self._events.count(now) >= policy.limits[0]:
+                    reason = "events_per_minute"
+                elif (
+                    action in _EXTERNAL_API_ACTIONS
+                    and self._api_calls.count(now) >= policy.limits[1]
+                ):
+                    reason = "external_api_calls_per_minute"
+        metrics.inc(
+            "switchboard_sidecar_checks_total",
+            result="allowed" if reason is None else "denied",
+        )
+        return {"action": action, "allowed": reason is None, "reason": reason}
+
+
+# ---------------------------------------------------------------------------
+# Check-in (liveness, telemetry, policy version)
 # ---------------------------------------------------------------------------
 
 def _parse_optional_float(value: str | None) -> float | None:
@@ -309,67 +1261,657 @@ def _detect_remote_session(config: dict) -> bool:
     return False
 
 
-def _measure_switchboard_rtt_ms(config: dict) -> float | None:
-    """Measure network RTT to Switchboard health endpoint."""
-    url = f"{config['switchboard_url']}/health"
-    req = Request(url, method="GET")
-    start = perf_counter()
+# Answered by Switchboard ahead of routing; older servers only have /health
+_PROBE_PATHS = ("/probe", "/health")
+
+
+def probe_switchboard(config: dict) -> dict:
+    """Measure the network path to Switchboard with a burst of pings.
+
+    Sends ``probe_pings`` requests back to back over one keep-alive
+    connection and reports the median and fastest round trip, jitter (mean
+    difference between consecutive round trips, as in RFC 3550) and, when
+    the connection had to be opened first, its setup time, kept out of the
+    RTT figures. Values are None if Switchboard could not be reached.
+    """
+    result = {
+        "network_rtt_ms": None,
+        "network_rtt_min_ms": None,
+        "network_jitter_ms": None,
+        "network_connect_ms": None,
+    }
+    pool = _switchboard_pool(config)
+    if not pool.breaker.allow():
+        return result
+    count = max(1, int(config.get("probe_pings", 5)))
+    for path in _PROBE_PATHS:
+        try:
+            connect_ms, samples = pool.ping(path, count)
+        except (OSError, http.client.HTTPException) as e:
+            log.warning("RTT probe to %s failed: %s", config["switchboard_url"], e)
+            metrics.inc("switchboard_sidecar_probe_failures_total")
+            pool.breaker.failure()
+            return result
+        if samples and samples[0][0] == 404:
+            continue  # no probe endpoint: time /health instead
+        break
+    rtts = [rtt for status, rtt in samples if status < 400]
+    if not rtts:
+        metrics.inc("switchboard_sidecar_probe_failures_total")
+        return result
+    for rtt in rtts:
+        metrics.observe("switchboard_sidecar_probe_rtt_seconds", rtt / 1000.0)
+    result["network_rtt_ms"] = median(rtts)
+    result["network_rtt_min_ms"] = min(rtts)
+    result["network_jitter_ms"] = (
+        sum(abs(b - a) for a, b in zip(rtts, rtts[1:])) / (len(rtts) - 1)
+        if len(rtts) > 1
+        else 0.0
+    )
+    result["network_connect_ms"] = connect_ms
+    _last_probe.update(result)
+    return result
+
+
+# Latest successful probe, for the metrics gauges
+_last_probe: dict[str, float | None] = {}
+for _stat, _field in (
+    ("median", "network_rtt_ms"),
+    ("min", "network_rtt_min_ms"),
+    ("jitter", "network_jitter_ms"),
+    ("connect", "network_connect_ms"),
+):
+    metrics.callback(
+        "switchboard_sidecar_probe_last_seconds",
+        lambda field=_field: (
+            None if _last_probe.get(field) is None else _last_probe[field] / 1000.0
+        ),
+        stat=_stat,
+    )
+
+
+def _telemetry_sample(config: dict, probe: dict) -> dict:
+    """A telemetry payload around ``probe`` (from ``probe_switchboard``)."""
+    return {
+        "agent_id": config["agent_id"],
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "probe_source": "sidecar",
+        "telemetry_mode": config["telemetry_mode"],
+        **probe,
+        "is_remote_session": _detect_remote_session(config),
+        "observed_provider": config["observed_provider"] or None,
+        "observed_model": config["observed_model"] or None,
+        "observed_region": config["observed_region"] or None,
+        "sensor_hid_rtt_ms": _parse_optional_float(config.get("sensor_hid_rtt_ms")),
+        "sensor_dwell_ms": _parse_optional_float(config.get("sensor_dwell_ms")),
+        "sensor_os_jitter_ms": _parse_optional_float(config.get("sensor_os_jitter_ms")),
+    }
+
+
+def _send_heartbeat(config: dict) -> None:
+    event = {
+        "agent_id": config["agent_id"],
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "action": "heartbeat",
+        "target": "self",
+        "result": "success",
+    }
+    switchboard_request(config, "POST", "/api/v1/events", event, use_token=True)
+
+
+def _checkin(config: dict, telemetry: dict | None) -> tuple[int | None, int | None]:
+    """Send one check-in. Returns (status, policy version); status None if unreachable."""
+    body: dict = {"agent_id": config["agent_id"]}
+    if telemetry is not None:
+        body["telemetry"] = telemetry
+    result = _switchboard_open(config, "POST", "/api/v1/checkin", body, use_token=True)
+    if result is None:
+        return None, None
+    status, _, payload = result
+    if status < 300:
+        return status, json.loads(payload).get("policy_version")
+    if status not in (404, 405):
+        log.error(
+            "Switchboard POST /api/v1/checkin → %d: %s",
+            status, payload.decode(errors="replace")[:200],
+        )
+    return status, None
+
+
+def checkin_loop(
+    config: dict, stop_event: threading.Event, agents: list[HostedAgent]
+) -> None:
+    """Report liveness and telemetry to Switchboard, one request per agent per interval.
+
+    Every ``heartbeat_interval`` each agent checks in to prove liveness and,
+    once per ``telemetry_interval``, carries a telemetry sample with an RTT
+    probe (see ``probe_switchboard``). The probe measures the host's path to
+    Switchboard, so one per round serves every agent; several agents' check-ins
+    are spread over the interval. The reply names the current policy
+    version; when not long-polling, the policy is pulled only if that
+    version is new. A check-in with only liveness to report is skipped
+    while forwarded events already show the agent is alive.
+
+    Against a Switchboard without ``/api/v1/checkin`` this falls back to a
+    heartbeat event, a telemetry post, and a conditional policy poll per
+    interval.
+    """
+    interval = config["heartbeat_interval"]
+    telemetry_interval = max(5, int(config["telemetry_interval"]))
+    long_polling = int(config.get("policy_wait", 0)) > 0
+    combined = True
+
+    # Start at a random offset so a fleet started together stays spread out
+    stop_event.wait(random.uniform(0, interval))
+    while not stop_event.is_set():
+        probe = None
+        for agent in agents:
+            now = time.monotonic()
+            telemetry_due = now >= agent.next_telemetry
+            # Without telemetry to send, recent events already proved liveness
+            if telemetry_due or now - agent.batcher.last_delivered >= interval:
+                telemetry = None
+                if telemetry_due:
+                    if probe is None:
+                        probe = probe_switchboard(config)
+                    telemetry = _telemetry_sample(agent.config, probe)
+
+                policy_version = None
+                delivered = False
+                if combined:
+                    status, policy_version = _checkin(agent.config, telemetry)
+                    delivered = status is not None and status < 300
+                    if status in (404, 405):
+                        log.info(
+                            "Switchboard has no check-in endpoint; "
+                            "sending heartbeats and telemetry separately"
+                        )
+                        combined = False
+                if not combined:
+                    _send_heartbeat(agent.config)
+                    if telemetry is not None:
+                        delivered = switchboard_request(
+                            agent.config, "POST", "/api/v1/telemetry", telemetry,
+                            use_token=True,
+                        ) is not None
+                    policy_version = -1  # unknown: poll (conditionally)
+                if delivered and telemetry is not None:
+                    agent.next_telemetry = now + telemetry_interval
+
+                current = agent.decider.policy.version if agent.decider.policy else None
+                if not long_polling and policy_version is not None and policy_version != current:
+                    refresh_policy(agent)
+            if stop_event.wait(_jittered(interval) / len(agents)):
+                return
+
+
+# ---------------------------------------------------------------------------
+# Event spool (outage buffer on local disk)
+# ---------------------------------------------------------------------------
+
+class EventSpool:
+    """Append-only on-disk queue of events that could not be forwarded.
+
+    Events are written as JSON lines to numbered segment files
+    (``000000000001.ndjson``, ...); a new segment starts every
+    ``segment_bytes``. A ``cursor`` file records how far replay has got
+    (segment and byte offset), so a restarted sidecar resumes where it left
+    off. Delivery is at-least-once: a crash between a send and the cursor
+    update replays that batch again.
+
+    When segments on disk exceed ``max_bytes``, the oldest segment is
+    deleted and its unreplayed events are counted as dropped. Only the
+    batcher's flush thread uses a spool; it is not thread-safe.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int, segment_bytes: int = 4 << 20):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.max_bytes = max(max_bytes, 2 * segment_bytes)
+        self.counters = {"spooled": 0, "replayed": 0, "dropped": 0}
+        directory.mkdir(parents=True, exist_ok=True)
+        self._cursor_path = directory / "cursor"
+        self._writer = None
+
+        segments = sorted(int(p.stem) for p in directory.glob("*.ndjson"))
+        self._cursor = (segments[0] if segments else 1, 0)
+        try:
+            seq, offset = self._cursor_path.read_text().split()
+            self._cursor = (int(seq), int(offset))
+        except (OSError, ValueError):
+            pass
+        for seq in segments:
+            if seq < self._cursor[0]:
+                self._segment_path(seq).unlink(missing_ok=True)  # already replayed
+        self._segments = [seq for seq in segments if seq >= self._cursor[0]]
+        self.pending = sum(1 for _ in self._lines(self._cursor, None))
+
+    def _segment_path(self, seq: int) -> Path:
+        return self.directory / f"{seq:012d}.ndjson"
+
+    def size(self) -> int:
+        return sum(
+            self._segment_path(seq).stat().st_size
+            for seq in self._segments
+            if self._segment_path(seq).exists()
+        )
+
+    def append(self, events: list[dict]) -> None:
+        """Write ``events`` behind everything already spooled, then fsync."""
+        data = b"".join(json.dumps(e).encode() + b"\n" for e in events)
+        if self._writer is None or self._writer.tell() >= self.segment_bytes:
+            self._rotate()
+        self._writer.write(data)
+        self._writer.flush()
+        os.fsync(self._writer.fileno())
+        self.pending += len(events)
+        self.counters["spooled"] += len(events)
+        self._enforce_cap()
+
+    def _rotate(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        # Never reopen an old segment: it may end in a torn write
+        seq = self._segments[-1] + 1 if self._segments else self._cursor[0]
+        self._segments.append(seq)
+        self._writer = open(self._segment_path(seq), "ab")  # noqa: SIM115 - held open across appends
+
+    def _enforce_cap(self) -> None:
+        while len(self._segments) > 1 and self.size() > self.max_bytes:
+            oldest = self._segments[0]
+            start = self._cursor if self._cursor[0] == oldest else (oldest, 0)
+            lost = sum(1 for _ in self._lines(start, oldest))
+            self._segments.pop(0)
+            self._segment_path(oldest).unlink(missing_ok=True)
+            self.pending -= lost
+            self.counters["dropped"] += lost
+            if self._cursor[0] <= oldest:
+                self._set_cursor((self._segments[0], 0))
+            log.warning("Spool over %d bytes: dropped %d oldest events", self.max_bytes, lost)
+
+    def _lines(self, start: tuple[int, int], only: int | None):
+        """Yield (raw line, position after it) from ``start``; complete lines only."""
+        seq, offset = start
+        for segment in self._segments:
+            if segment < seq or (only is not None and segment != only):
+                continue
+            try:
+                with open(self._segment_path(segment), "rb") as fh:
+                    fh.seek(offset if segment == seq else 0)
+                    for line in fh:
+                        if not line.endswith(b"\n"):
+                            break  # torn final write
+                        yield line, (segment, fh.tell())
+            except OSError:
+                continue
+
+    def peek(self, limit: int) -> list[tuple[dict | None, tuple[int, int]]]:
+        """Up to ``limit`` oldest unreplayed entries: (event, position after it).
+
+        Unparseable lines come back as ``None`` so they can be committed (and
+        counted as dropped) along with their neighbours.
+        """
+        entries = []
+        for line, position in self._lines(self._cursor, None):
+            try:
+                event = json.loads(line)
+            except ValueError:
+                event = None
+            entries.append((event, position))
+            if len(entries) >= limit:
+                break
+        return entries
+
+    def commit(self, entries: list[tuple[dict | None, tuple[int, int]]]) -> None:
+        """Mark ``entries`` (a prefix of ``peek``) as delivered."""
+        if not entries:
+            return
+        replayed = sum(1 for event, _ in entries if event is not None)
+        self.counters["replayed"] += replayed
+        self.counters["dropped"] += len(entries) - replayed
+        self.pending -= len(entries)
+        self._set_cursor(entries[-1][1])
+        # Delete segments replay has moved past
+        while len(self._segments) > 1 and self._segments[0] < self._cursor[0]:
+            self._segment_path(self._segments.pop(0)).unlink(missing_ok=True)
+        if self.pending == 0:
+            # Fully drained: start over with a fresh segment
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+            for seq in self._segments:
+                self._segment_path(seq).unlink(missing_ok=True)
+            next_seq = self._segments[-1] + 1 if self._segments else self._cursor[0] + 1
+            self._segments = []
+            self._set_cursor((next_seq, 0))
+
+    def _set_cursor(self, cursor: tuple[int, int]) -> None:
+        self._cursor = cursor
+        tmp = self._cursor_path.with_suffix(".tmp")
+        tmp.write_text(f"{cursor[0]} {cursor[1]}\n")
+        os.replace(tmp, self._cursor_path)
+
+    def stats(self) -> dict:
+        return {"pending": self.pending, "bytes": self.size(), **self.counters}
+
+
+def open_spool(config: dict) -> EventSpool | None:
+    """The configured spool, or None (events then wait in memory only)."""
+    base = str(config.get("spool_dir") or "").strip()
+    if not base:
+        return None
+    directory = Path(base) / config["agent_id"]
     try:
-        with urlopen(req, timeout=5) as resp:
-            resp.read(32)
-        return (perf_counter() - start) * 1000.0
-    except Exception:
+        spool = EventSpool(directory, int(config["spool_max_mb"]) << 20)
+    except OSError as e:
+        log.warning("Event spool disabled (%s); set SPOOL_DIR to a writable path", e)
         return None
+    if spool.pending:
+        log.info("Spool holds %d undelivered events; replaying them first", spool.pending)
+    return spool
 
 
-def telemetry_loop(config: dict, stop_event: threading.Event) -> None:
-    """Send telemetry signals for integrity checks."""
-    interval = max(5, int(config["telemetry_interval"]))
-    rtt_samples: deque[float] = deque(maxlen=20)
+# ---------------------------------------------------------------------------
+# Event batching
+# ---------------------------------------------------------------------------
 
-    while not stop_event.is_set():
-        rtt_ms = _measure_switchboard_rtt_ms(config)
-        if rtt_ms is not None:
-            rtt_samples.append(rtt_ms)
-
-        jitter_ms = None
-        if len(rtt_samples) >= 2:
-            jitter_ms = float(pstdev(rtt_samples))
-        elif len(rtt_samples) == 1:
-            jitter_ms = 0.0
-
-        payload = {
-            "agent_id": config["agent_id"],
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-            "probe_source": "sidecar",
-            "telemetry_mode": config["telemetry_mode"],
-            "network_rtt_ms": rtt_ms,
-            "network_jitter_ms": jitter_ms,
-            "is_remote_session": _detect_remote_session(config),
-            "observed_provider": config["observed_provider"] or None,
-            "observed_model": config["observed_model"] or None,
-            "observed_region": config["observed_region"] or None,
-            "sensor_hid_rtt_ms": _parse_optional_float(config.get("sensor_hid_rtt_ms")),
-            "sensor_dwell_ms": _parse_optional_float(config.get("sensor_dwell_ms")),
-            "sensor_os_jitter_ms": _parse_optional_float(config.get("sensor_os_jitter_ms")),
-        }
+class EventBatcher:
+    """Buffers agent events and forwards them to Switchboard in batches.
+
+    ``submit`` only enqueues, so the agent's call returns immediately. A
+    flush thread sends up to ``event_batch_size`` events per request to
+    ``POST /api/v1/events/batch``, waiting at most ``event_linger_ms`` after
+    the first queued event for more to arrive. Failed batches are retried
+    while new events queue up behind them; once the queue is full, ``submit``
+    refuses events so the agent sees back-pressure instead of silent loss.
+
+    With a ``spool``, a batch that cannot be delivered goes to disk instead,
+    and every later event follows it there until the backlog has been
+    replayed in order, so an outage neither blocks agents nor loses events.
+    """
+
+    def __init__(self, config: dict, spool: EventSpool | None = None):
+        self.config = config
+        self.spool = spool
+        # time.monotonic() of the last successful delivery; proves liveness
+        self.last_delivered = 0.0
+        self.queue: queue.Queue[dict] = queue.Queue(
+            maxsize=max(1, int(config["event_queue_size"]))
+        )
+        self.batch_size = max(1, int(config["event_batch_size"]))
+        self.linger = max(0, int(config["event_linger_ms"])) / 1000.0
+        self.backoff = Backoff(cap=float(config.get("backoff_max", 60)))
+        # Cleared when Switchboard predates the batch endpoint
+        self.batch_endpoint = True
+        self._thread: threading.Thread | None = None
+        self._stopping = threading.Event()
+
+    def submit(self, event: dict) -> bool:
+        """Queue ``event``; False if the queue is full."""
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            return False
+        return True
 
-        switchboard_request(config, "POST", "/api/v1/telemetry", payload, use_token=True)
-        stop_event.wait(interval)
+    def depth(self) -> int:
+        return self.queue.qsize()
 
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="event-flush", daemon=True)
+        self._thread.start()
 
-def heartbeat_loop(config: dict, stop_event: threading.Event) -> None:
-    """Send periodic heartbeats to Switchboard."""
-    while not stop_event.is_set():
-        event = {
-            "agent_id": config["agent_id"],
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-            "action": "heartbeat",
-            "target": "self",
-            "result": "success",
-        }
-        switchboard_request(config, "POST", "/api/v1/events", event, use_token=True)
-        stop_event.wait(config["heartbeat_interval"])
+    def stop(self) -> None:
+        """Start shutting down without waiting; ``close`` waits."""
+        self._stopping.set()
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Flush what is queued (one attempt per batch, or to the spool), then stop."""
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        dropped = self.depth()
+        if dropped:
+            log.warning("Dropped %d queued events on shutdown", dropped)
+
+    def _next_batch(self) -> list[dict]:
+        """Block for one event, then gather more until full or lingered out."""
+        try:
+            batch = [self.queue.get(timeout=0.5)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.linger
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0 or self._stopping.is_set():
+                    batch.append(self.queue.get_nowait())
+                else:
+                    batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            stopping = self._stopping.is_set()
+            if self.spool is not None and self.spool.pending:
+                # Keep order: new events join the backlog on disk
+                self._spool_queued()
+                if stopping:
+                    return
+                if not self._replay():
+                    metrics.inc("switchboard_sidecar_retries_total", cause="events")
+                    self._stopping.wait(self.backoff.next())
+                    continue
+                self.backoff.reset()
+                if not self.spool.pending:
+                    log.info("Spool drained; forwarding directly again")
+                continue
+
+            batch = self._next_batch()
+            if not batch:
+                if stopping:
+                    return
+                continue
+            while not self.send(batch):
+                if self.spool is not None:
+                    log.warning(
+                        "Switchboard unreachable; spooling events to %s",
+                        self.spool.directory,
+                    )
+                    self.spool.append(batch)
+                    break
+                # Shutting down: one attempt only
+                metrics.inc("switchboard_sidecar_retries_total", cause="events")
+                if self._stopping.wait(self.backoff.next()):
+                    log.warning("Dropped %d events: Switchboard unreachable", len(batch))
+                    break
+            else:
+                self.backoff.reset()  # delivered
+
+    def _spool_queued(self) -> None:
+        batch = []
+        while True:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        if batch:
+            self.spool.append(batch)
+
+    def _replay(self) -> bool:
+        """Send the oldest spooled batch; False if Switchboard is still down."""
+        entries = self.spool.peek(self.batch_size)
+        batch = [event for event, _ in entries if event is not None]
+        total = len(batch)
+        delivered = self.send(batch) if batch else True
+        # ``send`` trims ``batch`` to what is still unsent
+        sent = total if delivered else total - len(batch)
+        done = len(entries)
+        if not delivered:
+            done = 0
+            for i, (event, _) in enumerate(entries):
+                if event is not None:
+                    if sent == 0:
+                        break
+                    sent -= 1
+                done = i + 1
+        self.spool.commit(entries[:done])
+        return delivered
+
+    def send(self, batch: list[dict]) -> bool:
+        """Forward ``batch``; False if it should be retried.
+
+        Events Switchboard refuses outright (4xx) are logged and not retried.
+        A ``401``/``403`` refuses the sidecar's token, not the events, so the
+        batch is kept for a retry (or the spool) like an outage.
+        """
+        if self.batch_endpoint:
+            result = _switchboard_open(
+                self.config,
+                "POST",
+                "/api/v1/events/batch",
+                {"events": batch},
+                use_token=True,
+            )
+            if result is None:
+                return False
+            status, _, payload = result
+            if status < 300:
+                self.last_delivered = time.monotonic()
+                metrics.inc("switchboard_sidecar_events_forwarded_total", len(batch))
+                return True
+            if status in (404, 405):
+                log.info("Switchboard has no batch endpoint; forwarding events one by one")
+                self.batch_endpoint = False
+            elif status != 422:
+                log.error(
+                    "Switchboard POST /api/v1/events/batch → %d: %s",
+                    status, payload.decode(errors="replace")[:200],
+                )
+                if status >= 500 or status in _AUTH_STATUSES:
+                    return False
+                metrics.inc("switchboard_sidecar_events_refused_total", len(batch))
+                return True
+            # 422: some event is invalid; send singly so only it is lost
+
+        for i, event in enumerate(batch):
+            result = _switchboard_open(
+                self.config, "POST", "/api/v1/events", event, use_token=True
+            )
+            if result is None or result[0] >= 500 or result[0] in _AUTH_STATUSES:
+                del batch[:i]  # keep only what is still unsent for the retry
+                return False
+            if result[0] < 400:
+                metrics.inc("switchboard_sidecar_events_forwarded_total")
+            else:
+                metrics.inc("switchboard_sidecar_events_refused_total")
+                log.warning(
+                    "Switchboard rejected event %s → %d: %s",
+                    event.get("action"), result[0],
+                    result[2].decode(errors="replace")[:200],
+                )
+        self.last_delivered = time.monotonic()
+        return True
+
+
+# ---------------------------------------------------------------------------
+# Hosted agents
+# ---------------------------------------------------------------------------
+
+class HostedAgent:
+    """An agent this sidecar serves: its config, local policy and event queue.
+
+    A sidecar normally serves the one agent in its config. In host-daemon
+    mode (``agents_dir``) one process serves every agent on the host; they
+    share the connection pool, the listener, the check-in thread and one
+    bulk policy long-poll, so each extra agent costs a queue and its flush
+    thread.
+    """
+
+    def __init__(self, config: dict):
+        self.config = config
+        self.agent_id = config["agent_id"]
+        self.decider = PolicyDecider()
+        self.batcher = EventBatcher(config, open_spool(config))
+        # Kept by checkin_loop and refresh_policy
+        self.next_telemetry = 0.0
+        self.policy_etag: str | None = None
+        # Set by pull_policies when Switchboard refuses this agent's token
+        self.token_refused = False
+
+
+# ---------------------------------------------------------------------------
+# Claude Code hook payloads
+# ---------------------------------------------------------------------------
+
+def _pre_tool_target(tool: str, tool_input: dict) -> str:
+    if tool == "Bash":
+        return str(tool_input.get("command") or "-")[:120]
+    if tool in ("Read", "Write", "Edit"):
+        return str(tool_input.get("file_path") or "-")
+    if tool == "Grep":
+        pattern = str(tool_input.get("pattern") or "")
+        return f"grep:{pattern[:40]} in {tool_input.get('path') or '.'}"
+    if tool == "Glob":
+        return str(tool_input.get("pattern") or "-")
+    if tool == "WebSearch":
+        return str(tool_input.get("query") or "-")[:80]
+    if tool in ("Task", "TaskCreate", "TaskUpdate"):
+        return str(
+            tool_input.get("description")
+            or tool_input.get("subject")
+            or tool_input.get("taskId")
+            or "-"
+        )[:80]
+    return next(iter(sorted(tool_input)), "-")
+
+
+def hook_event(payload: dict, agent_id: str) -> dict | None:
+    """``agent_id``'s event for a Claude Code hook payload; None if not reported.
+
+    examples/hooks/claude-code-hook.py relays the payload untouched, so the
+    hook process never parses JSON; the mapping matches
+    examples/hooks/claude-code-hook.sh.
+    """
+    name = payload.get("hook_event_name")
+    tool = str(payload.get("tool_name") or "")
+    tool_input = payload.get("tool_input")
+    if not isinstance(tool_input, dict):
+        tool_input = {}
+    session = str(payload.get("session_id") or "")[:12]
+    cwd = payload.get("cwd") or ""
+
+    if name == "PreToolUse":
+        action, target, result = tool, _pre_tool_target(tool, tool_input), "pending"
+        detail = f"session:{session} cwd:{cwd}"
+    elif name in ("PostToolUse", "PostToolUseFailure"):
+        action, result = tool, "success" if name == "PostToolUse" else "failure"
+        target = str(
+            tool_input.get("file_path")
+            or tool_input.get("command")
+            or tool_input.get("pattern")
+            or "-"
+        )[:120]
+        detail = f"session:{session}"
+    elif name == "Stop":
+        action, target, result = "turn_complete", f"session:{session}", "success"
+        detail = f"cwd:{cwd}"
+    elif name == "SessionStart":
+        action, target, result, detail = "session_start", agent_id, "success", f"cwd:{cwd}"
+    elif name == "SessionEnd":
+        action, target, result = "session_end", agent_id, "success"
+        detail = f"session:{session}"
+    else:
+        return None
+    return {
+        "agent_id": agent_id,
+        "action": action,
+        "target": target,
+        "result": result,
+        "detail": detail,
+    }
 
 
 # ---------------------------------------------------------------------------
@@ -377,12 +1919,125 @@ def heartbeat_loop(config: dict, stop_event: threading.Event) -> None:
 # ---------------------------------------------------------------------------
 
 class EventHandler(BaseHTTPRequestHandler):
-    """Accepts events from the agent on localhost and forwards to Switchboard."""
-
-    config: dict = {}
+    """Accepts events from agents on localhost and queues them for Switchboard.
+
+    In host-daemon mode each request names its agent: ``agent_id`` in the
+    event body, or ``?agent_id=`` on any path.
+
+    On the Unix socket, a connection whose first byte is ``{`` speaks
+    newline-delimited JSON instead of HTTP: one event per line, each
+    answered with one line carrying the body ``POST /events`` would return.
+
+    Either way, an event with ``hook_event_name`` is a Claude Code hook
+    payload and is mapped by ``hook_event`` before it is queued.
+    """
+
+    agents: dict[str, HostedAgent] = {}
+    host_mode = False
+    # Seconds a connection may sit idle before its worker gives up on it.
+    # Agents send as soon as they connect, so this is short: until it runs
+    # out, an idle or stalled client holds one of the fixed pool's workers.
+    timeout = 2
+    # Listener paths timed individually in the metrics; others share "other"
+    _TIMED_PATHS = frozenset({"/events", "/check", "/policy", "/health", "/metrics"})
+
+    def handle_one_request(self):
+        started = perf_counter()
+        self.path = ""
+        super().handle_one_request()
+        if self.path:
+            path = self.path.partition("?")[0]
+            metrics.observe(
+                "switchboard_sidecar_listener_request_seconds",
+                perf_counter() - started,
+                path=path if path in self._TIMED_PATHS else "other",
+            )
+
+    def handle(self):
+        if self.server.address_family == socket.AF_UNIX:
+            try:
+                ndjson = self.rfile.peek(1)[:1] == b"{"
+            except OSError:
+                return
+            if ndjson:
+                # Hand the connection, and what is already read of it, to
+                # the NDJSON loop; this worker's close no longer reaches it
+                buffered = self.rfile.peek()
+                self.server.ndjson.adopt(
+                    socket.socket(fileno=self.request.detach()), buffered
+                )
+                return
+        super().handle()
+
+    @classmethod
+    def ndjson_reply(cls, line: bytes) -> bytes:
+        """The reply line for one NDJSON request line; empty for a blank one."""
+        if not line.strip():
+            return b""
+        started = perf_counter()
+        try:
+            event = json.loads(line)
+        except ValueError:
+            event = None
+        if isinstance(event, dict):
+            _, payload = cls._enqueue(event, "")
+        else:
+            payload = {"ok": False, "error": "Event must be a JSON object"}
+        metrics.observe(
+            "switchboard_sidecar_listener_request_seconds",
+            perf_counter() - started,
+            path="ndjson",
+        )
+        return json.dumps(payload).encode() + b"\n"
+
+    @classmethod
+    def _resolve(cls, agent_id: str) -> tuple[HostedAgent | None, int, dict]:
+        """``(agent, 200, {})`` for the agent a request is for, else the error."""
+        if not cls.host_mode:
+            return next(iter(cls.agents.values())), 200, {}
+        if not agent_id:
+            return None, 400, {"ok": False, "error": "Missing agent_id"}
+        agent = cls.agents.get(agent_id)
+        if agent is None:
+            return None, 404, {"ok": False, "error": f"Unknown agent '{agent_id}'"}
+        return agent, 200, {}
+
+    def _agent(self, agent_id: str) -> HostedAgent | None:
+        """The agent a request is for; None (already answered) if unknown."""
+        agent, status, error = self._resolve(agent_id)
+        if agent is None:
+            self._send_json(status, error)
+        return agent
+
+    @classmethod
+    def _enqueue(cls, event: dict, agent_id: str) -> tuple[int, dict]:
+        """Queue ``event`` for its agent; returns the status and body to answer."""
+        agent, status, error = cls._resolve(str(event.get("agent_id") or agent_id))
+        if agent is None:
+            return status, error
+        if "hook_event_name" in event:
+            event = hook_event(event, agent.agent_id)
+            if event is None:
+                return 200, {"ok": True, "queued": False}
+        # Ensure agent_id matches
+        event["agent_id"] = agent.agent_id
+        # Stamp now, not when the batch is flushed
+        event.setdefault("timestamp", datetime.now(timezone.utc).isoformat())
+
+        if not agent.batcher.submit(event):
+            metrics.inc("switchboard_sidecar_events_rejected_total")
+            return 503, {
+                "ok": False,
+                "error": "Event queue full",
+                "queue_depth": agent.batcher.depth(),
+            }
+        metrics.inc("switchboard_sidecar_events_received_total")
+        agent.decider.record(str(event.get("action", "")))
+        return 202, {"ok": True, "queued": True}
 
     def do_POST(self):
-        if self.path != "/events":
+        path, _, query = self.path.partition("?")
+        if path != "/events":
             self.send_error(404)
             return
 
@@ -397,81 +2052,439 @@ class EventHandler(BaseHTTPRequestHandler):
         except json.JSONDecodeError:
             self.send_error(400, "Invalid JSON")
             return
+        if not isinstance(event, dict):
+            self.send_error(400, "Event must be a JSON object")
+            return
 
-        # Ensure agent_id matches
-        event["agent_id"] = self.config["agent_id"]
-
-        # Forward to Switchboard
-        result = switchboard_request(
-            self.config, "POST", "/api/v1/events", event, use_token=True
-        )
-
-        if result:
-            self.send_response(200)
-            self.send_header("Content-Type", "application/json")
-            self.end_headers()
-            self.wfile.write(json.dumps(result).encode())
-        else:
-            self.send_error(502, "Failed to forward event to Switchboard")
+        status, payload = self._enqueue(event, parse_qs(query).get("agent_id", [""])[0])
+        self._send_json(status, payload, {"Retry-After": "1"} if status == 503 else None)
+
+    def _send_json(self, status: int, payload: dict, headers: dict | None = None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _health(self) -> dict:
+        if not self.host_mode:
+            agent = next(iter(self.agents.values()))
+            health = {
+                "status": "healthy",
+                "agent_id": agent.agent_id,
+                "queue_depth": agent.batcher.depth(),
+            }
+            if agent.batcher.spool is not None:
+                health["spool"] = agent.batcher.spool.stats()
+            return health
+        agents = {}
+        for agent in self.agents.values():
+            agents[agent.agent_id] = {
+                "queue_depth": agent.batcher.depth(),
+                "policy_version": agent.decider.policy.version if agent.decider.policy else None,
+            }
+            if agent.batcher.spool is not None:
+                agents[agent.agent_id]["spool"] = agent.batcher.spool.stats()
+        return {
+            "status": "healthy",
+            "queue_depth": sum(a["queue_depth"] for a in agents.values()),
+            "agents": agents,
+        }
 
     def do_GET(self):
         if self.path == "/health":
+            self._send_json(200, self._health())
+            return
+
+        if self.path == "/metrics":
+            body = metrics.render().encode()
             self.send_response(200)
-            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
             self.end_headers()
-            self.wfile.write(json.dumps({
-                "status": "healthy",
-                "agent_id": self.config.get("agent_id", ""),
-            }).encode())
+            self.wfile.write(body)
             return
 
-        if self.path == "/policy":
-            policy_path = Path(self.config["policy_path"])
-            if policy_path.exists():
-                self.send_response(200)
-                self.send_header("Content-Type", "application/json")
-                self.end_headers()
-                self.wfile.write(policy_path.read_bytes())
-            else:
-                self.send_error(404, "Policy not yet synced")
+        path, _, query = self.path.partition("?")
+        if path not in ("/policy", "/check"):
+            self.send_error(404)
+            return
+        params = parse_qs(query)
+        agent = self._agent(params.get("agent_id", [""])[0])
+        if agent is None:
+            return
+
+        if path == "/check":
+            self._check(agent, params)
             return
 
-        self.send_error(404)
+        policy = agent.decider.policy
+        if policy is None:
+            self.send_error(404, "Policy not yet synced")
+            return
+        wanted = self.headers.get("If-None-Match", "")
+        if policy.etag in {tag.strip().removeprefix("W/") for tag in wanted.split(",")}:
+            self.send_response(304)
+            self.send_header("ETag", policy.etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(policy.body)))
+        self.send_header("ETag", policy.etag)
+        self.end_headers()
+        self.wfile.write(policy.body)
+
+    def _check(self, agent: HostedAgent, params: dict[str, list[str]]) -> None:
+        """``?action=x`` decides one action; ``?actions=x,y,z`` decides several."""
+        decider = agent.decider
+        policy = decider.policy
+        if policy is None:
+            self._send_json(
+                503, {"ok": False, "error": "Policy not yet synced"}, {"Retry-After": "1"}
+            )
+            return
+        if "actions" in params:
+            actions = [a for v in params["actions"] for a in v.split(",") if a]
+            self._send_json(200, {
+                "policy_version": policy.version,
+                "results": [decider.check(a) for a in actions],
+            })
+            return
+        action = params.get("action", [""])[0]
+        if not action:
+            self._send_json(400, {"ok": False, "error": "Missing action"})
+            return
+        self._send_json(200, {"policy_version": policy.version, **decider.check(action)})
 
     def log_message(self, format, *args):
         """Suppress default request logging — we use our own."""
         pass
 
 
+class ListenerServer(HTTPServer):
+    """Local listener that serves agent connections on a fixed worker pool.
+
+    The accept loop hands each connection to one of ``workers`` threads
+    through a bounded backlog, so a slow request never stalls other agents
+    and a flood cannot spawn unbounded threads. When the backlog is full the
+    connection gets an immediate 503.
+    """
+
+    # Kernel accept backlog; the socketserver default of 5 drops connection
+    # bursts into SYN retries (a one-second stall each)
+    request_queue_size = 128
+
+    def __init__(self, address, handler, workers: int = 8):
+        super().__init__(address, handler)
+        workers = max(1, workers)
+        self.backlog: queue.Queue = queue.Queue(maxsize=workers * 16)
+        for i in range(workers):
+            threading.Thread(
+                target=self._work, name=f"listener-{i}", daemon=True
+            ).start()
+
+    def process_request(self, request, client_address):
+        try:
+            self.backlog.put_nowait((request, client_address))
+        except queue.Full:
+            self._reject(request)
+
+    def _work(self) -> None:
+        while True:
+            request, client_address = self.backlog.get()
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+
+    def _reject(self, request) -> None:
+        body = json.dumps({
+            "ok": False,
+            "error": "Listener busy",
+            "queue_depth": self.backlog.qsize(),
+        }).encode()
+        try:
+            request.sendall(
+                b"HTTP/1.0 503 Service Unavailable\r\n"
+                b"Content-Type: application/json\r\n"
+                b"Retry-After: 1\r\n"
+                + f"Content-Length: {len(body)}\r\n\r\n".encode()
+                + body
+            )
+        except OSError:
+            pass
+        self.shutdown_request(request)
+
+
+class _NdjsonConnection:
+    """Buffers of one NDJSON connection served by ``NdjsonLoop``."""
+
+    __slots__ = ("eof", "events", "inbox", "last_active", "outbox", "sock")
+
+    def __init__(self, sock: socket.socket, buffered: bytes):
+        self.sock = sock
+        self.inbox = bytearray(buffered)
+        self.outbox = bytearray()
+        self.last_active = time.monotonic()
+        self.eof = False
+        self.events = selectors.EVENT_READ
+
+
+class NdjsonLoop:
+    """Serves NDJSON connections on one thread, outside the worker pool.
+
+    A listener worker only recognises the protocol and hands the socket
+    over with ``adopt``, so open connections, idle or busy, never hold one
+    of the fixed workers. Each complete line is answered with
+    ``reply(line)``, which only queues in memory; a connection is closed
+    once it idles for ``idle_timeout`` seconds, sends a line longer than
+    ``MAX_LINE`` or leaves more than ``MAX_UNSENT`` bytes of replies unread.
+    """
+
+    MAX_CONNECTIONS = 1024
+    MAX_LINE = 1 << 20
+    MAX_UNSENT = 1 << 20
+
+    def __init__(self, reply, idle_timeout: float = 60.0):
+        self._reply = reply
+        self.idle_timeout = idle_timeout
+        self._selector = selectors.DefaultSelector()
+        self._adopted: queue.SimpleQueue = queue.SimpleQueue()
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+        self._selector.register(self._wake_r, selectors.EVENT_READ)
+        self._connections: dict[socket.socket, _NdjsonConnection] = {}
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="listener-ndjson", daemon=True)
+        self._thread.start()
+
+    def adopt(self, sock: socket.socket, buffered: bytes = b"") -> None:
+        """Serve ``sock`` from now on; ``buffered`` is what was already read."""
+        self._adopted.put((sock, buffered))
+        self._wake()
+
+    def close(self) -> None:
+        """Stop the loop and close every connection it serves."""
+        self._closed = True
+        self._wake()
+        self._thread.join(timeout=5)
+
+    def _wake(self) -> None:
+        try:
+            self._wake_w.send(b"\0")
+        except OSError:
+            pass  # already woken (buffer full) or closed
+
+    def _run(self) -> None:
+        try:
+            while not self._closed:
+                for key, mask in self._selector.select(timeout=min(1.0, self.idle_timeout)):
+                    if key.fileobj is self._wake_r:
+                        self._take_adopted()
+                        continue
+                    conn = key.data
+                    if mask & selectors.EVENT_READ:
+                        self._read(conn)
+                    if mask & selectors.EVENT_WRITE and conn.sock in self._connections:
+                        self._flush(conn)
+                self._drop_idle()
+        finally:
+            self._take_adopted()
+            for conn in list(self._connections.values()):
+                self._drop(conn)
+            self._selector.close()
+            self._wake_r.close()
+            self._wake_w.close()
+
+    def _take_adopted(self) -> None:
+        try:
+            while self._wake_r.recv(4096):
+                pass
+        except OSError:
+            pass
+        while True:
+            try:
+                sock, buffered = self._adopted.get_nowait()
+            except queue.Empty:
+                return
+            if self._closed or len(self._connections) >= self.MAX_CONNECTIONS:
+                try:
+                    sock.sendall(b'{"ok": false, "error": "Listener busy"}\n')
+                except OSError:
+                    pass
+                sock.close()
+                continue
+            sock.setblocking(False)
+            conn = _NdjsonConnection(sock, buffered)
+            self._connections[sock] = conn
+            self._selector.register(sock, selectors.EVENT_READ, conn)
+            self._answer(conn)
+
+    def _read(self, conn: _NdjsonConnection) -> None:
+        try:
+            data = conn.sock.recv(65536)
+        except BlockingIOError:
+            return
+        except OSError:
+            self._drop(conn)
+            return
+        conn.last_active = time.monotonic()
+        if data:
+            conn.inbox += data
+        else:
+            # The agent is done sending; a last line may lack its newline
+            conn.eof = True
+            conn.inbox += b"\n"
+        self._answer(conn)
+
+    def _answer(self, conn: _NdjsonConnection) -> None:
+        end = conn.inbox.rfind(b"\n") + 1
+        for line in bytes(conn.inbox[:end]).split(b"\n")[:-1]:
+            conn.outbox += self._reply(line)
+        del conn.inbox[:end]
+        if len(conn.inbox) > self.MAX_LINE:
+            self._drop(conn)
+            return
+        self._flush(conn)
+
+    def _flush(self, conn: _NdjsonConnection) -> None:
+        if conn.outbox:
+            try:
+                sent = conn.sock.send(conn.outbox)
+            except BlockingIOError:
+                sent = 0
+            except OSError:
+                self._drop(conn)  # the agent closed without reading replies
+                return
+            del conn.outbox[:sent]
+        if len(conn.outbox) > self.MAX_UNSENT or (conn.eof and not conn.outbox):
+            self._drop(conn)
+            return
+        events = 0 if conn.eof else selectors.EVENT_READ
+        if conn.outbox:
+            events |= selectors.EVENT_WRITE
+        if events != conn.events:
+            conn.events = events
+            self._selector.modify(conn.sock, events, conn)
+
+    def _drop_idle(self) -> None:
+        cutoff = time.monotonic() - self.idle_timeout
+        for conn in list(self._connections.values()):
+            if conn.last_active < cutoff:
+                self._drop(conn)
+
+    def _drop(self, conn: _NdjsonConnection) -> None:
+        if self._connections.pop(conn.sock, None) is None:
+            return
+        self._selector.unregister(conn.sock)
+        conn.sock.close()
+
+
+class UnixListenerServer(ListenerServer):
+    """``ListenerServer`` on a Unix domain socket.
+
+    Skips loopback TCP, and only processes that can open the socket file can
+    reach it, unlike a port other containers on the host network can hit.
+    NDJSON connections are served by ``ndjson``, not the worker pool.
+    """
+
+    address_family = socket.AF_UNIX
+
+    def __init__(self, address, handler, workers: int = 8):
+        super().__init__(address, handler, workers)
+        self.ndjson = NdjsonLoop(handler.ndjson_reply)
+
+    def server_bind(self):
+        path = Path(self.server_address)
+        if path.is_socket():
+            path.unlink()  # left behind by an earlier run
+        path.parent.mkdir(parents=True, exist_ok=True)
+        socketserver.TCPServer.server_bind(self)
+        self.server_name, self.server_port = "localhost", 0
+
+    def server_close(self):
+        super().server_close()
+        self.ndjson.close()
+        Path(self.server_address).unlink(missing_ok=True)
+
+
 # ---------------------------------------------------------------------------
 # Main
 # ---------------------------------------------------------------------------
 
+def _register_gauges(config: dict, agents: list[HostedAgent], host_mode: bool) -> None:
+    pool = _switchboard_pool(config)
+    metrics.callback(
+        "switchboard_sidecar_breaker_open", lambda: 0 if pool.breaker.allow() else 1
+    )
+    metrics.callback(
+        "switchboard_sidecar_event_queue_depth",
+        lambda: sum(agent.batcher.depth() for agent in agents),
+    )
+    for agent in agents:
+        metrics.callback(
+            "switchboard_sidecar_policy_version",
+            lambda decider=agent.decider: decider.policy.version if decider.policy else None,
+            **({"agent_id": agent.agent_id} if host_mode else {}),
+        )
+    spools = [agent.batcher.spool for agent in agents if agent.batcher.spool is not None]
+    if spools:
+        metrics.callback(
+            "switchboard_sidecar_spool_events", lambda: sum(spool.pending for spool in spools)
+        )
+        metrics.callback(
+            "switchboard_sidecar_spool_bytes", lambda: sum(spool.size() for spool in spools)
+        )
+
+
 def main():
     config = load_config()
+    host_mode = bool(config["agents_dir"])
 
     # --register mode: register and print token, then exit
-    if "--register" in sys.argv:
+    if "--register" in sys.argv and not host_mode:
         token = register_agent(config)
         if token:
             print(f"SIDECAR_TOKEN={token}")
             sys.exit(0)
         sys.exit(1)
 
-    # Normal mode: register (if no token), then run
-    if not config.get("sidecar_token"):
-        token = register_agent(config)
-        if not token:
-            log.error("Cannot start without a valid token")
-            sys.exit(1)
-        config["sidecar_token"] = token
-
-    # Initial policy pull
-    policy = pull_policy(config)
-    if policy:
-        write_policy(config, policy)
-    else:
-        log.warning("Could not pull initial policy — will retry")
+    # Register agents that have no token yet, then run
+    agents = []
+    for agent_config in load_agents(config) if host_mode else [config]:
+        if not agent_config.get("sidecar_token"):
+            token = register_agent(agent_config)
+            if not token:
+                log.error("Cannot start agent '%s' without a valid token", agent_config["agent_id"])
+                continue
+            agent_config["sidecar_token"] = token
+            if host_mode:
+                save_agent_token(agent_config)
+        agents.append(HostedAgent(agent_config))
+    if not agents:
+        log.error("Cannot start without a valid token")
+        sys.exit(1)
+
+    # Initial policy pull: one bulk request for a host, then per agent as needed
+    if host_mode:
+        pull_policies(config, agents)
+    for agent in agents:
+        if agent.decider.policy is not None:
+            continue
+        _, policy, agent.policy_etag = pull_policy(agent.config)
+        if policy:
+            adopt_policy(agent.config, agent.decider, policy)
+        else:
+            log.warning("Could not pull initial policy for '%s' — will retry", agent.agent_id)
+            if agent.config["policy_format"].lower() == "json":
+                agent.decider.load_file(Path(agent.config["policy_path"]))
 
     # Shutdown coordination
     stop_event = threading.Event()
@@ -483,46 +2496,87 @@ def main():
     signal.signal(signal.SIGINT, shutdown)
     signal.signal(signal.SIGTERM, shutdown)
 
-    # Start background threads
-    heartbeat_thread = threading.Thread(
-        target=heartbeat_loop, args=(config, stop_event), daemon=True
-    )
-    heartbeat_thread.start()
+    for agent in agents:
+        agent.batcher.start()
 
-    telemetry_thread = threading.Thread(
-        target=telemetry_loop, args=(config, stop_event), daemon=True
+    # Start background threads (one of each, however many agents)
+    checkin_thread = threading.Thread(
+        target=checkin_loop, args=(config, stop_event, agents), daemon=True
     )
-    telemetry_thread.start()
+    checkin_thread.start()
 
-    policy_thread = threading.Thread(
-        target=policy_sync_loop, args=(config, stop_event), daemon=True
-    )
-    policy_thread.start()
+    if int(config["policy_wait"]) > 0:
+        if host_mode:
+            target, args = bulk_policy_loop, (config, stop_event, agents)
+        else:
+            target, args = policy_sync_loop, (config, stop_event, agents[0].decider)
+        policy_thread = threading.Thread(target=target, args=args, daemon=True)
+        policy_thread.start()
 
     # Start event listener
-    EventHandler.config = config
-    port = config["event_listen_port"]
-    server = HTTPServer(("127.0.0.1", port), EventHandler)
-
-    log.info("Sidecar ready for agent '%s'", config["agent_id"])
-    log.info("  Events:    POST http://localhost:%d/events", port)
-    log.info("  Health:    GET  http://localhost:%d/health", port)
-    log.info("  Policy:    GET  http://localhost:%d/policy", port)
+    EventHandler.agents = {agent.agent_id: agent for agent in agents}
+    EventHandler.host_mode = host_mode
+    _register_gauges(config, agents, host_mode)
+    port = int(config["event_listen_port"])
+    socket_path = str(config.get("event_socket") or "")
+    workers = int(config["listener_workers"])
+    servers: list[ListenerServer] = []
+    if port:
+        servers.append(ListenerServer(("127.0.0.1", port), EventHandler, workers))
+    if socket_path:
+        servers.append(UnixListenerServer(socket_path, EventHandler, workers))
+    if not servers:
+        log.error("Nothing to listen on: set EVENT_LISTEN_PORT or EVENT_SOCKET")
+        sys.exit(1)
+    base = f"http://localhost:{port}" if port else f"unix:{socket_path}"
+
+    if host_mode:
+        log.info("Sidecar ready for %d agents from %s", len(agents), config["agents_dir"])
+        log.info("  Events:    POST %s/events (agent_id in the event)", base)
+    else:
+        log.info("Sidecar ready for agent '%s'", config["agent_id"])
+        log.info("  Events:    POST %s/events", base)
+    if socket_path:
+        log.info("  Socket:    %s (HTTP, or one JSON event per line)", socket_path)
+    log.info(
+        "  Batching:  up to %d events / %d ms → /api/v1/events/batch",
+        agents[0].batcher.batch_size,
+        config["event_linger_ms"],
+    )
+    log.info("  Health:    GET  %s/health", base)
+    log.info("  Metrics:   GET  %s/metrics", base)
+    log.info("  Policy:    GET  %s/policy", base)
+    log.info("  Check:     GET  %s/check?action=...", base)
     log.info("  Switchboard:    %s", config["switchboard_url"])
-    log.info("  Format:    %s → %s", config["policy_format"], config["policy_path"])
+    if host_mode:
+        log.info("  Format:    %s → one policy file per agent", config["policy_format"])
+    else:
+        log.info("  Format:    %s → %s", config["policy_format"], config["policy_path"])
     log.info(
-        "  Telemetry: POST /api/v1/telemetry every %ss (%s)",
+        "  Check-in:  POST /api/v1/checkin every %ss, telemetry every %ss (%s)",
+        config["heartbeat_interval"],
         config["telemetry_interval"],
         config["telemetry_mode"],
     )
 
+    for server in servers:
+        threading.Thread(
+            target=server.serve_forever, args=(0.5,), name="listener-accept", daemon=True
+        ).start()
     try:
-        while not stop_event.is_set():
-            server.handle_request()
-    except Exception:
-        pass
+        # Wake up regularly so a shutdown signal is noticed
+        while not stop_event.wait(0.5):
+            pass
     finally:
-        server.server_close()
+        for server in servers:
+            server.shutdown()
+            server.server_close()
+        for agent in agents:
+            agent.batcher.stop()
+        for agent in agents:
+            agent.batcher.close()
+        for pool in _pools.values():
+            pool.close()
         log.info("Sidecar stopped")
 
 
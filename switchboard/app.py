@@ -1,13 +1,18 @@
 """Minimal Switchboard application.
 
-Mounts the v1 governance router and serves the dashboard.
+Mounts the v1 governance router, serves the dashboard and exposes
+Prometheus metrics (behind the admin key, like the other operational routes).
 """
 
 from pathlib import Path
 
-from fastapi import FastAPI
-from fastapi.responses import FileResponse, HTMLResponse
+from fastapi import Depends, FastAPI, Request
+from fastapi.responses import HTMLResponse, PlainTextResponse
 
+from switchboard.compression import CompressionMiddleware, StaticAsset
+from switchboard.metrics import METRICS_PATH, MetricsMiddleware, metrics
+from switchboard.probe import ProbeMiddleware
+from switchboard.v1.routes import _require_admin
 from switchboard.v1.routes import router as v1_router
 
 _ROOT = Path(__file__).resolve().parent.parent
@@ -18,18 +23,31 @@ _SHARED_CSS = _ROOT / "docs" / "shared.css"
 def create_app() -> FastAPI:
     app = FastAPI(title="Switchboard", version="2026.2.19-POC")
     app.include_router(v1_router)
+    app.add_middleware(CompressionMiddleware)
+    app.add_middleware(MetricsMiddleware)
+    # Added last so it runs first, ahead of compression and routing
+    app.add_middleware(ProbeMiddleware)
+
+    dashboard_page = StaticAsset(_DASHBOARD, "text/html; charset=utf-8")
+    shared_css_file = StaticAsset(_SHARED_CSS, "text/css; charset=utf-8")
 
     @app.get("/health")
     async def health():
         return {"status": "healthy"}
 
+    @app.get(METRICS_PATH, response_class=PlainTextResponse)
+    async def prometheus_metrics(_key: str = Depends(_require_admin)):
+        return PlainTextResponse(
+            metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+        )
+
     @app.get("/dashboard", response_class=HTMLResponse)
-    async def dashboard():
-        return _DASHBOARD.read_text(encoding="utf-8")
+    async def dashboard(request: Request):
+        return dashboard_page.response(request.headers)
 
     @app.get("/docs/shared.css")
-    async def shared_css():
-        return FileResponse(_SHARED_CSS, media_type="text/css")
+    async def shared_css(request: Request):
+        return shared_css_file.response(request.headers)
 
     return app
 
@@ -0,0 +1,186 @@
+"""Negotiated response compression.
+
+``CompressionMiddleware`` gzip- or brotli-encodes complete responses above a
+size threshold, for clients that ask for it. Brotli is used only when the
+optional ``brotli`` package is installed (``pip install switchboard[brotli]``).
+Streaming responses (the fleet event stream) pass through untouched.
+
+``StaticAsset`` serves a file from memory with every encoding compressed once,
+at the highest levels, reloading only when the file changes on disk.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+from pathlib import Path
+
+from fastapi import Response
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - exercised only without brotli
+    brotli = None
+
+# Bodies smaller than this gain little and are sent as-is
+MINIMUM_SIZE = 1024
+
+# Fast settings for per-request compression; ratios are close to the maximum
+# for JSON at a fraction of the CPU.
+_GZIP_LEVEL = 6
+_BROTLI_QUALITY = 5
+
+_COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/javascript",
+    "image/svg+xml",
+    "text/",
+)
+
+
+def available_encodings() -> tuple[str, ...]:
+    """Content codings this server can produce, most preferred first."""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate(accept_encoding: str) -> str | None:
+    """Best coding the client accepts from ``available_encodings``, or None.
+
+    Honors q-values (``br;q=0`` refuses brotli) and ``*``; ties go to the
+    server's preference.
+    """
+    weights: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        name, _, value = params.strip().partition("=")
+        if name.strip().lower() == "q":
+            try:
+                q = float(value)
+            except ValueError:
+                q = 0.0
+        weights[coding] = q
+
+    best, best_q = None, 0.0
+    for coding in available_encodings():
+        q = weights.get(coding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def compress(body: bytes, coding: str, best: bool = False) -> bytes:
+    """``body`` encoded with ``coding`` (``gzip`` or ``br``).
+
+    ``best`` uses the maximum levels, for content compressed once and reused.
+    """
+    if coding == "br":
+        return brotli.compress(body, quality=11 if best else _BROTLI_QUALITY)
+    # mtime=0 keeps the output deterministic, so equal bodies compress equal
+    return gzip.compress(body, compresslevel=9 if best else _GZIP_LEVEL, mtime=0)
+
+
+def _is_compressible(content_type: str) -> bool:
+    content_type = content_type.partition(";")[0].strip().lower()
+    return content_type != "text/event-stream" and content_type.startswith(
+        _COMPRESSIBLE_TYPES
+    )
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing complete responses of ``minimum_size`` bytes or more."""
+
+    def __init__(self, app: ASGIApp, minimum_size: int = MINIMUM_SIZE) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        coding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        start: Message | None = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if "content-encoding" in headers or not _is_compressible(
+                    headers.get("content-type", "")
+                ):
+                    await send(message)
+                    return
+                MutableHeaders(raw=message["headers"]).add_vary_header("Accept-Encoding")
+                if coding is None:
+                    await send(message)
+                    return
+                start = message  # held until the body shows whether to compress
+                return
+            if start is None or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            held, start = start, None
+            body = message.get("body", b"")
+            if message.get("more_body", False) or len(body) < self.minimum_size:
+                # Streamed or small: send unchanged
+                await send(held)
+                await send(message)
+                return
+            body = compress(body, coding)
+            headers = MutableHeaders(raw=held["headers"])
+            headers["Content-Encoding"] = coding
+            headers["Content-Length"] = str(len(body))
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                # A strong validator names one exact representation
+                headers["ETag"] = f"W/{etag}"
+            await send(held)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
+
+
+class StaticAsset:
+    """A small file served from memory with pre-compressed variants.
+
+    The file is re-read only when its mtime or size changes, so edits still
+    show up on the next request during development.
+    """
+
+    def __init__(self, path: Path, media_type: str) -> None:
+        self.path = path
+        self.media_type = media_type
+        self._stat: tuple | None = None
+        # coding (None for identity) -> (body, ETag)
+        self._variants: dict[str | None, tuple[bytes, str]] = {}
+
+    def _load(self) -> None:
+        st = self.path.stat()
+        stat = (st.st_mtime_ns, st.st_size)
+        if stat == self._stat:
+            return
+        body = self.path.read_bytes()
+        digest = hashlib.sha256(body).hexdigest()[:16]
+        variants = {None: (body, f'"{digest}"')}
+        for coding in available_encodings():
+            variants[coding] = (compress(body, coding, best=True), f'"{digest}-{coding}"')
+        self._variants, self._stat = variants, stat
+
+    def response(self, headers: Headers) -> Response:
+        """Response for a request with ``headers``: best encoding, or 304."""
+        self._load()
+        coding = negotiate(headers.get("accept-encoding", ""))
+        body, etag = self._variants[coding]
+        response_headers = {"ETag": etag, "Vary": "Accept-Encoding"}
+        if coding is not None:
+            response_headers["Content-Encoding"] = coding
+        wanted = headers.get("if-none-match", "").split(",")
+        if etag in {tag.strip().removeprefix("W/") for tag in wanted}:
+            return Response(status_code=304, headers=response_headers)
+        return Response(body, media_type=self.media_type, headers=response_headers)
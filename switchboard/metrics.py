@@ -0,0 +1,225 @@
+"""Control-plane metrics in Prometheus text format.
+
+``metrics`` holds counters, callback gauges and fixed-bucket histograms; the
+service layer records ingest counts and store I/O into it, and ``GET
+/metrics`` renders it. ``MetricsMiddleware`` counts and times every request
+by route template (never by raw path, so the series stay bounded) and keeps
+a task on the event loop measuring how late its wake-ups run.
+
+Recording a sample is a dictionary update under a lock; gauges are read
+only when scraped.
+
+``Metrics`` and ``_label_text`` are deliberately duplicated in
+sidecar/switchboard-sidecar.py: the sidecar must stay a single file that
+needs only the standard library, so it cannot import this package. Keep
+the two copies in step, so a Prometheus scraping both sees one dialect.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import bisect
+import contextlib
+import threading
+from time import perf_counter
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+METRICS_PATH = "/metrics"
+
+# Upper bounds (seconds) shared by every latency histogram
+_LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+# Seconds between event-loop lag samples
+_LAG_INTERVAL = 0.5
+
+
+def _label_text(labels: tuple[tuple[str, str], ...]) -> str:
+    """``{k="v",...}`` with Prometheus escaping; empty for no labels."""
+    if not labels:
+        return ""
+    escaped = (
+        (k, v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in labels
+    )
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+class Metrics:
+    """The control plane's metric registry, rendered by ``GET /metrics``.
+
+    Each metric is declared once with ``describe`` below; the middleware
+    and the service layer then record samples keyed by label values. Store
+    sizes and record counts are callback gauges, read only when Prometheus
+    scrapes. Every sample is currently recorded on the event loop: request
+    timings by the middleware, ingest counts and store I/O by the service
+    calls of the async routes, loop lag by the lag task. The lock keeps the
+    registry safe should a sample come from another thread, such as a
+    second event loop or a sync route run in the threadpool.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = _LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        # name -> (type, help), in declaration order
+        self._meta: dict[str, tuple[str, str]] = {}
+        self._values: dict[str, dict[tuple, float | list]] = {}
+        self._callbacks: dict[str, list[tuple[tuple, object]]] = {}
+
+    def describe(self, name: str, kind: str, help_text: str) -> None:
+        self._meta[name] = (kind, help_text)
+        self._values.setdefault(name, {})
+
+    def inc(self, name: str, value: float = 1, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._values[name]
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        slot = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._values[name]
+            counts = series.get(key)
+            if counts is None:
+                # one count per bucket, +Inf, then the sum
+                counts = series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            counts[slot] += 1
+            counts[-1] += seconds
+
+    def callback(self, name: str, read, **labels: str) -> None:
+        """Report ``read()`` as ``name`` at every scrape (None skips it)."""
+        self._callbacks.setdefault(name, []).append((tuple(sorted(labels.items())), read))
+
+    def render(self) -> str:
+        """The registry in Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        with self._lock:
+            snapshot = {
+                name: {k: list(v) if isinstance(v, list) else v for k, v in series.items()}
+                for name, series in self._values.items()
+            }
+        for name, (kind, help_text) in self._meta.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for key, read in self._callbacks.get(name, ()):
+                value = read()
+                if value is not None:
+                    lines.append(f"{name}{_label_text(key)} {value:g}")
+            for key, value in snapshot[name].items():
+                if kind != "histogram":
+                    lines.append(f"{name}{_label_text(key)} {value:g}")
+                    continue
+                cumulative = 0
+                for bound, count in zip((*self.buckets, "+Inf"), value):
+                    cumulative += count
+                    le = bound if isinstance(bound, str) else f"{bound:g}"
+                    labels = _label_text((*key, ("le", le)))
+                    lines.append(f"{name}_bucket{labels} {cumulative}")
+                lines.append(f"{name}_sum{_label_text(key)} {value[-1]:g}")
+                lines.append(f"{name}_count{_label_text(key)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+for _name, _kind, _help in (
+    ("switchboard_http_requests_total", "counter",
+     "Requests answered, by method, route template and status"),
+    ("switchboard_http_request_seconds", "histogram",
+     "Time to answer a request, by method and route template"),
+    ("switchboard_events_ingested_total", "counter",
+     "Audit events recorded, by the sending agent's tier"),
+    ("switchboard_telemetry_ingested_total", "counter",
+     "Telemetry samples recorded (posted or in a check-in), by agent tier"),
+    ("switchboard_store_records", "gauge",
+     "Records in each store as of its last load or save"),
+    ("switchboard_store_bytes", "gauge",
+     "Size of each store file on disk"),
+    ("switchboard_store_serialize_seconds", "histogram",
+     "Time to encode a store to JSON on save"),
+    ("switchboard_store_write_seconds", "histogram",
+     "Time to write an encoded store to disk"),
+    ("switchboard_event_loop_lag_seconds", "histogram",
+     "How late the event loop ran a timer, sampled every 0.5 s"),
+):
+    metrics.describe(_name, _kind, _help)
+
+
+async def _watch_loop_lag() -> None:
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(_LAG_INTERVAL)
+        lag = loop.time() - started - _LAG_INTERVAL
+        metrics.observe("switchboard_event_loop_lag_seconds", max(lag, 0.0))
+
+
+class MetricsMiddleware:
+    """ASGI middleware counting and timing requests by route template.
+
+    Unmatched paths share the route label ``unmatched``. Also starts the
+    event-loop lag watcher on the first request served by each loop, and
+    cancels it when the server's lifespan shuts down.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self._lag_task: asyncio.Task | None = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "lifespan":
+
+            async def receive_shutdown() -> Message:
+                message = await receive()
+                if message["type"] == "lifespan.shutdown":
+                    await self.aclose()
+                return message
+
+            await self.app(scope, receive_shutdown, send)
+            return
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        task = self._lag_task
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            self._lag_task = asyncio.get_running_loop().create_task(_watch_loop_lag())
+
+        status = 500
+
+        async def send_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = perf_counter()
+        try:
+            await self.app(scope, receive, send_status)
+        finally:
+            # The router records the matched route in the shared scope
+            route = getattr(scope.get("route"), "path", "unmatched")
+            method = scope["method"]
+            metrics.observe(
+                "switchboard_http_request_seconds",
+                perf_counter() - started,
+                method=method,
+                route=route,
+            )
+            metrics.inc(
+                "switchboard_http_requests_total",
+                method=method,
+                route=route,
+                status=str(status),
+            )
+
+    async def aclose(self) -> None:
+        """Cancel the lag watcher and wait for it to stop."""
+        task, self._lag_task = self._lag_task, None
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            return
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
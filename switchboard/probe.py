@@ -0,0 +1,38 @@
+"""Latency probe answered ahead of the application.
+
+``ProbeMiddleware`` replies to ``GET``/``HEAD /probe`` with an empty ``204``
+before routing, dependency resolution or any other middleware runs, so a
+sidecar timing it over an open connection measures the network and little
+else. Every other request passes through untouched.
+"""
+
+from __future__ import annotations
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+PROBE_PATH = "/probe"
+
+_START = {
+    "type": "http.response.start",
+    "status": 204,
+    "headers": [(b"cache-control", b"no-store")],
+}
+_BODY = {"type": "http.response.body", "body": b""}
+
+
+class ProbeMiddleware:
+    """ASGI middleware answering ``PROBE_PATH`` itself."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] == "http"
+            and scope["path"] == PROBE_PATH
+            and scope["method"] in ("GET", "HEAD")
+        ):
+            await send(_START)
+            await send(_BODY)
+            return
+        await self.app(scope, receive, send)
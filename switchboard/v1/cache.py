@@ -0,0 +1,68 @@
+"""Byte-budgeted LRU cache of encoded responses.
+
+Keys are chosen by the caller and should include a store generation, so a
+write makes old entries unreachable; they then age out under the budget.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+
+
+class ResponseCache:
+    """LRU of pre-encoded response bodies bounded by their total size.
+
+    Entries may carry an absolute ``expires_at`` (``time.time()`` seconds) for
+    responses that go stale without a write, such as heartbeat timeouts.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[tuple, tuple[bytes, float | None]] = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: tuple) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is not None:
+            body, expires_at = entry
+            if expires_at is None or time.time() < expires_at:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return body
+            self._drop(key)
+        self.misses += 1
+        return None
+
+    def put(self, key: tuple, body: bytes, expires_at: float | None = None) -> None:
+        if len(body) > self.max_bytes:
+            return
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = (body, expires_at)
+        self._bytes += len(body)
+        while self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def _drop(self, key: tuple) -> None:
+        body, _ = self._entries.pop(key)
+        self._bytes -= len(body)
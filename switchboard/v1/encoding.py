@@ -0,0 +1,66 @@
+"""Fast JSON encoding for large responses.
+
+Handlers that return a ``JSONBytesResponse`` skip FastAPI's
+``jsonable_encoder`` pass and are written once, straight to bytes. orjson is
+an optional accelerator (``pip install switchboard[fast]``); without it the
+stdlib encoder produces the same compact output FastAPI would.
+"""
+
+from __future__ import annotations
+
+import json
+
+from fastapi import Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson
+    orjson = None
+
+
+def available() -> bool:
+    """True when orjson is installed and used by ``dumps``."""
+    return orjson is not None
+
+
+def dumps(obj, indent: bool = False) -> bytes:
+    """Compact UTF-8 JSON for plain data (dicts, lists, str, numbers, None).
+
+    ``indent`` pretty-prints with two spaces, as the persisted stores are.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else None)
+    if indent:
+        return json.dumps(obj, ensure_ascii=False, allow_nan=False, indent=2).encode("utf-8")
+    return json.dumps(
+        obj, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def loads(data: bytes | str):
+    """Parse JSON with orjson when available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def envelope(fields: dict, key: str, items: bytes) -> bytes:
+    """``fields`` as a JSON object with pre-encoded array ``items`` at ``key``.
+
+    Lets a list serialized by pydantic (``TypeAdapter.dump_json``) be wrapped
+    in a response envelope without decoding it again.
+    """
+    head = dumps({**fields, key: None})
+    # Splice the array in place of the trailing ``null}``
+    return head[: -len(b"null}")] + items + b"}"
+
+
+class JSONBytesResponse(Response):
+    """JSON response whose content is already bytes, or plain data to encode."""
+
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dumps(content)
@@ -0,0 +1,354 @@
+"""Compact in-memory audit event log.
+
+An ``AgentEvent`` costs several hundred bytes resident: a pydantic instance,
+its ``__dict__`` and a private copy of every string, including a 32-character
+ISO timestamp. ``EventLog`` keeps the same data column-wise instead:
+
+- ``agent_id``, ``action``, ``tier`` and ``target`` are dictionary-encoded
+  into one shared string table; targets are split at their last ``/`` so
+  paths under a common directory share the prefix entry.
+- Timestamps are epoch microseconds. Strings that do not round-trip through
+  that form (other offsets, ``Z`` suffixes, free text) are kept verbatim in
+  a sparse side table.
+- ``result`` is a one-byte ``EventResult`` code, ``duration_ms`` a packed
+  int64.
+
+Rows become ``AgentEvent`` models only when handed to the API, via
+``events_at``.
+"""
+
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterable, Iterator
+from datetime import UTC, datetime, timedelta
+from functools import lru_cache
+
+from . import trusted
+from .models import AgentEvent, EventResult
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+_MICROSECOND = timedelta(microseconds=1)
+
+_RESULT_VALUES = tuple(result.value for result in EventResult)
+_RESULT_CODES = {value: code for code, value in enumerate(_RESULT_VALUES)}
+
+# duration_ms column sentinel for None; values outside int64 go to a side table
+_INT64_MIN, _INT64_MAX = -(1 << 63), (1 << 63) - 1
+_NO_DURATION = _INT64_MIN
+
+# String code 0 is None
+_NONE = 0
+
+
+def timestamp_to_us(value: str) -> int | None:
+    """Epoch microseconds for an ISO timestamp that ``us_to_timestamp`` restores.
+
+    None when the string would not survive the round trip unchanged.
+    """
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        return None
+    us = (parsed - _EPOCH) // _MICROSECOND
+    return us if us_to_timestamp(us) == value else None
+
+
+def us_to_timestamp(us: int) -> str:
+    """ISO timestamp (UTC, ``+00:00``) for epoch microseconds.
+
+    Same output as ``datetime.isoformat``, at a fraction of the cost; the log
+    formats every row each time it is persisted.
+    """
+    seconds, fraction = divmod(us, 1_000_000)
+    day, seconds = divmod(seconds, 86_400)
+    hours, seconds = divmod(seconds, 3_600)
+    minutes, seconds = divmod(seconds, 60)
+    if fraction:
+        return f"{_iso_date(day)}T{hours:02d}:{minutes:02d}:{seconds:02d}.{fraction:06d}+00:00"
+    return f"{_iso_date(day)}T{hours:02d}:{minutes:02d}:{seconds:02d}+00:00"
+
+
+@lru_cache(maxsize=1024)
+def _iso_date(day: int) -> str:
+    return (_EPOCH + timedelta(days=day)).date().isoformat()
+
+
+class EventLog:
+    """Append-only, trimmable event log stored as packed columns."""
+
+    __slots__ = (
+        "_action",
+        "_agent",
+        "_base",
+        "_codes",
+        "_detail",
+        "_duration",
+        "_odd_durations",
+        "_odd_timestamps",
+        "_request_id",
+        "_result",
+        "_strings",
+        "_target_dir",
+        "_target_leaf",
+        "_tier",
+        "_timestamp",
+    )
+
+    def __init__(self) -> None:
+        # Absolute sequence number of row 0; sparse tables are keyed by it
+        # so trimming the front never renumbers them.
+        self._base = 0
+        self._strings: list[str | None] = [None]
+        self._codes: dict[str, int] = {}
+        self._timestamp = array("q")
+        self._odd_timestamps: dict[int, str] = {}
+        self._agent = array("I")
+        self._action = array("I")
+        self._target_dir = array("I")
+        self._target_leaf = array("I")
+        self._result = array("B")
+        self._detail: list[str | None] = []
+        self._duration = array("q")
+        self._odd_durations: dict[int, int] = {}
+        self._tier = array("I")
+        self._request_id: list[str | None] = []
+
+    @classmethod
+    def from_events(cls, events: Iterable[AgentEvent]) -> EventLog:
+        log = cls()
+        for event in events:
+            log.append(event)
+        return log
+
+    @classmethod
+    def from_records(cls, records: Iterable[dict]) -> EventLog:
+        """Build from ``AgentEvent`` JSON dumps, e.g. a trusted store file."""
+        log = cls()
+        for record in records:
+            log._append(
+                record["agent_id"],
+                record["timestamp"],
+                record["action"],
+                record["target"],
+                _RESULT_CODES[record["result"]],
+                record["detail"],
+                record["duration_ms"],
+                record["tier"],
+                record["request_id"],
+            )
+        return log
+
+    def __len__(self) -> int:
+        return len(self._timestamp)
+
+    def append(self, event: AgentEvent) -> None:
+        self._append(
+            event.agent_id,
+            event.timestamp,
+            event.action,
+            event.target,
+            _RESULT_CODES[event.result.value],
+            event.detail,
+            event.duration_ms,
+            event.tier,
+            event.request_id,
+        )
+
+    def _append(
+        self,
+        agent_id: str,
+        timestamp: str,
+        action: str,
+        target: str,
+        result: int,
+        detail: str | None,
+        duration_ms: int | None,
+        tier: str | None,
+        request_id: str | None,
+    ) -> None:
+        seq = self._base + len(self._timestamp)
+        us = timestamp_to_us(timestamp)
+        if us is None:
+            self._odd_timestamps[seq] = timestamp
+            us = 0
+        self._timestamp.append(us)
+
+        intern = self._intern
+        self._agent.append(intern(agent_id))
+        self._action.append(intern(action))
+        head, sep, leaf = target.rpartition("/")
+        self._target_dir.append(intern(head + sep))
+        self._target_leaf.append(intern(leaf))
+        self._result.append(result)
+        self._detail.append(detail)
+        if duration_ms is not None and _INT64_MIN < duration_ms <= _INT64_MAX:
+            self._duration.append(duration_ms)
+        else:
+            self._duration.append(_NO_DURATION)
+            if duration_ms is not None:
+                self._odd_durations[seq] = duration_ms
+        self._tier.append(intern(tier))
+        self._request_id.append(request_id)
+
+    def _intern(self, value: str | None) -> int:
+        if value is None:
+            return _NONE
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self._strings)
+            self._strings.append(value)
+        return code
+
+    def code(self, value: str) -> int | None:
+        """String-table code of ``value``, or None if no row uses it."""
+        return self._codes.get(value)
+
+    def trim(self, max_rows: int) -> None:
+        """Drop the oldest rows beyond ``max_rows``."""
+        excess = len(self) - max_rows
+        if excess <= 0:
+            return
+        for column in self._columns():
+            del column[:excess]
+        self._base += excess
+        for sparse in (self._odd_timestamps, self._odd_durations):
+            for seq in [seq for seq in sparse if seq < self._base]:
+                del sparse[seq]
+        # Strings only the dropped rows used stay in the table until it
+        # outgrows the log; then it is rebuilt from the live rows.
+        if len(self._strings) > 2 * len(self) + 64:
+            self._compact_strings()
+
+    def _columns(self) -> tuple:
+        return (
+            self._timestamp,
+            self._agent,
+            self._action,
+            self._target_dir,
+            self._target_leaf,
+            self._result,
+            self._detail,
+            self._duration,
+            self._tier,
+            self._request_id,
+        )
+
+    def _compact_strings(self) -> None:
+        strings = self._strings
+        self._strings = [None]
+        self._codes = {}
+        for column in (
+            self._agent,
+            self._action,
+            self._target_dir,
+            self._target_leaf,
+            self._tier,
+        ):
+            column[:] = array("I", [self._intern(strings[code]) for code in column])
+
+    # --- Reading ---
+
+    def timestamp(self, index: int) -> str:
+        odd = self._odd_timestamps.get(self._base + index)
+        return odd if odd is not None else us_to_timestamp(self._timestamp[index])
+
+    def record(self, index: int) -> dict:
+        """Row ``index`` in ``AgentEvent.model_dump(mode="json")`` form."""
+        strings = self._strings
+        duration = self._duration[index]
+        if duration == _NO_DURATION:
+            duration = self._odd_durations.get(self._base + index)
+        return {
+            "agent_id": strings[self._agent[index]],
+            "timestamp": self.timestamp(index),
+            "action": strings[self._action[index]],
+            "target": strings[self._target_dir[index]] + strings[self._target_leaf[index]],
+            "result": _RESULT_VALUES[self._result[index]],
+            "detail": self._detail[index],
+            "duration_ms": duration,
+            "tier": strings[self._tier[index]],
+            "request_id": self._request_id[index],
+        }
+
+    def records(self) -> Iterator[dict]:
+        """Every row, oldest first, as JSON-ready dicts (for persisting)."""
+        # ``record`` unrolled over the columns; this runs on every save
+        strings = self._strings
+        odd_timestamps, odd_durations = self._odd_timestamps, self._odd_durations
+        for seq, us, agent, action, target_dir, target_leaf, result, detail, duration, tier, request_id in zip(
+            range(self._base, self._base + len(self)),
+            self._timestamp,
+            self._agent,
+            self._action,
+            self._target_dir,
+            self._target_leaf,
+            self._result,
+            self._detail,
+            self._duration,
+            self._tier,
+            self._request_id,
+        ):
+            timestamp = odd_timestamps.get(seq)
+            yield {
+                "agent_id": strings[agent],
+                "timestamp": us_to_timestamp(us) if timestamp is None else timestamp,
+                "action": strings[action],
+                "target": strings[target_dir] + strings[target_leaf],
+                "result": _RESULT_VALUES[result],
+                "detail": detail,
+                "duration_ms": (
+                    duration if duration != _NO_DURATION else odd_durations.get(seq)
+                ),
+                "tier": strings[tier],
+                "request_id": request_id,
+            }
+
+    def events_at(self, indices: Iterable[int]) -> list[AgentEvent]:
+        """``AgentEvent`` models for the given rows, in the given order."""
+        # Rows were validated on the way in; rebuild without re-validating
+        return [trusted.construct(AgentEvent, self.record(i)) for i in indices]
+
+    @property
+    def events(self) -> list[AgentEvent]:
+        """Every row as an ``AgentEvent``, oldest first."""
+        return self.events_at(range(len(self)))
+
+    def find(
+        self,
+        agent_id: str | None = None,
+        action: str | None = None,
+        since: str | None = None,
+        limit: int | None = None,
+    ) -> list[int]:
+        """Indices of matching rows, most recent first.
+
+        ``since`` compares against the timestamp strings, as the event API
+        always has.
+        """
+        indices: list[int] = []
+        if limit is not None and limit <= 0:
+            return indices
+        agent_code = action_code = None
+        if agent_id:
+            agent_code = self.code(agent_id)
+            if agent_code is None:
+                return indices
+        if action:
+            action_code = self.code(action)
+            if action_code is None:
+                return indices
+        agents, actions = self._agent, self._action
+        for i in range(len(self) - 1, -1, -1):
+            if agent_code is not None and agents[i] != agent_code:
+                continue
+            if action_code is not None and actions[i] != action_code:
+                continue
+            if since and self.timestamp(i) < since:
+                continue
+            indices.append(i)
+            if len(indices) == limit:
+                break
+        return indices
@@ -31,6 +31,12 @@ class AgentEvent(BaseModel):
     request_id: str | None = None
 
 
+class AgentEventBatch(BaseModel):
+    """Events buffered by a sidecar, ingested in one request."""
+
+    events: list[AgentEvent] = Field(min_length=1, max_length=1000)
+
+
 class AgentTier(str, Enum):
     L0 = "L0"
     L1 = "L1"
@@ -132,6 +138,28 @@ class FleetPolicyPresetApply(BaseModel):
     pin_observed_claims: bool = False
 
 
+class IntegrityPolicySimulation(BaseModel):
+    """Score stored telemetry under a candidate integrity policy (dry run)."""
+
+    preset: IntegrityPreset | None = None
+    integrity: IntegrityPolicy | None = None
+    agent_ids: list[str] = Field(default_factory=list)
+    since: str | None = None
+    pin_observed_claims: bool = False
+
+
+class ActionPolicyReplay(BaseModel):
+    """Replay a candidate action policy over the stored event log (dry run).
+
+    ``None`` keeps each agent's current list.
+    """
+
+    allowed_actions: list[str] | None = None
+    denied_actions: list[str] | None = None
+    agent_ids: list[str] = Field(default_factory=list)
+    since: str | None = None
+
+
 class AgentStatus(str, Enum):
     active = "active"
     inactive = "inactive"
@@ -158,6 +186,10 @@ class AgentTelemetry(BaseModel):
     telemetry_mode: TelemetryMode = TelemetryMode.sidecar_only
     network_rtt_ms: float | None = None
     network_jitter_ms: float | None = None
+    # Fastest ping of a probe and the connection setup before it, if any;
+    # network_rtt_ms is the median ping and excludes setup
+    network_rtt_min_ms: float | None = None
+    network_connect_ms: float | None = None
     is_remote_session: bool = False
     observed_provider: str | None = None
     observed_model: str | None = None
@@ -168,6 +200,32 @@ class AgentTelemetry(BaseModel):
     detail: str | None = None
 
 
+class AgentCheckin(BaseModel):
+    """Periodic sidecar check-in: liveness plus an optional telemetry sample."""
+
+    agent_id: str
+    telemetry: AgentTelemetry | None = None
+
+
+class PolicyFetchEntry(BaseModel):
+    """One agent in a bulk policy fetch, with its own sidecar token."""
+
+    agent_id: str
+    token: str
+    known_version: int | None = None
+
+
+class PolicyBulkFetch(BaseModel):
+    """Policies for many agents at once, from a host-daemon sidecar.
+
+    With ``wait`` the request long-polls until any listed policy moves past
+    its ``known_version``.
+    """
+
+    agents: list[PolicyFetchEntry] = Field(min_length=1, max_length=1000)
+    wait: int = Field(0, ge=0, le=120)
+
+
 class AgentRecord(BaseModel):
     """Internal record of a registered agent."""
 
@@ -189,6 +247,8 @@ class AgentRecord(BaseModel):
     last_telemetry_mode: TelemetryMode | None = None
     last_network_rtt_ms: float | None = None
     last_network_jitter_ms: float | None = None
+    last_network_rtt_min_ms: float | None = None
+    last_network_connect_ms: float | None = None
     last_sensor_hid_rtt_ms: float | None = None
     last_sensor_dwell_ms: float | None = None
     last_sensor_os_jitter_ms: float | None = None
@@ -5,26 +5,38 @@ Mount on the main FastAPI app as a sub-router under /api/v1.
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import os
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from fastapi.security import APIKeyHeader, HTTPAuthorizationCredentials, HTTPBearer
 
 from .models import (
+    ActionPolicyReplay,
+    AgentCheckin,
     AgentEvent,
+    AgentEventBatch,
     AgentRegistration,
     AgentTelemetry,
     FleetPolicyPresetApply,
+    IntegrityPolicySimulation,
+    PolicyBulkFetch,
     PolicyPresetApply,
     PolicyUpdate,
 )
 from . import services
+from .encoding import JSONBytesResponse, dumps
+from .watch import fleet_hub, policy_watch
 
 logger = logging.getLogger("switchboard.v1.routes")
 
 router = APIRouter(prefix="/api/v1", tags=["v1"])
 
+# Idle fleet streams send a comment (and run a status sweep) this often
+_STREAM_KEEPALIVE_SECONDS = 15.0
+
 # --- Auth ---
 
 _admin_key_header = APIKeyHeader(name="X-Switchboard-Key", auto_error=False)
@@ -76,12 +88,111 @@ async def get_agent(agent_id: str, _key: str = Depends(_require_admin)):
     return result
 
 
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison (RFC 9110 §13.1.2): ignore W/ prefixes
+    wanted = etag.removeprefix("W/")
+    return any(
+        tag.strip().removeprefix("W/") == wanted for tag in if_none_match.split(",")
+    )
+
+
 @router.get("/agents/{agent_id}/policy")
-async def get_agent_policy(agent_id: str, token: str = Depends(_require_sidecar)):
-    """Get agent policy — called by sidecar with its bearer token."""
-    if not services.validate_token(agent_id, token):
+async def get_agent_policy(
+    agent_id: str,
+    token: str = Depends(_require_sidecar),
+    if_none_match: str | None = Header(None),
+    wait: int = Query(0, ge=0, le=120),
+    known_version: int | None = Query(None),
+):
+    """Get agent policy — called by sidecar with its bearer token.
+
+    Carries an ETag derived from the policy version; a matching
+    ``If-None-Match`` gets a bodiless 304. With ``wait`` (seconds) and
+    ``known_version`` (or a matching ETag) the request long-polls: it parks
+    until the policy changes or ``wait`` expires, then answers 200 or 304.
+    """
+    entry = services.policy_entry(agent_id, token)
+    if entry is None:
         raise HTTPException(status_code=403, detail="Token not valid for this agent")
-    return services.get_agent_policy(agent_id)
+
+    def unchanged(entry: tuple[int, str]) -> bool:
+        version, etag = entry
+        return version == known_version or _etag_matches(if_none_match, etag)
+
+    if wait and unchanged(entry):
+        await policy_watch.wait(agent_id, wait)
+        entry = services.policy_entry(agent_id, token)
+        if entry is None:
+            raise HTTPException(status_code=403, detail="Token not valid for this agent")
+
+    _, etag = entry
+    if unchanged(entry):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    payload = services.get_agent_policy_bytes(agent_id, etag)
+    if payload is None:
+        raise HTTPException(status_code=403, detail="Token not valid for this agent")
+    etag, body = payload
+    return JSONBytesResponse(body, headers={"ETag": etag})
+
+
+def _bulk_policy_state(
+    fetch: PolicyBulkFetch,
+) -> tuple[dict[str, str], list[str], list[str]]:
+    """``({agent_id: etag} changed, unchanged ids, forbidden ids)`` for ``fetch``."""
+    changed: dict[str, str] = {}
+    unchanged: list[str] = []
+    forbidden: list[str] = []
+    for item in fetch.agents:
+        entry = services.policy_entry(item.agent_id, item.token)
+        if entry is None:
+            forbidden.append(item.agent_id)
+        elif entry[0] == item.known_version:
+            unchanged.append(item.agent_id)
+        else:
+            changed[item.agent_id] = entry[1]
+    return changed, unchanged, forbidden
+
+
+@router.post("/policies")
+async def get_policies(fetch: PolicyBulkFetch, token: str = Depends(_require_sidecar)):
+    """Policies for many agents in one request — called by host-daemon sidecars.
+
+    The bearer token must be valid for at least one listed agent. Each
+    entry also carries that agent's own token, which is what authorizes its
+    policy. Agents still at their
+    ``known_version`` are listed in ``unchanged``, those whose token is not
+    valid in ``forbidden``. With ``wait`` (seconds) the request long-polls:
+    it parks until any listed policy changes or ``wait`` expires.
+    """
+    if not any(services.policy_entry(item.agent_id, token) for item in fetch.agents):
+        raise HTTPException(status_code=403, detail="Token not valid for any listed agent")
+    changed, unchanged, forbidden = _bulk_policy_state(fetch)
+    if fetch.wait and unchanged and not changed:
+        await policy_watch.wait_any(unchanged, fetch.wait)
+        changed, unchanged, forbidden = _bulk_policy_state(fetch)
+
+    # Cached per-version policy bodies are spliced in without re-encoding
+    policies = []
+    for agent_id, etag in changed.items():
+        payload = services.get_agent_policy_bytes(agent_id, etag)
+        if payload is None:
+            forbidden.append(agent_id)  # deleted in between
+            continue
+        policies.append(dumps(agent_id) + b":" + payload[1])
+    return JSONBytesResponse(
+        b'{"policies":{'
+        + b",".join(policies)
+        + b'},"unchanged":'
+        + dumps(unchanged)
+        + b',"forbidden":'
+        + dumps(forbidden)
+        + b"}"
+    )
 
 
 @router.put("/agents/{agent_id}/policy")
@@ -97,7 +208,7 @@ async def update_policy(
 @router.get("/policy/presets")
 async def list_policy_presets():
     """Built-in integrity-policy presets for dashboard/admin UX."""
-    return services.list_policy_presets()
+    return JSONBytesResponse(services.list_policy_presets_bytes())
 
 
 @router.post("/agents/{agent_id}/policy/preset")
@@ -133,6 +244,44 @@ async def apply_fleet_policy_preset(
     return result
 
 
+@router.post("/policy/simulate")
+async def simulate_policy(
+    req: IntegrityPolicySimulation,
+    _key: str = Depends(_require_admin),
+):
+    """Dry-run a candidate integrity policy against stored telemetry."""
+    result = services.simulate_integrity_policy(
+        preset=req.preset.value if req.preset else None,
+        integrity=req.integrity,
+        agent_ids=req.agent_ids,
+        since=req.since,
+        pin_observed_claims=req.pin_observed_claims,
+    )
+    if not result["ok"]:
+        if "numpy" in result.get("error", ""):
+            raise HTTPException(status_code=503, detail=result["error"])
+        raise HTTPException(status_code=400, detail=result["error"])
+    return result
+
+
+@router.post("/policy/replay")
+async def replay_policy(
+    req: ActionPolicyReplay,
+    _key: str = Depends(_require_admin),
+):
+    """Dry-run a candidate action policy against the stored event log."""
+    result = services.replay_action_policy(
+        allowed_actions=req.allowed_actions,
+        denied_actions=req.denied_actions,
+        agent_ids=req.agent_ids,
+        since=req.since,
+    )
+    if not result["ok"]:
+        # The only failure is an unreadable event log: storage, not the request
+        raise HTTPException(status_code=503, detail=result["error"])
+    return result
+
+
 @router.delete("/agents/{agent_id}")
 async def deregister_agent(agent_id: str, _key: str = Depends(_require_admin)):
     result = services.deregister_agent(agent_id)
@@ -154,6 +303,22 @@ async def ingest_event(event: AgentEvent, token: str = Depends(_require_sidecar)
     return services.ingest_event(event)
 
 
+@router.post("/events/batch")
+async def ingest_event_batch(
+    batch: AgentEventBatch, token: str = Depends(_require_sidecar)
+):
+    """Receive a batch of buffered events from a sidecar, all or nothing.
+
+    The token must be valid for every agent in the batch.
+    """
+    for agent_id in {event.agent_id for event in batch.events}:
+        if not services.validate_token(agent_id, token):
+            raise HTTPException(
+                status_code=403, detail=f"Token not valid for agent '{agent_id}'"
+            )
+    return services.ingest_events(batch.events)
+
+
 @router.post("/telemetry")
 async def ingest_telemetry(
     telemetry: AgentTelemetry, token: str = Depends(_require_sidecar)
@@ -169,6 +334,27 @@ async def ingest_telemetry(
     return result
 
 
+@router.post("/checkin")
+async def sidecar_checkin(checkin: AgentCheckin, token: str = Depends(_require_sidecar)):
+    """Combined sidecar check-in: liveness, optional telemetry, policy version.
+
+    Replaces a heartbeat event plus a telemetry post; the sidecar pulls the
+    policy only when ``policy_version`` differs from the one it holds.
+    """
+    if not services.validate_token(checkin.agent_id, token):
+        raise HTTPException(
+            status_code=403, detail="Token not valid for this agent"
+        )
+    if checkin.telemetry is not None and checkin.telemetry.agent_id != checkin.agent_id:
+        raise HTTPException(
+            status_code=400, detail="Telemetry agent_id does not match check-in"
+        )
+    result = services.checkin(checkin)
+    if not result["ok"]:
+        raise HTTPException(status_code=404, detail=result["error"])
+    return result
+
+
 # --- Audit log (admin) ---
 
 
@@ -179,8 +365,10 @@ async def query_events(
     since: str | None = Query(None),
     limit: int = Query(100, ge=1, le=1000),
 ):
-    return services.query_events(
-        agent_id=agent_id, action=action, since=since, limit=limit
+    return JSONBytesResponse(
+        services.query_events_bytes(
+            agent_id=agent_id, action=action, since=since, limit=limit
+        )
     )
 
 
@@ -203,14 +391,73 @@ async def fleet_telemetry_endpoint(
     since: str | None = Query(None),
     limit: int = Query(200, ge=1, le=500),
 ):
-    return services.fleet_telemetry(agent_id=agent_id, since=since, limit=limit)
+    return JSONBytesResponse(
+        services.fleet_telemetry_bytes(agent_id=agent_id, since=since, limit=limit)
+    )
+
+
+@router.get("/fleet/snapshot")
+async def fleet_snapshot_endpoint(
+    events: int = Query(25, ge=0, le=1000),
+    telemetry: int = Query(160, ge=0, le=500),
+    telemetry_agent_id: str | None = Query(None),
+):
+    """Health, agents, recent events, telemetry and presets in one read."""
+    return services.fleet_snapshot(
+        events_limit=events,
+        telemetry_limit=telemetry,
+        telemetry_agent_id=telemetry_agent_id,
+    )
 
 
 @router.get("/fleet/status")
 async def fleet_status_endpoint():
-    return services.fleet_status()
+    return JSONBytesResponse(services.fleet_status_bytes())
 
 
 @router.get("/fleet/health")
 async def fleet_health_endpoint():
-    return services.fleet_health()
+    return JSONBytesResponse(services.fleet_health_bytes())
+
+
+def _sse(kind: str, data) -> str:
+    return f"event: {kind}\ndata: {dumps(data).decode()}\n\n"
+
+
+@router.get("/fleet/stream")
+async def fleet_stream_endpoint(events: int = Query(25, ge=0, le=1000)):
+    """Server-Sent Events feed of fleet changes for the dashboard.
+
+    Opens with a ``snapshot`` event (``/fleet/snapshot`` without telemetry),
+    then pushes ``agent``, ``agent_removed``, ``event``, ``telemetry`` and
+    ``health`` events as they happen. A slow consumer is re-sent a snapshot
+    instead of its dropped backlog.
+    """
+
+    async def stream():
+        # No await between snapshot and subscribe: nothing can be missed
+        snapshot = services.fleet_stream_snapshot(events)
+        queue = fleet_hub.subscribe()
+        try:
+            yield _sse("snapshot", snapshot)
+            while True:
+                try:
+                    kind, data = await asyncio.wait_for(
+                        queue.get(), _STREAM_KEEPALIVE_SECONDS
+                    )
+                except TimeoutError:
+                    services.sweep_fleet_status()
+                    yield ": keepalive\n\n"
+                    continue
+                if kind == "resync":
+                    yield _sse("snapshot", services.fleet_stream_snapshot(events))
+                else:
+                    yield _sse(kind, data)
+        finally:
+            fleet_hub.unsubscribe(queue)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -5,13 +5,28 @@ File-backed JSON storage for POC. Replace with a real database on DEV.
 
 from __future__ import annotations
 
+import gc
+import hashlib
 import json
 import logging
+import re
 import secrets
-from datetime import datetime, timezone, timedelta
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from datetime import UTC, datetime, timedelta, timezone
+from functools import partial
 from pathlib import Path
 
+from pydantic import BaseModel, TypeAdapter
+
+from switchboard.metrics import metrics
+
+from . import encoding, simulation, trusted
+from .cache import ResponseCache
+from .eventlog import EventLog
 from .models import (
+    AgentCheckin,
     AgentEvent,
     AgentPolicy,
     AgentRecord,
@@ -26,6 +41,7 @@ from .models import (
     PolicyUpdate,
     TelemetryStore,
 )
+from .watch import fleet_hub, policy_watch
 
 logger = logging.getLogger("switchboard.v1.services")
 
@@ -43,6 +59,27 @@ _HEARTBEAT_TIMEOUT = timedelta(seconds=90)
 _MAX_EVENTS = 10_000
 _MAX_TELEMETRY = 10_000
 
+# Persisted stores open with a header, then the store body:
+#   {"schema_version": 1, "schema": "<model fingerprint>", "checksum": "sha256:<body>",
+# A file whose header matches the running code and whose body matches its
+# checksum was written by this code and loads without re-validation. The
+# version covers the file layout; the fingerprint tracks model changes.
+_STORE_SCHEMA_VERSION = 1
+_STORE_HEADER = re.compile(
+    rb'\{"schema_version": (\d+), "schema": "([0-9a-f]+)", '
+    rb'"checksum": "sha256:([0-9a-f]{64})",'
+)
+
+# Read size for streaming scans over persisted stores
+_STREAM_CHUNK = 1 << 20
+_STREAM_SEPARATOR = re.compile(r"[\s,]*")
+
+# Budget for pre-encoded responses of the public read-only fleet endpoints
+_RESPONSE_CACHE_BYTES = 8 << 20
+
+# Minimum spacing of heartbeat-timeout sweeps driven by fleet stream keepalives
+_FLEET_SWEEP_INTERVAL = 10.0
+
 _PRESET_ORDER = ("standard", "strict", "relaxed")
 _INTEGRITY_POLICY_PRESETS: dict[str, dict] = {
     "standard": {
@@ -91,6 +128,137 @@ def _ensure_data_dir() -> None:
     _DATA_DIR.mkdir(parents=True, exist_ok=True)
 
 
+def _write_store(path: Path, store: BaseModel) -> None:
+    started = time.perf_counter()
+    body = store.model_dump_json(indent=2).encode("utf-8")
+    _write_store_body(path, type(store), body, started)
+
+
+def _write_store_body(
+    path: Path, model: type[BaseModel], body: bytes, started: float
+) -> None:
+    """Write ``body``, a JSON object matching ``model``, behind a store header.
+
+    Encoding since ``started`` (a ``perf_counter`` reading), header included,
+    and the write itself are timed separately.
+    """
+    rest = body[1:]  # everything after the opening brace
+    header = (
+        f'{{"schema_version": {_STORE_SCHEMA_VERSION}, '
+        f'"schema": "{trusted.fingerprint(model)}", '
+        f'"checksum": "sha256:{hashlib.sha256(rest).hexdigest()}",'
+    )
+    data = header.encode("ascii") + rest
+    encoded = time.perf_counter()
+    path.write_bytes(data)
+    metrics.observe("switchboard_store_serialize_seconds", encoded - started, store=path.stem)
+    metrics.observe(
+        "switchboard_store_write_seconds", time.perf_counter() - encoded, store=path.stem
+    )
+
+
+def _read_store(path: Path, model: type[BaseModel]):
+    """Load a store, trusting it only if it is unmodified since we wrote it.
+
+    Files without a current header (older versions, other model layouts) or
+    with a stale checksum (hand edits, other tools) are validated as before,
+    so bad data still surfaces as an error.
+    """
+    with _gc_paused():
+        data, is_trusted = _read_store_data(path, model)
+        if is_trusted:
+            return trusted.construct(model, data)
+        return model(**data)
+
+
+def _read_store_data(path: Path, model: type[BaseModel]) -> tuple[dict, bool]:
+    """Parsed store body, and whether it may skip validation against ``model``."""
+    raw = path.read_bytes()
+    match = _STORE_HEADER.match(raw)
+    data = encoding.loads(raw)
+    if (
+        match
+        and int(match[1]) == _STORE_SCHEMA_VERSION
+        and match[2].decode() == trusted.fingerprint(model)
+    ):
+        if hashlib.sha256(raw[match.end():]).hexdigest() == match[3].decode():
+            del data["schema_version"], data["schema"], data["checksum"]
+            return data, True
+        logger.warning("%s was modified outside Switchboard; validating", path.name)
+    return data, False
+
+
+@contextmanager
+def _gc_paused() -> Iterator[None]:
+    # Loads allocate objects in bulk, none of them cyclic garbage; generational
+    # collections triggered by the allocations would rescan the growing heap.
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+# Bumped on every save; with the file's stat key this forms a store's
+# generation, which response cache keys embed.
+_generations: dict[str, int] = {"agents": 0, "events": 0, "telemetry": 0}
+_response_cache = ResponseCache(_RESPONSE_CACHE_BYTES)
+
+# Serializes event lists to JSON in pydantic-core, without per-row dicts
+_EVENT_LIST = TypeAdapter(list[AgentEvent])
+
+
+def _store_generation(stores: tuple[str, ...]) -> tuple:
+    # The stat key also catches edits made outside this process
+    paths = _store_paths()
+    return tuple((_generations[name], _file_stat_key(paths[name])) for name in stores)
+
+
+def _store_paths() -> dict[str, Path]:
+    return {"agents": _AGENTS_FILE, "events": _EVENTS_FILE, "telemetry": _TELEMETRY_FILE}
+
+
+# --- Store metrics ---
+
+# Record counts as of each store's last load or save; counting at scrape time
+# would mean loading the stores.
+_store_records: dict[str, int] = {}
+
+
+def _store_bytes(name: str) -> int | None:
+    try:
+        return _store_paths()[name].stat().st_size
+    except OSError:
+        return None
+
+
+for _store in ("agents", "events", "telemetry"):
+    metrics.callback("switchboard_store_records", partial(_store_records.get, _store), store=_store)
+    metrics.callback("switchboard_store_bytes", partial(_store_bytes, _store), store=_store)
+
+
+def _cached_response(
+    key: tuple,
+    stores: tuple[str, ...],
+    build: Callable[[], tuple[dict, float | None]],
+) -> bytes:
+    """Encoded ``build()`` payload, reused until a store in ``stores`` changes.
+
+    ``build`` returns ``(payload, expires_at)``; ``expires_at`` bounds the
+    entry's life for payloads that age without a write.
+    """
+    body = _response_cache.get((*key, _store_generation(stores)))
+    if body is not None:
+        return body
+    payload, expires_at = build()
+    body = encoding.dumps(payload)
+    # Keyed after building, so a write made by ``build`` itself is included
+    _response_cache.put((*key, _store_generation(stores)), body, expires_at)
+    return body
+
+
 # --- Agent store ---
 
 
@@ -98,65 +266,235 @@ def _load_agents() -> AgentStore:
     if not _AGENTS_FILE.exists():
         return AgentStore()
     try:
-        data = json.loads(_AGENTS_FILE.read_text(encoding="utf-8"))
-        return AgentStore(**data)
+        stat_key = _file_stat_key(_AGENTS_FILE)
+        store = _read_store(_AGENTS_FILE, AgentStore)
     except Exception:
         logger.exception("Failed to read agents.json")
         return AgentStore()
+    _index_policies(store, stat_key)
+    _store_records["agents"] = len(store.agents)
+    return store
 
 
 def _save_agents(store: AgentStore) -> None:
     _ensure_data_dir()
-    _AGENTS_FILE.write_text(
-        store.model_dump_json(indent=2), encoding="utf-8"
-    )
+    _write_store(_AGENTS_FILE, store)
+    _generations["agents"] += 1
+    _store_records["agents"] = len(store.agents)
+    _index_policies(store, _file_stat_key(_AGENTS_FILE))
+    _publish_fleet_changes(store)
+
+
+def _file_stat_key(path: Path) -> tuple | None:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (str(path), st.st_mtime_ns, st.st_size)
+
+
+# --- Policy index (sidecar polling) ---
+
+# agent_id -> (token, policy version, ETag), rebuilt whenever agents.json is
+# loaded or saved. Conditional policy polls are answered from here with one
+# stat() instead of a full registry load.
+_policy_index: dict = {"stat": None, "agents": {}}
+# (agent_id, ETag) -> serialized policy, so each version is encoded once
+_policy_bodies: dict[tuple[str, str], bytes] = {}
+
+
+def _policy_etag(record: AgentRecord) -> str:
+    # registered_at disambiguates a re-registered agent whose version restarted
+    generation = hashlib.sha256(record.registered_at.encode()).hexdigest()[:8]
+    return f'"v{record.policy.version}-{generation}"'
+
+
+def _index_policies(store: AgentStore, stat_key: tuple | None) -> None:
+    agents = {
+        agent_id: (record.token, record.policy.version, _policy_etag(record))
+        for agent_id, record in store.agents.items()
+    }
+    live = {(agent_id, entry[2]) for agent_id, entry in agents.items()}
+    for key in [key for key in _policy_bodies if key not in live]:
+        del _policy_bodies[key]
+
+    previous = _policy_index["agents"]
+    _policy_index["agents"] = agents
+    _policy_index["stat"] = stat_key
+    for agent_id, entry in previous.items():
+        current = agents.get(agent_id)
+        if current is None or current[2] != entry[2]:
+            policy_watch.notify(agent_id)
+
+
+# Agent summaries and health counts as last broadcast to fleet stream
+# subscribers; only changes against these are published.
+_fleet_published: dict = {"agents": {}, "health": None, "swept": 0.0}
+
+
+def _publish_fleet_changes(store: AgentStore, force: bool = False) -> None:
+    """Broadcast agent and health changes since the last publish.
+
+    A no-op without stream subscribers unless ``force`` (used when a snapshot
+    re-baselines the published view).
+    """
+    if not (fleet_hub.active or force):
+        return
+    _refresh_statuses(store)
+    published = _fleet_published["agents"]
+    for agent_id, record in store.agents.items():
+        summary = _serialize_agent_summary(record)
+        if published.get(agent_id) != summary:
+            published[agent_id] = summary
+            fleet_hub.publish("agent", summary)
+    for agent_id in [a for a in published if a not in store.agents]:
+        del published[agent_id]
+        fleet_hub.publish("agent_removed", {"agent_id": agent_id})
+
+    health = _fleet_health_counts(store)
+    if health != _fleet_published["health"]:
+        _fleet_published["health"] = health
+        fleet_hub.publish("health", health)
 
 
 # --- Event store ---
 
+# The event log stays resident in compact form (see eventlog.py) and is only
+# re-read when events.json changes under it. Persisted as an EventStore.
+_event_log: dict = {"stat": None, "log": None}
 
-def _load_events() -> EventStore:
-    if not _EVENTS_FILE.exists():
-        return EventStore()
+
+def _load_events() -> EventLog:
+    stat_key = _file_stat_key(_EVENTS_FILE)
+    if stat_key is None:
+        return EventLog()
+    if _event_log["stat"] == stat_key:
+        return _event_log["log"]
+    _event_log["stat"] = _event_log["log"] = None
     try:
-        data = json.loads(_EVENTS_FILE.read_text(encoding="utf-8"))
-        return EventStore(**data)
+        with _gc_paused():
+            data, is_trusted = _read_store_data(_EVENTS_FILE, EventStore)
+            if is_trusted:
+                log = EventLog.from_records(data["events"])
+            else:
+                log = EventLog.from_events(EventStore(**data).events)
     except Exception:
         logger.exception("Failed to read events.json")
-        return EventStore()
+        return EventLog()
+    _event_log["stat"], _event_log["log"] = stat_key, log
+    _store_records["events"] = len(log)
+    return log
 
 
-def _save_events(store: EventStore) -> None:
+def _save_events(store: EventLog | EventStore) -> None:
     _ensure_data_dir()
-    # Trim to max
-    if len(store.events) > _MAX_EVENTS:
-        store.events = store.events[-_MAX_EVENTS:]
-    _EVENTS_FILE.write_text(
-        store.model_dump_json(indent=2), encoding="utf-8"
-    )
+    if isinstance(store, EventStore):
+        store = EventLog.from_events(store.events)
+    try:
+        # Trim to max
+        store.trim(_MAX_EVENTS)
+        started = time.perf_counter()
+        body = encoding.dumps({"events": list(store.records())}, indent=True)
+        _write_store_body(_EVENTS_FILE, EventStore, body, started)
+    except BaseException:
+        # Callers append to the cached log before saving it; drop it so the
+        # next load re-reads what actually reached the disk.
+        _event_log["stat"] = _event_log["log"] = None
+        raise
+    _generations["events"] += 1
+    _store_records["events"] = len(store)
+    _event_log["stat"], _event_log["log"] = _file_stat_key(_EVENTS_FILE), store
+
+
+def _iter_store_records(path: Path, key: str) -> Iterator[dict]:
+    """Stream raw records from a persisted store's ``key`` array.
+
+    Decodes one JSON object at a time from fixed-size reads so scans over the
+    event log never hold the whole file or build pydantic models.
+    """
+    if not path.exists():
+        return
+    decoder = json.JSONDecoder()
+    marker = f'"{key}"'
+    with path.open("r", encoding="utf-8") as fh:
+        buf = fh.read(_STREAM_CHUNK)
+        eof = not buf
+
+        while True:
+            start = buf.find(marker)
+            bracket = buf.find("[", start + len(marker)) if start >= 0 else -1
+            if bracket >= 0:
+                pos = bracket + 1
+                break
+            if eof:
+                return
+            chunk = fh.read(_STREAM_CHUNK)
+            eof = not chunk
+            buf += chunk
+
+        while True:
+            pos = _STREAM_SEPARATOR.match(buf, pos).end()
+            if pos < len(buf) and buf[pos] == "]":
+                return
+            try:
+                if pos >= len(buf):
+                    raise json.JSONDecodeError("need more data", buf, pos)
+                record, pos = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                buf = buf[pos:]
+                pos = 0
+                chunk = fh.read(_STREAM_CHUNK)
+                eof = not chunk
+                buf += chunk
+                continue
+            yield record
 
 
 # --- Telemetry store ---
 
 
+def _load_store_tail(
+    path: Path, key: str, model: type, limit: int, agent_id: str | None = None
+) -> list:
+    """Last ``limit`` records of a store, validating only the ones returned.
+
+    For read paths that show a recent window: parsing JSON is cheap, building
+    thousands of models only to discard all but the tail is not.
+    """
+    if not path.exists():
+        return []
+    try:
+        with _gc_paused():
+            records = encoding.loads(path.read_bytes()).get(key, [])
+        if agent_id:
+            records = [r for r in records if r.get("agent_id") == agent_id]
+        return [model(**record) for record in records[-limit:]]
+    except Exception:
+        logger.exception("Failed to read %s", path.name)
+        return []
+
+
 def _load_telemetry() -> TelemetryStore:
     if not _TELEMETRY_FILE.exists():
         return TelemetryStore()
     try:
-        data = json.loads(_TELEMETRY_FILE.read_text(encoding="utf-8"))
-        return TelemetryStore(**data)
+        store = _read_store(_TELEMETRY_FILE, TelemetryStore)
     except Exception:
         logger.exception("Failed to read telemetry.json")
         return TelemetryStore()
+    _store_records["telemetry"] = len(store.telemetry)
+    return store
 
 
 def _save_telemetry(store: TelemetryStore) -> None:
     _ensure_data_dir()
     if len(store.telemetry) > _MAX_TELEMETRY:
         store.telemetry = store.telemetry[-_MAX_TELEMETRY:]
-    _TELEMETRY_FILE.write_text(
-        store.model_dump_json(indent=2), encoding="utf-8"
-    )
+    _write_store(_TELEMETRY_FILE, store)
+    _generations["telemetry"] += 1
+    _store_records["telemetry"] = len(store.telemetry)
 
 
 # --- Token generation ---
@@ -234,6 +572,8 @@ def _serialize_agent_summary(record: AgentRecord) -> dict:
         ),
         "last_network_rtt_ms": record.last_network_rtt_ms,
         "last_network_jitter_ms": record.last_network_jitter_ms,
+        "last_network_rtt_min_ms": record.last_network_rtt_min_ms,
+        "last_network_connect_ms": record.last_network_connect_ms,
         "last_sensor_hid_rtt_ms": record.last_sensor_hid_rtt_ms,
         "last_sensor_dwell_ms": record.last_sensor_dwell_ms,
         "last_sensor_os_jitter_ms": record.last_sensor_os_jitter_ms,
@@ -280,6 +620,8 @@ def get_agent(agent_id: str) -> dict:
         ),
         "last_network_rtt_ms": record.last_network_rtt_ms,
         "last_network_jitter_ms": record.last_network_jitter_ms,
+        "last_network_rtt_min_ms": record.last_network_rtt_min_ms,
+        "last_network_connect_ms": record.last_network_connect_ms,
         "last_sensor_hid_rtt_ms": record.last_sensor_hid_rtt_ms,
         "last_sensor_dwell_ms": record.last_sensor_dwell_ms,
         "last_sensor_os_jitter_ms": record.last_sensor_os_jitter_ms,
@@ -317,6 +659,13 @@ def update_policy(agent_id: str, update: PolicyUpdate) -> dict:
     }
 
 
+def list_policy_presets_bytes() -> bytes:
+    """``list_policy_presets`` encoded once; presets are static."""
+    return _cached_response(
+        ("policy/presets",), (), lambda: (list_policy_presets(), None)
+    )
+
+
 def list_policy_presets() -> dict:
     """List built-in integrity-policy presets."""
     presets: list[dict] = []
@@ -423,6 +772,215 @@ def apply_policy_preset_fleet(
     }
 
 
+def simulate_integrity_policy(
+    preset: str | None = None,
+    integrity: IntegrityPolicy | None = None,
+    agent_ids: list[str] | None = None,
+    since: str | None = None,
+    pin_observed_claims: bool = False,
+) -> dict:
+    """What-if: score stored telemetry under a candidate integrity policy.
+
+    Nothing is persisted. The candidate is either an explicit ``integrity``
+    policy applied to every target agent, or a ``preset`` resolved per agent
+    exactly as ``apply_policy_preset`` would.
+    """
+    if (preset is None) == (integrity is None):
+        return {"ok": False, "error": "Provide exactly one of 'preset' or 'integrity'"}
+
+    normalized = None
+    if preset is not None:
+        normalized = str(preset).strip().lower()
+        if normalized not in _INTEGRITY_POLICY_PRESETS:
+            return {"ok": False, "error": f"Unknown policy preset '{preset}'"}
+
+    if not simulation.available():
+        return {
+            "ok": False,
+            "error": "Policy simulation requires numpy (pip install 'switchboard[simulate]')",
+        }
+
+    store = _load_agents()
+    target_ids = agent_ids or list(store.agents.keys())
+    missing = [agent_id for agent_id in target_ids if agent_id not in store.agents]
+    records = [store.agents[agent_id] for agent_id in target_ids if agent_id in store.agents]
+
+    current = [record.policy.integrity for record in records]
+    if integrity is not None:
+        candidate = [integrity] * len(records)
+    else:
+        candidate = [
+            _preset_integrity(record, normalized, pin_observed_claims)
+            for record in records
+        ]
+
+    entries = _load_telemetry().telemetry
+    if since:
+        entries = [t for t in entries if t.timestamp >= since]
+
+    agent_index = {record.agent_id: i for i, record in enumerate(records)}
+    columns = simulation.telemetry_columns(entries, agent_index)
+    result = simulation.compare_policies(columns, current, candidate)
+
+    status_names = [status.value for status in simulation.STATUS_ORDER]
+    samples = result["samples"].tolist()
+    current_counts = result["current"].tolist()
+    candidate_counts = result["candidate"].tolist()
+    flipped = result["flipped"].tolist()
+    cleared = result["cleared"].tolist()
+    latest_current = result["latest_current"].tolist()
+    latest_candidate = result["latest_candidate"].tolist()
+
+    alert_codes = {1, 2}
+    agents: list[dict] = []
+    agents_flipped = 0
+    for i, record in enumerate(records):
+        latest = None
+        if latest_current[i] >= 0:
+            latest = {
+                "current": status_names[latest_current[i]],
+                "candidate": status_names[latest_candidate[i]],
+            }
+            if (
+                latest_candidate[i] in alert_codes
+                and latest_current[i] not in alert_codes
+            ):
+                agents_flipped += 1
+        agents.append(
+            {
+                "agent_id": record.agent_id,
+                "display_name": record.display_name,
+                "samples": samples[i],
+                "current": dict(zip(status_names, current_counts[i])),
+                "candidate": dict(zip(status_names, candidate_counts[i])),
+                "flipped_to_alert": flipped[i],
+                "cleared": cleared[i],
+                "latest_status": latest,
+            }
+        )
+
+    agents.sort(key=lambda row: (row["flipped_to_alert"], row["samples"]), reverse=True)
+    totals_current = result["current"].sum(axis=0).tolist()
+    totals_candidate = result["candidate"].sum(axis=0).tolist()
+
+    return {
+        "ok": True,
+        "preset": normalized,
+        "integrity": integrity.model_dump() if integrity is not None else None,
+        "pin_observed_claims": pin_observed_claims,
+        "missing": missing,
+        "summary": {
+            "samples": int(columns["agent"].size),
+            "agents": len(records),
+            "current": dict(zip(status_names, totals_current)),
+            "candidate": dict(zip(status_names, totals_candidate)),
+            "samples_flipped_to_alert": sum(flipped),
+            "samples_cleared": sum(cleared),
+            "agents_flipped_to_alert": agents_flipped,
+        },
+        "agents": agents,
+    }
+
+
+def replay_action_policy(
+    allowed_actions: list[str] | None = None,
+    denied_actions: list[str] | None = None,
+    agent_ids: list[str] | None = None,
+    since: str | None = None,
+) -> dict:
+    """What-if: which logged events would a candidate action policy block?
+
+    ``None`` keeps the agent's current list. The event log is streamed and
+    counted per (agent, action) pair with dictionary-encoded action ids, so
+    each distinct pair is evaluated once regardless of how often it occurs.
+    """
+    store = _load_agents()
+    target_ids = agent_ids or list(store.agents.keys())
+    missing = [agent_id for agent_id in target_ids if agent_id not in store.agents]
+    agent_codes = {
+        agent_id: i
+        for i, agent_id in enumerate(a for a in target_ids if a in store.agents)
+    }
+
+    action_ids: dict[str, int] = {}
+    pair_counts: dict[tuple[int, int], int] = {}
+    scanned = 0
+    try:
+        for raw in _iter_store_records(_EVENTS_FILE, "events"):
+            agent_code = agent_codes.get(raw.get("agent_id"))
+            if agent_code is None:
+                continue
+            if since and (raw.get("timestamp") or "") < since:
+                continue
+            action = raw.get("action") or ""
+            action_id = action_ids.setdefault(action, len(action_ids))
+            pair = (agent_code, action_id)
+            pair_counts[pair] = pair_counts.get(pair, 0) + 1
+            scanned += 1
+    except Exception:
+        logger.exception("Failed to scan events.json")
+        return {"ok": False, "error": "Event log could not be read"}
+
+    actions = list(action_ids)
+    rows: list[dict] = []
+    policies: list[tuple[tuple[set, set], tuple[set, set]]] = []
+    for agent_id in agent_codes:
+        policy = store.agents[agent_id].policy
+        current = (set(policy.allowed_actions), set(policy.denied_actions))
+        candidate = (
+            current[0] if allowed_actions is None else set(allowed_actions),
+            current[1] if denied_actions is None else set(denied_actions),
+        )
+        policies.append((current, candidate))
+        rows.append(
+            {
+                "agent_id": agent_id,
+                "events": 0,
+                "denied": 0,
+                "newly_denied": 0,
+                "actions": [],
+            }
+        )
+
+    for (code, action_id), count in pair_counts.items():
+        row = rows[code]
+        current, candidate = policies[code]
+        action = actions[action_id]
+        row["events"] += count
+        reason = _action_denial_reason(action, *candidate)
+        if reason is None:
+            continue
+        newly = _action_denial_reason(action, *current) is None
+        row["denied"] += count
+        if newly:
+            row["newly_denied"] += count
+        row["actions"].append(
+            {
+                "action": action,
+                "count": count,
+                "reason": reason,
+                "newly_denied": newly,
+            }
+        )
+
+    for row in rows:
+        row["actions"].sort(key=lambda entry: entry["count"], reverse=True)
+    rows.sort(key=lambda row: (row["newly_denied"], row["denied"]), reverse=True)
+
+    return {
+        "ok": True,
+        "missing": missing,
+        "summary": {
+            "events_scanned": scanned,
+            "distinct_actions": len(actions),
+            "denied": sum(row["denied"] for row in rows),
+            "newly_denied": sum(row["newly_denied"] for row in rows),
+            "agents_affected": sum(1 for row in rows if row["newly_denied"]),
+        },
+        "agents": rows,
+    }
+
+
 def deregister_agent(agent_id: str) -> dict:
     """Remove an agent from the registry."""
     store = _load_agents()
@@ -444,6 +1002,44 @@ def get_agent_policy(agent_id: str) -> dict:
     return record.policy.model_dump()
 
 
+def policy_entry(agent_id: str, token: str) -> tuple[int, str] | None:
+    """``(version, etag)`` of an agent's policy if ``token`` is valid for it.
+
+    Served from the in-memory policy index; the registry is only re-read when
+    agents.json changed on disk since it was last indexed.
+    """
+    stat_key = _file_stat_key(_AGENTS_FILE)
+    if _policy_index["stat"] != stat_key:
+        _load_agents()  # re-indexes on success
+        if _policy_index["stat"] != stat_key:
+            # Registry missing or unreadable: no token is valid
+            _index_policies(AgentStore(), stat_key)
+    entry = _policy_index["agents"].get(agent_id)
+    if not entry or entry[0] != token:
+        return None
+    return entry[1], entry[2]
+
+
+def get_agent_policy_bytes(agent_id: str, etag: str) -> tuple[str, bytes] | None:
+    """``(etag, body)`` of the serialized policy, encoded once per version.
+
+    ``etag`` is the caller's view from ``policy_entry``; if the policy moved on
+    in between, the current version and its ETag are returned instead.
+    """
+    body = _policy_bodies.get((agent_id, etag))
+    if body is not None:
+        return etag, body
+
+    store = _load_agents()
+    record = store.agents.get(agent_id)
+    if not record:
+        return None
+    current = _policy_etag(record)
+    body = json.dumps(record.policy.model_dump(mode="json")).encode()
+    _policy_bodies[(agent_id, current)] = body
+    return current, body
+
+
 def validate_token(agent_id: str, token: str) -> bool:
     """Check if a sidecar token is valid for the given agent."""
     store = _load_agents()
@@ -458,25 +1054,46 @@ def validate_token(agent_id: str, token: str) -> bool:
 
 def ingest_event(event: AgentEvent) -> dict:
     """Record an event from an agent/sidecar."""
-    # Update agent record
+    result = ingest_events([event])
+    return {"ok": True, "event_id": result["last_event_id"]}
+
+
+def ingest_events(events: list[AgentEvent]) -> dict:
+    """Record a batch of events with one registry and one event-log write."""
+    # Update agent records
     store = _load_agents()
-    record = store.agents.get(event.agent_id)
-    if record:
-        now = datetime.now(timezone.utc).isoformat()
+    now = datetime.now(timezone.utc).isoformat()
+    touched = {}
+    tiers: dict[str, int] = {}
+    for event in events:
+        record = store.agents.get(event.agent_id)
+        tier = record.policy.tier.value if record else "unregistered"
+        tiers[tier] = tiers.get(tier, 0) + 1
+        if not record:
+            continue
         if event.action == "heartbeat":
             record.last_heartbeat = now
         else:
             record.last_event = now
             record.last_heartbeat = now  # any event counts as alive
-        _refresh_status(record)
+        touched[event.agent_id] = record
+    for tier, count in tiers.items():
+        metrics.inc("switchboard_events_ingested_total", count, tier=tier)
+    if touched:
+        for record in touched.values():
+            _refresh_status(record)
         _save_agents(store)
 
     # Append to event log
-    event_store = _load_events()
-    event_store.events.append(event)
-    _save_events(event_store)
+    event_log = _load_events()
+    for event in events:
+        event_log.append(event)
+    _save_events(event_log)
+    if fleet_hub.active:
+        for event in events:
+            fleet_hub.publish("event", event.model_dump(mode="json"))
 
-    return {"ok": True, "event_id": len(event_store.events) - 1}
+    return {"ok": True, "count": len(events), "last_event_id": len(event_log) - 1}
 
 
 def query_events(
@@ -486,19 +1103,7 @@ def query_events(
     limit: int = 100,
 ) -> dict:
     """Query the audit log with optional filters."""
-    event_store = _load_events()
-    events = event_store.events
-
-    if agent_id:
-        events = [e for e in events if e.agent_id == agent_id]
-    if action:
-        events = [e for e in events if e.action == action]
-    if since:
-        events = [e for e in events if e.timestamp >= since]
-
-    # Most recent first, apply limit
-    events = list(reversed(events))[:limit]
-
+    events = _filter_events(agent_id, action, since, limit)
     return {
         "ok": True,
         "count": len(events),
@@ -506,6 +1111,27 @@ def query_events(
     }
 
 
+def query_events_bytes(
+    agent_id: str | None = None,
+    action: str | None = None,
+    since: str | None = None,
+    limit: int = 100,
+) -> bytes:
+    """``query_events`` encoded by pydantic straight to JSON bytes."""
+    events = _filter_events(agent_id, action, since, limit)
+    return encoding.envelope(
+        {"ok": True, "count": len(events)}, "events", _EVENT_LIST.dump_json(events)
+    )
+
+
+def _filter_events(
+    agent_id: str | None, action: str | None, since: str | None, limit: int
+) -> list[AgentEvent]:
+    # Most recent first, apply limit
+    log = _load_events()
+    return log.events_at(log.find(agent_id, action, since, limit))
+
+
 # --- Telemetry ingestion ---
 
 
@@ -516,11 +1142,54 @@ def ingest_telemetry(telemetry: AgentTelemetry) -> dict:
     if not record:
         return {"ok": False, "error": f"Agent '{telemetry.agent_id}' not found"}
 
+    _apply_telemetry(record, telemetry)
+    _refresh_status(record)
+    _save_agents(store)
+    _append_telemetry(telemetry, record)
+
+    return {"ok": True, "agent_id": telemetry.agent_id, **_integrity_summary(record)}
+
+
+def checkin(checkin: AgentCheckin) -> dict:
+    """Record a sidecar check-in with one registry write.
+
+    The check-in proves liveness (like a heartbeat, without an audit-log
+    entry) and may carry a telemetry sample. The reply includes the current
+    policy version and ETag, so the sidecar fetches the policy only when it
+    has changed.
+    """
+    store = _load_agents()
+    record = store.agents.get(checkin.agent_id)
+    if not record:
+        return {"ok": False, "error": f"Agent '{checkin.agent_id}' not found"}
+
+    record.last_heartbeat = datetime.now(UTC).isoformat()
+    if checkin.telemetry is not None:
+        _apply_telemetry(record, checkin.telemetry)
+    _refresh_status(record)
+    _save_agents(store)
+
+    result = {
+        "ok": True,
+        "agent_id": checkin.agent_id,
+        "status": record.status.value,
+        "policy_version": record.policy.version,
+        "policy_etag": _policy_etag(record),
+    }
+    if checkin.telemetry is not None:
+        _append_telemetry(checkin.telemetry, record)
+        result.update(_integrity_summary(record))
+    return result
+
+
+def _apply_telemetry(record: AgentRecord, telemetry: AgentTelemetry) -> None:
     record.last_telemetry = telemetry.timestamp
     record.last_probe_source = telemetry.probe_source
     record.last_telemetry_mode = telemetry.telemetry_mode
     record.last_network_rtt_ms = telemetry.network_rtt_ms
     record.last_network_jitter_ms = telemetry.network_jitter_ms
+    record.last_network_rtt_min_ms = telemetry.network_rtt_min_ms
+    record.last_network_connect_ms = telemetry.network_connect_ms
     record.last_sensor_hid_rtt_ms = telemetry.sensor_hid_rtt_ms
     record.last_sensor_dwell_ms = telemetry.sensor_dwell_ms
     record.last_sensor_os_jitter_ms = telemetry.sensor_os_jitter_ms
@@ -532,16 +1201,21 @@ def ingest_telemetry(telemetry: AgentTelemetry) -> dict:
         record.observed_region = telemetry.observed_region
 
     record.integrity = _assess_integrity(record.policy, telemetry)
-    _refresh_status(record)
-    _save_agents(store)
 
+
+def _append_telemetry(telemetry: AgentTelemetry, record: AgentRecord) -> None:
+    metrics.inc("switchboard_telemetry_ingested_total", tier=record.policy.tier.value)
     telemetry_store = _load_telemetry()
     telemetry_store.telemetry.append(telemetry)
     _save_telemetry(telemetry_store)
+    if fleet_hub.active:
+        fleet_hub.publish(
+            "telemetry", _serialize_telemetry_entry(telemetry, record.integrity)
+        )
+
 
+def _integrity_summary(record: AgentRecord) -> dict:
     return {
-        "ok": True,
-        "agent_id": telemetry.agent_id,
         "integrity_status": record.integrity.status.value,
         "integrity_score": record.integrity.score,
         "integrity_reasons": record.integrity.reasons,
@@ -570,6 +1244,19 @@ def query_telemetry(
     }
 
 
+def fleet_telemetry_bytes(
+    agent_id: str | None = None,
+    since: str | None = None,
+    limit: int = 200,
+) -> bytes:
+    """``fleet_telemetry`` encoded, reused until agents or telemetry change."""
+    return _cached_response(
+        ("fleet/telemetry", agent_id, since, limit),
+        ("agents", "telemetry"),
+        lambda: (fleet_telemetry(agent_id=agent_id, since=since, limit=limit), None),
+    )
+
+
 def fleet_telemetry(
     agent_id: str | None = None,
     since: str | None = None,
@@ -588,8 +1275,16 @@ def fleet_telemetry(
     if limit > 0:
         entries = entries[-limit:]
 
+    return _telemetry_report(entries, agents_store, agent_id)
+
+
+def _telemetry_report(
+    entries: list[AgentTelemetry], agents_store: AgentStore, agent_id: str | None
+) -> dict:
     rtt_values: list[float] = []
     jitter_values: list[float] = []
+    rtt_min_values: list[float] = []
+    connect_values: list[float] = []
     hid_values: list[float] = []
     dwell_values: list[float] = []
     os_jitter_values: list[float] = []
@@ -634,6 +1329,10 @@ def fleet_telemetry(
             rtt_values.append(telemetry.network_rtt_ms)
         if telemetry.network_jitter_ms is not None:
             jitter_values.append(telemetry.network_jitter_ms)
+        if telemetry.network_rtt_min_ms is not None:
+            rtt_min_values.append(telemetry.network_rtt_min_ms)
+        if telemetry.network_connect_ms is not None:
+            connect_values.append(telemetry.network_connect_ms)
         if telemetry.sensor_hid_rtt_ms is not None:
             hid_values.append(telemetry.sensor_hid_rtt_ms)
         if telemetry.sensor_dwell_ms is not None:
@@ -661,6 +1360,8 @@ def fleet_telemetry(
             "metrics": {
                 "network_rtt_ms": _build_scorecard(rtt_values),
                 "network_jitter_ms": _build_scorecard(jitter_values),
+                "network_rtt_min_ms": _build_scorecard(rtt_min_values),
+                "network_connect_ms": _build_scorecard(connect_values),
                 "sensor_hid_rtt_ms": _build_scorecard(hid_values),
                 "sensor_dwell_ms": _build_scorecard(dwell_values),
                 "sensor_os_jitter_ms": _build_scorecard(os_jitter_values),
@@ -675,19 +1376,117 @@ def fleet_telemetry(
 
 def fleet_status() -> dict:
     """All agents with health, tier, last event."""
+    return _fleet_status_payload()[0]
+
+
+def fleet_status_bytes() -> bytes:
+    """``fleet_status`` encoded, reused until the registry changes.
+
+    Entries also expire when the next live agent would time out.
+    """
+    return _cached_response(("fleet/status",), ("agents",), _fleet_status_payload)
+
+
+def _fleet_status_payload() -> tuple[dict, float | None]:
     store = _load_agents()
+    before = [record.status for record in store.agents.values()]
     _refresh_statuses(store)
-    _save_agents(store)
+    # Persist only real transitions, so polling does not rewrite the registry
+    if [record.status for record in store.agents.values()] != before:
+        _save_agents(store)
 
     agents = [_serialize_agent_summary(record) for record in store.agents.values()]
-    return {"ok": True, "agents": agents}
+    return {"ok": True, "agents": agents}, _status_deadline(store)
 
 
 def fleet_health() -> dict:
     """Aggregate fleet health counts."""
+    return _fleet_health_payload()[0]
+
+
+def fleet_health_bytes() -> bytes:
+    """``fleet_health`` encoded; cached like ``fleet_status_bytes``."""
+    return _cached_response(("fleet/health",), ("agents",), _fleet_health_payload)
+
+
+def _fleet_health_payload() -> tuple[dict, float | None]:
+    store = _load_agents()
+    _refresh_statuses(store)
+    return {"ok": True, **_fleet_health_counts(store)}, _status_deadline(store)
+
+
+def fleet_snapshot(
+    events_limit: int = 25,
+    telemetry_limit: int = 160,
+    telemetry_agent_id: str | None = None,
+) -> dict:
+    """Everything the dashboard renders, from one read of each store.
+
+    Health counts and agent summaries come from the same registry load, so
+    they always agree. A zero limit skips that section's store entirely.
+    ``telemetry_agent_id`` scopes the telemetry section to one agent.
+    """
     store = _load_agents()
     _refresh_statuses(store)
+    return _fleet_snapshot(store, events_limit, telemetry_limit, telemetry_agent_id)
+
+
+def fleet_stream_snapshot(events_limit: int = 25) -> dict:
+    """Initial state for a fleet stream subscriber.
+
+    Pending agent/health changes are published to existing subscribers first,
+    so the snapshot and the published view agree from here on.
+    """
+    store = _load_agents()
+    _publish_fleet_changes(store, force=True)
+    return _fleet_snapshot(store, events_limit, 0, None)
+
+
+def _fleet_snapshot(
+    store: AgentStore,
+    events_limit: int,
+    telemetry_limit: int,
+    telemetry_agent_id: str | None,
+) -> dict:
+    events: list[dict] = []
+    if events_limit:
+        recent = _filter_events(None, None, None, events_limit)
+        events = [e.model_dump() for e in recent]
+
+    entries: list[AgentTelemetry] = []
+    if telemetry_limit:
+        entries = _load_store_tail(
+            _TELEMETRY_FILE,
+            "telemetry",
+            AgentTelemetry,
+            telemetry_limit,
+            agent_id=telemetry_agent_id,
+        )
 
+    return {
+        "ok": True,
+        "health": {"ok": True, **_fleet_health_counts(store)},
+        "agents": [_serialize_agent_summary(r) for r in store.agents.values()],
+        "events": events,
+        "telemetry": _telemetry_report(entries, store, telemetry_agent_id),
+        "presets": list_policy_presets()["presets"],
+    }
+
+
+def sweep_fleet_status() -> None:
+    """Publish heartbeat-timeout transitions, which happen without a write.
+
+    Called on stream keepalives; rate-limited so concurrent subscribers share
+    one registry read per ``_FLEET_SWEEP_INTERVAL``.
+    """
+    now = time.monotonic()
+    if now - _fleet_published["swept"] < _FLEET_SWEEP_INTERVAL:
+        return
+    _fleet_published["swept"] = now
+    _publish_fleet_changes(_load_agents())
+
+
+def _fleet_health_counts(store: AgentStore) -> dict:
     counts = {"active": 0, "inactive": 0, "degraded": 0, "total": 0}
     integrity = {"normal": 0, "elevated": 0, "degraded": 0, "unknown": 0}
     for record in store.agents.values():
@@ -696,7 +1495,6 @@ def fleet_health() -> dict:
         integrity[record.integrity.status.value] += 1
 
     return {
-        "ok": True,
         **counts,
         "integrity_normal": integrity["normal"],
         "integrity_elevated": integrity["elevated"],
@@ -711,6 +1509,19 @@ def fleet_health() -> dict:
 def _apply_preset_to_record(
     record: AgentRecord, preset: str, pin_observed_claims: bool
 ) -> IntegrityPolicy | None:
+    integrity = _preset_integrity(record, preset, pin_observed_claims)
+    if integrity is None:
+        return None
+
+    record.policy.integrity = integrity
+    record.policy.version += 1
+    return integrity
+
+
+def _preset_integrity(
+    record: AgentRecord, preset: str, pin_observed_claims: bool
+) -> IntegrityPolicy | None:
+    """Integrity policy a preset would give this agent (record is not modified)."""
     cfg = _INTEGRITY_POLICY_PRESETS.get(preset)
     if not cfg:
         return None
@@ -738,11 +1549,26 @@ def _apply_preset_to_record(
         integrity.expected_models = list(previous.expected_models)
         integrity.expected_regions = list(previous.expected_regions)
 
-    record.policy.integrity = integrity
-    record.policy.version += 1
     return integrity
 
 
+def _action_denial_reason(
+    action: str, allowed: set[str] | list[str], denied: set[str] | list[str]
+) -> str | None:
+    """Why an action policy blocks ``action`` (None when it is permitted).
+
+    ``denied_actions`` always wins; a non-empty ``allowed_actions`` is a
+    whitelist. Heartbeats are protocol traffic and never blocked.
+    """
+    if action == "heartbeat":
+        return None
+    if action in denied:
+        return "denied_action"
+    if allowed and action not in allowed:
+        return "not_in_allowed_actions"
+    return None
+
+
 def _latest_telemetry_by_agent() -> dict[str, AgentTelemetry]:
     latest: dict[str, AgentTelemetry] = {}
     telemetry_store = _load_telemetry()
@@ -762,6 +1588,8 @@ def _serialize_telemetry_entry(
         "telemetry_mode": telemetry.telemetry_mode.value,
         "network_rtt_ms": telemetry.network_rtt_ms,
         "network_jitter_ms": telemetry.network_jitter_ms,
+        "network_rtt_min_ms": telemetry.network_rtt_min_ms,
+        "network_connect_ms": telemetry.network_connect_ms,
         "is_remote_session": telemetry.is_remote_session,
         "observed_provider": telemetry.observed_provider,
         "observed_model": telemetry.observed_model,
@@ -805,6 +1633,22 @@ def _percentile(sorted_values: list[float], percentile: float) -> float:
     return lower + (upper - lower) * weight
 
 
+def _status_deadline(store: AgentStore) -> float | None:
+    """Epoch seconds at which the next live agent's heartbeat times out."""
+    deadlines = []
+    for record in store.agents.values():
+        if record.status is AgentStatus.inactive or not record.last_heartbeat:
+            continue
+        try:
+            last = datetime.fromisoformat(record.last_heartbeat)
+        except (ValueError, TypeError):
+            continue
+        if last.tzinfo is None:
+            last = last.replace(tzinfo=timezone.utc)
+        deadlines.append((last + _HEARTBEAT_TIMEOUT).timestamp())
+    return min(deadlines, default=None)
+
+
 def _refresh_statuses(store: AgentStore) -> None:
     """Update status for all agents based on heartbeat freshness."""
     for record in store.agents.values():
@@ -0,0 +1,134 @@
+"""Validation-free model construction for stores Switchboard wrote itself.
+
+Persisted stores are produced by ``model_dump_json``, so every record already
+has every field, in its serialized type. Rebuilding them through pydantic
+validation (or ``model_construct``, which is slower still) costs several
+microseconds per record; ``construct`` instead converts only what JSON cannot
+carry (enums, nested models) and sets instance state directly.
+
+Only use it on data whose provenance is verified: the store loader checks a
+checksum and the model ``fingerprint`` first, and validates otherwise.
+
+Instance state is written through the slots pydantic 2 declares on
+``BaseModel``. If a pydantic release lays them out differently, ``construct``
+falls back to ``model_construct`` after the same conversions.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import types
+import typing
+from collections.abc import Callable
+from enum import Enum
+
+from pydantic import BaseModel
+
+# The instance slots of the pydantic 2 releases this was tested against
+_SLOTS = ("__dict__", "__pydantic_fields_set__", "__pydantic_extra__", "__pydantic_private__")
+
+# Slot setters pydantic uses internally; bypass BaseModel.__setattr__.
+# None when the layout is not the expected one.
+_slot_setters = (
+    tuple(BaseModel.__dict__[name].__set__ for name in _SLOTS)
+    if getattr(BaseModel, "__slots__", None) == _SLOTS
+    else None
+)
+
+_SCALARS = (str, int, float, bool)
+
+# model class -> (every field name, [(field, converter)])
+_Plan = tuple[frozenset[str], list[tuple[str, Callable]]]
+_plans: dict[type[BaseModel], _Plan] = {}
+_fingerprints: dict[type[BaseModel], str] = {}
+
+
+def fingerprint(cls: type[BaseModel]) -> str:
+    """Short digest of ``cls``'s JSON schema, nested models included.
+
+    Changes whenever a field is added, removed, renamed or retyped, so a
+    store written under another model layout is never trusted.
+    """
+    digest = _fingerprints.get(cls)
+    if digest is None:
+        schema = json.dumps(cls.model_json_schema(), sort_keys=True)
+        digest = _fingerprints[cls] = hashlib.sha256(schema.encode()).hexdigest()[:16]
+    return digest
+
+
+def construct(cls: type[BaseModel], data: dict):
+    """Build ``cls`` from its own ``model_dump(mode="json")`` output.
+
+    ``data`` is consumed (converted in place) and must hold every field.
+    """
+    return _construct_list(cls, [data])[0]
+
+
+def _construct_list(cls: type[BaseModel], records: list[dict]) -> list:
+    plan = _plans.get(cls)
+    if plan is None:
+        plan = _plans[cls] = _compile(cls)
+    fields_set, converters = plan
+    for data in records:
+        for name, convert in converters:
+            data[name] = convert(data[name])
+    if _slot_setters is None:
+        return [cls.model_construct(set(fields_set), **data) for data in records]
+
+    set_dict, set_fields_set, set_extra, set_private = _slot_setters
+    new = cls.__new__
+    out = []
+    for data in records:
+        obj = new(cls)
+        set_dict(obj, data)
+        # Each model gets its own set: pydantic adds to it on assignment
+        set_fields_set(obj, set(fields_set))
+        set_extra(obj, None)
+        set_private(obj, None)
+        out.append(obj)
+    return out
+
+
+def _compile(cls: type[BaseModel]) -> _Plan:
+    if cls.model_config.get("extra") == "allow" or cls.__private_attributes__:
+        raise TypeError(f"{cls.__name__} needs validation to construct")
+    converters = []
+    for name, field in cls.model_fields.items():
+        convert = _converter(field.annotation)
+        if convert is not None:
+            converters.append((name, convert))
+    return frozenset(cls.model_fields), converters
+
+
+def _converter(annotation) -> Callable | None:
+    """Function mapping a JSON value to the field's Python value, or None."""
+    origin = typing.get_origin(annotation)
+    if origin in (typing.Union, types.UnionType):
+        args = [a for a in typing.get_args(annotation) if a is not type(None)]
+        if len(args) != 1:
+            raise TypeError(f"unsupported union {annotation!r}")
+        inner = _converter(args[0])
+        if inner is None:
+            return None
+        return lambda value: None if value is None else inner(value)
+    if origin is list:
+        (item,) = typing.get_args(annotation)
+        if isinstance(item, type) and issubclass(item, BaseModel):
+            return lambda value: _construct_list(item, value)
+        inner = _converter(item)
+        if inner is None:
+            return None
+        return lambda value: [inner(v) for v in value]
+    if origin is dict:
+        inner = _converter(typing.get_args(annotation)[1])
+        if inner is None:
+            return None
+        return lambda value: {key: inner(v) for key, v in value.items()}
+    if isinstance(annotation, type) and issubclass(annotation, Enum):
+        return {member.value: member for member in annotation}.__getitem__
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return lambda value: construct(annotation, value)
+    if annotation in _SCALARS:
+        return None
+    raise TypeError(f"no trusted conversion for {annotation!r}")
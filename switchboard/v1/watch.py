@@ -0,0 +1,144 @@
+"""In-process change notification for long-polling clients.
+
+The service layer is synchronous and runs on the event loop thread; it calls
+``notify`` when it observes a change, and async route handlers ``wait`` on it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+
+class PolicyWatch:
+    """Wakes long-polling policy requests when an agent's policy changes.
+
+    Each agent gets a one-shot ``asyncio.Event`` per change generation:
+    ``notify`` sets and discards it, so later waiters park on a fresh one.
+    Events are bound to the running loop and reset if the loop changes.
+    """
+
+    def __init__(self) -> None:
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._events: dict[str, asyncio.Event] = {}
+
+    def _event(self, agent_id: str) -> asyncio.Event:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._events = {}
+        event = self._events.get(agent_id)
+        if event is None:
+            event = self._events[agent_id] = asyncio.Event()
+        return event
+
+    def notify(self, agent_id: str) -> None:
+        """Wake every request waiting on ``agent_id``. Safe from any thread."""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        event = self._events.pop(agent_id, None)
+        if event is None:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            event.set()
+        else:
+            loop.call_soon_threadsafe(event.set)
+
+    async def wait(self, agent_id: str, timeout: float) -> bool:
+        """Park until ``notify(agent_id)`` or ``timeout``. True if notified.
+
+        Callers must check the current version *before* calling, with no
+        ``await`` in between, so a change cannot slip past unobserved.
+        """
+        event = self._event(agent_id)
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except TimeoutError:
+            return False
+        return True
+
+    async def wait_any(self, agent_ids: list[str], timeout: float) -> bool:
+        """Park until any of ``agent_ids`` is notified or ``timeout``.
+
+        The same check-before-waiting rule as ``wait`` applies.
+        """
+        waiters = [
+            asyncio.ensure_future(self._event(agent_id).wait())
+            for agent_id in set(agent_ids)
+        ]
+        try:
+            done, _ = await asyncio.wait(
+                waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+        finally:
+            for waiter in waiters:
+                waiter.cancel()
+        return bool(done)
+
+    def waiting(self) -> int:
+        """Number of agents with at least one parked request."""
+        return len(self._events)
+
+
+policy_watch = PolicyWatch()
+
+
+class FleetHub:
+    """Fan-out of fleet change notifications to streaming subscribers.
+
+    Each subscriber owns a bounded queue of ``(kind, data)`` items. A
+    subscriber that falls ``max_queue`` items behind has its backlog dropped
+    and receives a single ``("resync", None)`` so it can reload a snapshot.
+    Publishing with no subscribers is a no-op.
+    """
+
+    def __init__(self, max_queue: int = 1000) -> None:
+        self.max_queue = max_queue
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._subscribers: set[asyncio.Queue] = set()
+
+    @property
+    def active(self) -> bool:
+        return bool(self._subscribers)
+
+    def subscribe(self) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._subscribers = set()
+        queue: asyncio.Queue = asyncio.Queue(self.max_queue)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+
+    def publish(self, kind: str, data) -> None:
+        """Queue ``(kind, data)`` for every subscriber. Safe from any thread."""
+        loop = self._loop
+        if not self._subscribers or loop is None or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._deliver(kind, data)
+        else:
+            loop.call_soon_threadsafe(self._deliver, kind, data)
+
+    def _deliver(self, kind: str, data) -> None:
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait((kind, data))
+            except asyncio.QueueFull:
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(("resync", None))
+
+
+fleet_hub = FleetHub()
@@ -2,11 +2,40 @@
 
 from __future__ import annotations
 
+import importlib.util
+import sys
+from pathlib import Path
+
 import pytest
 from fastapi.testclient import TestClient
 
 ADMIN_KEY = "test-admin-key-abc123"
 
+_SIDECAR_DIR = Path(__file__).resolve().parent.parent / "sidecar"
+
+
+def load_sidecar_script(filename: str, name: str):
+    """Import a standalone script from sidecar/ (not a package) as ``name``."""
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, _SIDECAR_DIR / filename)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(scope="session")
+def sidecar():
+    """sidecar/switchboard-sidecar.py as a module."""
+    return load_sidecar_script("switchboard-sidecar.py", "switchboard_sidecar")
+
+
+@pytest.fixture(scope="session")
+def policy_snapshot():
+    """sidecar/policy_snapshot.py, the agent-side snapshot reader, as a module."""
+    return load_sidecar_script("policy_snapshot.py", "policy_snapshot")
+
 
 @pytest.fixture(autouse=True)
 def _isolate_storage(monkeypatch, tmp_path):
@@ -0,0 +1,115 @@
+"""Tests for negotiated response compression and pre-compressed static assets."""
+
+import gzip
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from switchboard import compression
+from switchboard.compression import CompressionMiddleware
+
+
+@pytest.fixture
+def gzip_only(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+
+
+def test_negotiate_honors_q_values(gzip_only):
+    assert compression.negotiate("") is None
+    assert compression.negotiate("identity") is None
+    assert compression.negotiate("gzip, deflate") == "gzip"
+    assert compression.negotiate("GZIP;q=0.5") == "gzip"
+    assert compression.negotiate("gzip;q=0, *") is None
+    assert compression.negotiate("*") == "gzip"
+    assert compression.negotiate("br") is None
+
+
+def test_negotiate_prefers_brotli_when_installed():
+    pytest.importorskip("brotli")
+    assert compression.negotiate("gzip, deflate, br") == "br"
+    assert compression.negotiate("gzip, br;q=0") == "gzip"
+    assert compression.negotiate("gzip;q=1, br;q=0.8") == "gzip"
+
+
+def test_large_json_is_compressed(client, registered_agent, bearer_headers, gzip_only):
+    agent_id, _ = registered_agent
+    for _ in range(40):
+        client.post(
+            "/api/v1/events",
+            json={"agent_id": agent_id, "action": "file_read", "target": "/workspace/a.py"},
+            headers=bearer_headers,
+        )
+
+    plain = client.get("/api/v1/events?limit=1000", headers={"Accept-Encoding": "identity"})
+    packed = client.get("/api/v1/events?limit=1000", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in plain.headers
+    assert packed.headers["content-encoding"] == "gzip"
+    assert packed.headers["vary"] == "Accept-Encoding"
+    assert packed.json() == plain.json()
+    assert packed.num_bytes_downloaded * 5 < plain.num_bytes_downloaded
+
+
+def test_small_responses_are_sent_as_is(client):
+    resp = client.get("/health", headers={"Accept-Encoding": "gzip, br"})
+    assert "content-encoding" not in resp.headers
+    assert resp.json() == {"status": "healthy"}
+
+
+def test_streams_pass_through():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=1)
+
+    @app.get("/stream")
+    async def stream():
+        async def frames():
+            for _ in range(3):
+                yield "data: x\n\n" * 100
+
+        return StreamingResponse(frames(), media_type="text/event-stream")
+
+    @app.get("/text")
+    async def text():
+        return StreamingResponse(iter(["a" * 2000]), media_type="text/plain")
+
+    with TestClient(app) as test_client:
+        resp = test_client.get("/stream", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in resp.headers
+        assert resp.text == "data: x\n\n" * 300
+        # Chunked bodies are never buffered to compress them
+        assert "content-encoding" not in test_client.get("/text").headers
+
+
+def test_static_asset_is_precompressed_and_revalidated(tmp_path, gzip_only):
+    from starlette.datastructures import Headers
+
+    page = tmp_path / "page.html"
+    page.write_text("<html>" + "switchboard " * 500 + "</html>")
+    asset = compression.StaticAsset(page, "text/html; charset=utf-8")
+
+    resp = asset.response(Headers({"accept-encoding": "gzip"}))
+    assert resp.headers["content-encoding"] == "gzip"
+    assert gzip.decompress(resp.body) == page.read_bytes()
+    etag = resp.headers["etag"]
+    assert asset.response(Headers({"accept-encoding": "gzip"})).body is resp.body
+
+    cached = asset.response(Headers({"accept-encoding": "gzip", "if-none-match": etag}))
+    assert cached.status_code == 304
+    plain = asset.response(Headers({"if-none-match": etag}))
+    assert plain.status_code == 200  # a different representation
+    assert plain.body == page.read_bytes()
+
+    page.write_text("<html>edited</html>")
+    assert asset.response(Headers({})).body == b"<html>edited</html>"
+
+
+def test_dashboard_served_compressed(client):
+    resp = client.get("/dashboard", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["content-encoding"] == "gzip"
+    assert "switchboard" in resp.text.lower()
+    again = client.get(
+        "/dashboard",
+        headers={"Accept-Encoding": "gzip", "If-None-Match": resp.headers["etag"]},
+    )
+    assert again.status_code == 304
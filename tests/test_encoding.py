@@ -0,0 +1,56 @@
+"""Tests for the fast JSON response encoding path."""
+
+import json
+
+from fastapi.encoders import jsonable_encoder
+
+from switchboard.v1 import encoding, services
+from switchboard.v1.models import AgentEvent, EventStore
+
+
+def test_dumps_matches_stdlib_with_and_without_orjson(monkeypatch):
+    payload = {"ok": True, "name": "café", "rtt": 12.5, "none": None, "n": [1, 2]}
+    fast = encoding.dumps(payload)
+    monkeypatch.setattr(encoding, "orjson", None)
+    plain = encoding.dumps(payload)
+    assert plain == b'{"ok":true,"name":"caf\xc3\xa9","rtt":12.5,"none":null,"n":[1,2]}'
+    assert json.loads(fast) == json.loads(plain)
+
+
+def test_envelope_splices_preencoded_array():
+    body = encoding.envelope({"ok": True, "count": 2}, "items", b'[{"a":1},{"a":2}]')
+    assert json.loads(body) == {"ok": True, "count": 2, "items": [{"a": 1}, {"a": 2}]}
+
+
+def test_query_events_bytes_match_default_encoding():
+    store = EventStore()
+    for i in range(30):
+        store.events.append(
+            AgentEvent(
+                agent_id=f"a{i % 3}",
+                action="blocked_call" if i % 4 else "file_read",
+                target="t",
+                result="denied" if i % 4 else "success",
+                detail="✓ \"quoted\"" if i % 5 == 0 else None,
+                duration_ms=i,
+            )
+        )
+    services._save_events(store)
+
+    for filters in ({}, {"agent_id": "a1", "limit": 4}, {"action": "file_read"}):
+        expected = jsonable_encoder(services.query_events(**filters))
+        assert json.loads(services.query_events_bytes(**filters)) == expected
+
+
+def test_query_events_endpoint(client, registered_agent, bearer_headers):
+    agent_id, _ = registered_agent
+    client.post(
+        "/api/v1/events",
+        json={"agent_id": agent_id, "action": "file_read", "target": "x"},
+        headers=bearer_headers,
+    )
+    resp = client.get("/api/v1/events")
+    assert resp.headers["content-type"] == "application/json"
+    data = resp.json()
+    assert data["count"] == 1
+    assert data["events"][0]["result"] == "success"
@@ -0,0 +1,134 @@
+"""Tests for the compact in-memory event log."""
+
+import gc
+import json
+import tracemalloc
+
+import pytest
+
+from switchboard.v1 import encoding, services
+from switchboard.v1.eventlog import EventLog
+from switchboard.v1.models import AgentEvent, EventStore
+
+
+def _events(n: int) -> list[AgentEvent]:
+    return [
+        AgentEvent(
+            agent_id=f"agent-{i % 20}",
+            action=("file_read", "api_call", "heartbeat", "bash")[i % 4],
+            target="sidecar" if i % 4 == 2 else f"/workspace/src/module_{i % 300}.py",
+            result="denied" if i % 7 == 0 else "success",
+            detail="ok" if i % 3 == 0 else None,
+            duration_ms=i % 900,
+            tier="L1",
+        )
+        for i in range(n)
+    ]
+
+
+def test_rows_round_trip_exactly():
+    odd = [
+        AgentEvent(agent_id="a", action="x", target="", timestamp="2026-01-01T00:00:00Z"),
+        AgentEvent(agent_id="a", action="x", target="/", timestamp="2026-01-01T02:00:00+02:00"),
+        AgentEvent(agent_id="a", action="x", target="t", timestamp="not a time", duration_ms=1 << 70),
+        AgentEvent(agent_id="a", action="x", target="t", timestamp="", duration_ms=-(1 << 63)),
+        AgentEvent(agent_id="a", action="x", target="t", timestamp="2026-01-01T00:00:00.000001+00:00"),
+    ]
+    events = _events(50) + odd
+    log = EventLog.from_events(events)
+    assert log.events == events
+    assert list(log.records()) == [e.model_dump(mode="json") for e in events]
+    assert EventLog.from_records(log.records()).events == events
+
+
+def test_trim_keeps_newest_and_compacts_strings():
+    events = [
+        AgentEvent(
+            agent_id="a",
+            action="read",
+            target=f"/t/{i}",
+            timestamp="odd" if i % 2 else AgentEvent(agent_id="a", action="", target="").timestamp,
+            duration_ms=1 << 64 if i == 999 else i,
+        )
+        for i in range(1000)
+    ]
+    log = EventLog.from_events(events)
+    log.trim(10)
+    assert log.events == events[-10:]
+    assert len(log._strings) < 30  # leaves of dropped rows were released
+    log.append(events[0])
+    assert log.events == events[-10:] + events[:1]
+
+
+def test_find_matches_filtering_the_models():
+    events = _events(200)
+    log = EventLog.from_events(events)
+    since = events[120].timestamp
+    for agent_id, action, limit in (
+        (None, None, 5),
+        ("agent-3", None, 100),
+        (None, "bash", 7),
+        ("agent-3", "bash", 100),
+        ("nobody", None, 10),
+    ):
+        expected = [
+            e
+            for e in reversed(events)
+            if (agent_id is None or e.agent_id == agent_id)
+            and (action is None or e.action == action)
+        ][:limit]
+        assert log.events_at(log.find(agent_id, action, None, limit)) == expected
+    assert log.events_at(log.find(since=since)) == [
+        e for e in reversed(events) if e.timestamp >= since
+    ]
+
+
+def test_memory_per_event_is_at_least_five_times_lower():
+    raw = encoding.dumps({"events": [e.model_dump(mode="json") for e in _events(5000)]})
+
+    def resident(build):
+        gc.collect()
+        tracemalloc.start()
+        built = build()
+        gc.collect()
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        assert built
+        return size
+
+    models = resident(lambda: EventStore(**json.loads(raw)).events)
+    compact = resident(lambda: EventLog.from_records(json.loads(raw)["events"]))
+    assert models >= 5 * compact
+
+
+def test_log_stays_resident_until_file_changes(monkeypatch):
+    reads = []
+    real = services._read_store_data
+    monkeypatch.setattr(
+        services, "_read_store_data", lambda *a: reads.append(a) or real(*a)
+    )
+    services._save_events(EventStore(events=_events(3)))
+    log = services._load_events()
+    assert services._load_events() is log
+    assert reads == []
+
+    data = json.loads(services._EVENTS_FILE.read_text())
+    data["events"][0]["target"] = "/edited/elsewhere.py"
+    services._EVENTS_FILE.write_text(json.dumps(data, indent=4))
+    assert services._load_events().events[0].target == "/edited/elsewhere.py"
+    assert len(reads) == 1
+
+
+def test_failed_save_drops_unpersisted_rows_from_the_cache(monkeypatch):
+    services._save_events(EventStore(events=_events(3)))
+    services._load_events()
+
+    def disk_full(*args):
+        raise OSError("No space left on device")
+
+    with monkeypatch.context() as patch, pytest.raises(OSError):
+        patch.setattr(services, "_write_store_body", disk_full)
+        services.ingest_events(_events(2))
+
+    assert len(services._load_events()) == 3
+    assert len(services.query_events(limit=100)["events"]) == 3
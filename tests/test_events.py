@@ -121,3 +121,38 @@ def test_non_heartbeat_event_updates_last_event(client, admin_headers, registere
     )
     resp = client.get(f"/api/v1/agents/{agent_id}", headers=admin_headers)
     assert resp.json()["last_event"] is not None
+
+
+def test_ingest_batch(client, admin_headers, registered_agent, bearer_headers):
+    agent_id, _ = registered_agent
+    events = [
+        {"agent_id": agent_id, "action": f"action_{i}", "target": "t"} for i in range(5)
+    ]
+    resp = client.post("/api/v1/events/batch", json={"events": events}, headers=bearer_headers)
+    assert resp.status_code == 200
+    assert resp.json() == {"ok": True, "count": 5, "last_event_id": 4}
+
+    data = client.get("/api/v1/events").json()
+    assert [e["action"] for e in data["events"]] == [f"action_{i}" for i in range(4, -1, -1)]
+    agent = client.get(f"/api/v1/agents/{agent_id}", headers=admin_headers).json()
+    assert agent["last_event"] is not None
+
+
+def test_ingest_batch_is_all_or_nothing(client, admin_headers, registered_agent, bearer_headers):
+    agent_id, _ = registered_agent
+    good = {"agent_id": agent_id, "action": "file_read", "target": "t"}
+    other = {"agent_id": "someone-else", "action": "file_read", "target": "t"}
+
+    resp = client.post(
+        "/api/v1/events/batch", json={"events": [good, other]}, headers=bearer_headers
+    )
+    assert resp.status_code == 403
+    resp = client.post(
+        "/api/v1/events/batch",
+        json={"events": [good, {"agent_id": agent_id, "target": "no action"}]},
+        headers=bearer_headers,
+    )
+    assert resp.status_code == 422
+    resp = client.post("/api/v1/events/batch", json={"events": []}, headers=bearer_headers)
+    assert resp.status_code == 422
+    assert client.get("/api/v1/events").json()["count"] == 0
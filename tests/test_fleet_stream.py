@@ -0,0 +1,192 @@
+"""Tests for the dashboard feeds: fleet snapshot, SSE stream and broadcast hub."""
+
+import asyncio
+import json
+
+from switchboard.v1 import routes, services
+from switchboard.v1.models import AgentEvent, AgentRegistration, AgentTelemetry
+from switchboard.v1.watch import FleetHub, fleet_hub
+
+
+def _parse(chunk: str) -> tuple[str, dict]:
+    lines = dict(line.split(": ", 1) for line in chunk.strip().splitlines())
+    return lines["event"], json.loads(lines["data"])
+
+
+def _drain(queue: asyncio.Queue) -> list[tuple[str, dict]]:
+    items = []
+    while not queue.empty():
+        items.append(queue.get_nowait())
+    return items
+
+
+def _seed(client, admin_headers):
+    tokens = {}
+    for agent_id in ("a1", "a2"):
+        resp = client.post(
+            "/api/v1/agents", json={"agent_id": agent_id}, headers=admin_headers
+        )
+        tokens[agent_id] = {"Authorization": f"Bearer {resp.json()['token']}"}
+    for i in range(6):
+        agent_id = "a1" if i % 2 else "a2"
+        client.post(
+            "/api/v1/events",
+            json={"agent_id": agent_id, "action": f"act_{i}", "target": "t"},
+            headers=tokens[agent_id],
+        )
+        client.post(
+            "/api/v1/telemetry",
+            json={"agent_id": agent_id, "network_rtt_ms": 10.0 + i},
+            headers=tokens[agent_id],
+        )
+
+
+def test_snapshot_matches_individual_endpoints(client, admin_headers):
+    _seed(client, admin_headers)
+
+    snap = client.get(
+        "/api/v1/fleet/snapshot", params={"events": 4, "telemetry": 5}
+    ).json()
+    assert snap["health"] == client.get("/api/v1/fleet/health").json()
+    assert snap["agents"] == client.get("/api/v1/fleet/status").json()["agents"]
+    assert snap["events"] == client.get("/api/v1/events?limit=4").json()["events"]
+    assert snap["telemetry"] == client.get("/api/v1/fleet/telemetry?limit=5").json()
+    assert snap["presets"] == client.get("/api/v1/policy/presets").json()["presets"]
+
+
+def test_snapshot_section_sizes_and_agent_scope(client, admin_headers):
+    _seed(client, admin_headers)
+
+    snap = client.get(
+        "/api/v1/fleet/snapshot",
+        params={"events": 0, "telemetry": 2, "telemetry_agent_id": "a1"},
+    ).json()
+    assert snap["events"] == []
+    assert snap["health"]["total"] == 2
+    timeline = snap["telemetry"]["telemetry"]
+    assert [row["network_rtt_ms"] for row in timeline] == [15.0, 13.0]
+    assert snap["telemetry"]["agent_id"] == "a1"
+
+    resp = client.get("/api/v1/fleet/snapshot", params={"telemetry": 501})
+    assert resp.status_code == 422
+
+
+def test_hub_overflow_resyncs_slow_subscriber():
+    async def scenario():
+        hub = FleetHub(max_queue=3)
+        queue = hub.subscribe()
+        for i in range(5):
+            hub.publish("event", {"i": i})
+        items = _drain(queue)
+        hub.unsubscribe(queue)
+        hub.publish("event", {"i": 99})  # no subscribers: dropped
+        return items, hub.active
+
+    items, active = asyncio.run(scenario())
+    # The fourth publish overflowed: backlog replaced by a resync marker
+    assert items == [("resync", None), ("event", {"i": 4})]
+    assert active is False
+
+
+def test_services_publish_only_changes():
+    async def scenario():
+        services.fleet_stream_snapshot()
+        queue = fleet_hub.subscribe()
+        try:
+            services.register_agent(AgentRegistration(agent_id="a1"))
+            registered = _drain(queue)
+
+            services.ingest_event(
+                AgentEvent(agent_id="a1", action="file_read", target="x")
+            )
+            ingested = _drain(queue)
+
+            services.ingest_telemetry(
+                AgentTelemetry(agent_id="a1", network_rtt_ms=12.0)
+            )
+            telemetry = _drain(queue)
+
+            services.list_agents()  # read-only: nothing published
+            quiet = _drain(queue)
+
+            services.deregister_agent("a1")
+            removed = _drain(queue)
+        finally:
+            fleet_hub.unsubscribe(queue)
+        return registered, ingested, telemetry, quiet, removed
+
+    registered, ingested, telemetry, quiet, removed = asyncio.run(scenario())
+
+    assert [kind for kind, _ in registered] == ["agent", "health"]
+    assert registered[1][1]["total"] == 1
+
+    kinds = [kind for kind, _ in ingested]
+    assert kinds == ["agent", "health", "event"]
+    assert ingested[0][1]["status"] == "active"
+    assert ingested[2][1]["action"] == "file_read"
+
+    # First assessment moves the agent from integrity_unknown to normal
+    assert [kind for kind, _ in telemetry] == ["agent", "health", "telemetry"]
+    assert telemetry[1][1]["integrity_normal"] == 1
+    assert telemetry[2][1]["network_rtt_ms"] == 12.0
+
+    assert quiet == []
+    assert removed[0] == ("agent_removed", {"agent_id": "a1"})
+
+
+def test_stream_opens_with_snapshot_then_pushes_updates(registered_agent):
+    agent_id, _ = registered_agent
+    services.ingest_event(AgentEvent(agent_id=agent_id, action="boot", target="t"))
+
+    async def scenario():
+        response = await routes.fleet_stream_endpoint(events=5)
+        body = response.body_iterator
+        try:
+            first = await anext(body)
+            services.ingest_event(
+                AgentEvent(agent_id=agent_id, action="file_write", target="t")
+            )
+            pushed = [await anext(body) for _ in range(2)]
+        finally:
+            await body.aclose()
+        return response, first, pushed
+
+    response, first, pushed = asyncio.run(scenario())
+    assert response.media_type == "text/event-stream"
+
+    kind, snapshot = _parse(first)
+    assert kind == "snapshot"
+    assert snapshot["health"]["total"] == 1
+    assert [a["agent_id"] for a in snapshot["agents"]] == [agent_id]
+    assert snapshot["events"][0]["action"] == "boot"
+    assert {p["name"] for p in snapshot["presets"]} == {"standard", "strict", "relaxed"}
+
+    # last_event moved, so the agent summary precedes the event itself
+    assert [_parse(chunk)[0] for chunk in pushed] == ["agent", "event"]
+    assert _parse(pushed[1])[1]["action"] == "file_write"
+    assert not fleet_hub.active
+
+
+def test_stream_keepalive_sweeps_timeouts(monkeypatch, registered_agent):
+    agent_id, _ = registered_agent
+    services.ingest_event(AgentEvent(agent_id=agent_id, action="boot", target="t"))
+    monkeypatch.setattr(routes, "_STREAM_KEEPALIVE_SECONDS", 0.01)
+    monkeypatch.setitem(services._fleet_published, "swept", 0.0)
+
+    async def scenario():
+        response = await routes.fleet_stream_endpoint(events=0)
+        body = response.body_iterator
+        try:
+            await anext(body)  # snapshot: agent is active
+            monkeypatch.setattr(services, "_HEARTBEAT_TIMEOUT", services.timedelta(0))
+            keepalive = await anext(body)
+            transition = await anext(body)
+        finally:
+            await body.aclose()
+        return keepalive, transition
+
+    keepalive, transition = asyncio.run(scenario())
+    assert keepalive.startswith(":")
+    kind, data = _parse(transition)
+    assert kind == "agent"
+    assert data["status"] == "inactive"
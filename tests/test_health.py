@@ -1,4 +1,4 @@
-"""Tests for app-level endpoints: /health, /dashboard, /docs/shared.css."""
+"""Tests for app-level endpoints: /health, /probe, /dashboard, /docs/shared.css."""
 
 
 def test_health(client):
@@ -7,6 +7,15 @@ def test_health(client):
     assert resp.json() == {"status": "healthy"}
 
 
+def test_probe_is_empty_and_uncached(client):
+    for method in ("GET", "HEAD"):
+        resp = client.request(method, "/probe", headers={"Accept-Encoding": "gzip"})
+        assert resp.status_code == 204
+        assert resp.content == b""
+        assert resp.headers["cache-control"] == "no-store"
+    assert client.post("/probe").status_code in (404, 405)
+
+
 def test_dashboard_returns_html(client):
     resp = client.get("/dashboard")
     assert resp.status_code == 200
@@ -0,0 +1,120 @@
+"""Tests for the Prometheus ``/metrics`` endpoint."""
+
+import asyncio
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from switchboard import metrics as metrics_module
+from switchboard.app import create_app
+from switchboard.metrics import Metrics
+
+
+def _sample(client, headers, series: str) -> float:
+    """Value of one series line in the scrape, 0 if absent."""
+    for line in client.get("/metrics", headers=headers).text.splitlines():
+        name, _, value = line.rpartition(" ")
+        if name == series:
+            return float(value)
+    return 0.0
+
+
+def test_metrics_require_the_admin_key(client, admin_headers):
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"X-Switchboard-Key": "wrong"}).status_code == 401
+    assert client.get("/metrics", headers=admin_headers).status_code == 200
+
+
+def test_requests_are_labelled_by_route_template(
+    client, admin_headers, registered_agent, bearer_headers
+):
+    agent_id, _ = registered_agent
+    series = (
+        'switchboard_http_requests_total{method="GET",'
+        'route="/api/v1/agents/{agent_id}/policy",status="200"}'
+    )
+    before = _sample(client, admin_headers, series)
+    client.get(f"/api/v1/agents/{agent_id}/policy", headers=bearer_headers)
+    client.get("/no/such/path")
+
+    resp = client.get("/metrics", headers=admin_headers)
+    assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert _sample(client, admin_headers, series) == before + 1
+    assert f"/api/v1/agents/{agent_id}" not in resp.text  # never the raw path
+    assert 'route="unmatched",status="404"' in resp.text
+    assert (
+        'switchboard_http_request_seconds_bucket{method="GET",'
+        'route="/api/v1/agents/{agent_id}/policy",le="+Inf"}'
+    ) in resp.text
+
+
+def test_ingest_and_store_metrics(client, admin_headers, registered_agent, bearer_headers):
+    agent_id, _ = registered_agent
+    events = 'switchboard_events_ingested_total{tier="L1"}'
+    telemetry = 'switchboard_telemetry_ingested_total{tier="L1"}'
+    writes = 'switchboard_store_write_seconds_count{store="events"}'
+    before = {s: _sample(client, admin_headers, s) for s in (events, telemetry, writes)}
+
+    client.post(
+        "/api/v1/events/batch",
+        json={"events": [{"agent_id": agent_id, "action": "file_read", "target": "/a"}] * 3},
+        headers=bearer_headers,
+    )
+    client.post(
+        "/api/v1/telemetry",
+        json={"agent_id": agent_id, "network_rtt_ms": 12.0},
+        headers=bearer_headers,
+    )
+
+    assert _sample(client, admin_headers, events) == before[events] + 3
+    assert _sample(client, admin_headers, telemetry) == before[telemetry] + 1
+    assert _sample(client, admin_headers, writes) == before[writes] + 1
+    assert _sample(client, admin_headers, 'switchboard_store_records{store="events"}') == 3
+    assert _sample(client, admin_headers, 'switchboard_store_records{store="agents"}') == 1
+    assert _sample(client, admin_headers, 'switchboard_store_bytes{store="events"}') > 0
+
+
+def test_lag_watcher_is_cancelled_on_shutdown(monkeypatch):
+    started, cancelled = threading.Event(), threading.Event()
+
+    async def watch():
+        started.set()
+        try:
+            await asyncio.sleep(3600)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    monkeypatch.setattr(metrics_module, "_watch_loop_lag", watch)
+    app = create_app()
+    # Checked while the app shuts down, before the loop itself is torn down
+    stopped_by_shutdown = []
+    app.router.on_shutdown.append(lambda: stopped_by_shutdown.append(cancelled.is_set()))
+    with TestClient(app) as client:
+        client.get("/health")
+        assert started.wait(5)
+        assert not cancelled.is_set()
+    assert stopped_by_shutdown == [True]
+
+
+def test_histogram_rendering():
+    registry = Metrics(buckets=(0.1, 1.0))
+    registry.describe("op_seconds", "histogram", "Operation time")
+    registry.observe("op_seconds", 0.05, op="a")
+    registry.observe("op_seconds", 0.5, op="a")
+    registry.observe("op_seconds", 5.0, op="a")
+    registry.describe("depth", "gauge", "Queue depth")
+    registry.callback("depth", lambda: 7)
+    registry.callback("depth", lambda: None, queue="idle")
+
+    lines = registry.render().splitlines()
+    assert 'op_seconds_bucket{op="a",le="0.1"} 1' in lines
+    assert 'op_seconds_bucket{op="a",le="1"} 2' in lines
+    assert 'op_seconds_bucket{op="a",le="+Inf"} 3' in lines
+    assert 'op_seconds_count{op="a"} 3' in lines
+    assert float(next(x for x in lines if x.startswith("op_seconds_sum")).split()[1]) == (
+        pytest.approx(5.55)
+    )
+    assert "depth 7" in lines
+    assert not any("idle" in line for line in lines)
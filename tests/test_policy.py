@@ -1,5 +1,8 @@
 """Tests for policy updates, presets, fleet-wide preset application."""
 
+import threading
+import time
+
 
 def test_update_policy_tier(client, admin_headers, registered_agent):
     agent_id, _ = registered_agent
@@ -173,3 +176,195 @@ def test_apply_preset_pin_observed_claims(client, admin_headers):
     assert "anthropic" in integrity["expected_providers"]
     assert "claude-3" in integrity["expected_models"]
     assert "us-east-1" in integrity["expected_regions"]
+
+
+def test_policy_fetch_sets_etag_and_honors_if_none_match(client, registered_agent, bearer_headers):
+    agent_id, _ = registered_agent
+    first = client.get(f"/api/v1/agents/{agent_id}/policy", headers=bearer_headers)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert etag.startswith('"v1-')
+    assert first.json()["version"] == 1
+
+    again = client.get(
+        f"/api/v1/agents/{agent_id}/policy",
+        headers={**bearer_headers, "If-None-Match": etag},
+    )
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["etag"] == etag
+
+
+def test_policy_etag_changes_with_version(client, admin_headers, registered_agent, bearer_headers):
+    agent_id, _ = registered_agent
+    etag = client.get(
+        f"/api/v1/agents/{agent_id}/policy", headers=bearer_headers
+    ).headers["etag"]
+
+    client.put(
+        f"/api/v1/agents/{agent_id}/policy",
+        json={"denied_actions": ["delete_records"]},
+        headers=admin_headers,
+    )
+    resp = client.get(
+        f"/api/v1/agents/{agent_id}/policy",
+        headers={**bearer_headers, "If-None-Match": etag},
+    )
+    assert resp.status_code == 200
+    assert resp.headers["etag"] != etag
+    assert resp.json()["denied_actions"] == ["delete_records"]
+
+
+def test_policy_etag_distinguishes_reregistered_agent(client, admin_headers, registered_agent, bearer_headers):
+    agent_id, _ = registered_agent
+    etag = client.get(
+        f"/api/v1/agents/{agent_id}/policy", headers=bearer_headers
+    ).headers["etag"]
+
+    client.delete(f"/api/v1/agents/{agent_id}", headers=admin_headers)
+    new_token = client.post(
+        "/api/v1/agents",
+        json={"agent_id": agent_id, "denied_actions": ["x"]},
+        headers=admin_headers,
+    ).json()["token"]
+    resp = client.get(
+        f"/api/v1/agents/{agent_id}/policy",
+        headers={"Authorization": f"Bearer {new_token}", "If-None-Match": etag},
+    )
+    assert resp.status_code == 200
+    assert resp.json()["denied_actions"] == ["x"]
+
+    stale = client.get(f"/api/v1/agents/{agent_id}/policy", headers=bearer_headers)
+    assert stale.status_code == 403
+
+
+def test_policy_long_poll_times_out_with_304(client, registered_agent, bearer_headers):
+    agent_id, _ = registered_agent
+    started = time.monotonic()
+    resp = client.get(
+        f"/api/v1/agents/{agent_id}/policy",
+        params={"wait": 1, "known_version": 1},
+        headers=bearer_headers,
+    )
+    assert resp.status_code == 304
+    assert time.monotonic() - started >= 0.9
+
+
+def test_policy_long_poll_wakes_on_change(client, admin_headers, registered_agent, bearer_headers):
+    agent_id, _ = registered_agent
+    result = {}
+
+    def poll():
+        started = time.monotonic()
+        resp = client.get(
+            f"/api/v1/agents/{agent_id}/policy",
+            params={"wait": 30, "known_version": 1},
+            headers=bearer_headers,
+        )
+        result["elapsed"] = time.monotonic() - started
+        result["resp"] = resp
+
+    waiter = threading.Thread(target=poll)
+    waiter.start()
+    time.sleep(0.3)
+    client.put(
+        f"/api/v1/agents/{agent_id}/policy",
+        json={"tier": "L2"},
+        headers=admin_headers,
+    )
+    waiter.join(timeout=10)
+
+    assert result["elapsed"] < 5
+    assert result["resp"].status_code == 200
+    assert result["resp"].json()["version"] == 2
+    assert result["resp"].json()["tier"] == "L2"
+
+
+def test_policy_long_poll_returns_immediately_when_stale(client, registered_agent, bearer_headers):
+    agent_id, _ = registered_agent
+    started = time.monotonic()
+    resp = client.get(
+        f"/api/v1/agents/{agent_id}/policy",
+        params={"wait": 30, "known_version": 0},
+        headers=bearer_headers,
+    )
+    assert resp.status_code == 200
+    assert resp.json()["version"] == 1
+    assert time.monotonic() - started < 5
+
+
+def test_bulk_policy_fetch(client, admin_headers, registered_agent, bearer_headers):
+    agent_id, token = registered_agent
+    other = client.post(
+        "/api/v1/agents", json={"agent_id": "other-agent"}, headers=admin_headers
+    ).json()
+    resp = client.post(
+        "/api/v1/policies",
+        json={
+            "agents": [
+                {"agent_id": agent_id, "token": token, "known_version": 1},
+                {"agent_id": "other-agent", "token": other["token"]},
+                {"agent_id": "other-agent-2", "token": token},
+            ]
+        },
+        headers=bearer_headers,
+    )
+    assert resp.status_code == 200
+    data = resp.json()
+    assert list(data["policies"]) == ["other-agent"]
+    assert data["policies"]["other-agent"]["version"] == 1
+    assert data["unchanged"] == [agent_id]
+    assert data["forbidden"] == ["other-agent-2"]
+
+
+def test_bulk_policy_fetch_requires_bearer(client, admin_headers, registered_agent):
+    agent_id, token = registered_agent
+    other = client.post(
+        "/api/v1/agents", json={"agent_id": "other-agent"}, headers=admin_headers
+    ).json()
+    fetch = {"agents": [{"agent_id": agent_id, "token": token}]}
+
+    assert client.post("/api/v1/policies", json=fetch).status_code == 401
+    for bearer in ("swb_sk_unknown", other["token"]):  # unknown, or not a listed agent's
+        resp = client.post(
+            "/api/v1/policies", json=fetch, headers={"Authorization": f"Bearer {bearer}"}
+        )
+        assert resp.status_code == 403
+
+
+def test_bulk_policy_long_poll_wakes_on_any_change(
+    client, admin_headers, registered_agent, bearer_headers
+):
+    agent_id, token = registered_agent
+    other = client.post(
+        "/api/v1/agents", json={"agent_id": "other-agent"}, headers=admin_headers
+    ).json()
+    result = {}
+
+    def poll():
+        started = time.monotonic()
+        result["resp"] = client.post(
+            "/api/v1/policies",
+            json={
+                "agents": [
+                    {"agent_id": agent_id, "token": token, "known_version": 1},
+                    {"agent_id": "other-agent", "token": other["token"], "known_version": 1},
+                ],
+                "wait": 30,
+            },
+            headers=bearer_headers,
+        )
+        result["elapsed"] = time.monotonic() - started
+
+    waiter = threading.Thread(target=poll)
+    waiter.start()
+    time.sleep(0.3)
+    client.put(
+        "/api/v1/agents/other-agent/policy", json={"tier": "L2"}, headers=admin_headers
+    )
+    waiter.join(timeout=10)
+
+    assert result["elapsed"] < 5
+    data = result["resp"].json()
+    assert data["policies"]["other-agent"]["tier"] == "L2"
+    assert data["unchanged"] == [agent_id]
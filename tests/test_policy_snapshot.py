@@ -0,0 +1,93 @@
+"""Tests for the memory-mapped policy snapshot and its reader."""
+
+import struct
+import types
+
+
+def _policy(version: int, **extra) -> dict:
+    return {"agent_id": "a1", "version": version, "denied_actions": [], **extra}
+
+
+def _sequence(snapshot) -> int:
+    return struct.unpack_from("<Q", snapshot._map, 8)[0]
+
+
+def test_in_place_update_is_seen_by_an_open_reader(sidecar, policy_snapshot, tmp_path):
+    path = tmp_path / "policy.snap"
+    snapshot = sidecar.PolicySnapshot(path)
+    snapshot.publish(_policy(1))
+    reader = policy_snapshot.PolicySnapshotReader(str(path))
+
+    assert reader.read() == _policy(1)
+    assert not reader.changed()
+    mapped = reader._map
+
+    snapshot.publish(_policy(2, denied_actions=["shell_exec"]))
+    assert reader.changed()
+    assert reader.read() == _policy(2, denied_actions=["shell_exec"])
+    assert reader.version == 2
+    assert reader._map is mapped  # same file, updated in place
+    assert _sequence(snapshot) % 2 == 0
+
+
+def test_outgrown_file_is_swapped_and_reopened(sidecar, policy_snapshot, tmp_path):
+    path = tmp_path / "policy.snap"
+    snapshot = sidecar.PolicySnapshot(path)
+    snapshot.publish(_policy(1))
+    reader = policy_snapshot.PolicySnapshotReader(str(path))
+    reader.read()
+    old_map, old_capacity = reader._map, snapshot._capacity
+
+    big = _policy(2, allowed_actions=[f"action_{i}" for i in range(1000)])
+    snapshot.publish(big)
+
+    assert snapshot._capacity > old_capacity
+    assert reader.changed()  # the stale flag comes with a final sequence bump
+    assert reader.read() == big
+    assert reader._map is not old_map
+    assert reader.version == 2
+    assert not reader.changed()
+
+
+def test_reader_retries_while_the_sequence_is_odd(sidecar, policy_snapshot, tmp_path, monkeypatch):
+    path = tmp_path / "policy.snap"
+    snapshot = sidecar.PolicySnapshot(path)
+    snapshot.publish(_policy(1))
+    reader = policy_snapshot.PolicySnapshotReader(str(path))
+    reader.read()
+
+    # Leave a write half done; the writer finishes it while the reader waits
+    seq = _sequence(snapshot)
+    struct.pack_into("<Q", snapshot._map, 8, seq + 1)
+    waits = []
+
+    def finish_write(seconds):
+        waits.append(seconds)
+        if len(waits) == 3:
+            body = b'{"version":2}'
+            snapshot._map[64:64 + len(body)] = body
+            struct.pack_into("<qI", snapshot._map, 16, 2, len(body))
+            struct.pack_into("<Q", snapshot._map, 8, seq + 2)
+
+    monkeypatch.setattr(policy_snapshot, "time", types.SimpleNamespace(sleep=finish_write))
+    assert reader.changed()
+    assert reader.read() == {"version": 2}
+    assert len(waits) == 3
+
+
+def test_restart_adopts_the_existing_file(sidecar, policy_snapshot, tmp_path):
+    path = tmp_path / "policy.snap"
+    first = sidecar.PolicySnapshot(path)
+    first.publish(_policy(1))
+    reader = policy_snapshot.PolicySnapshotReader(str(path))
+    reader.read()
+    mapped = reader._map
+    # The earlier run stopped mid-write
+    struct.pack_into("<Q", first._map, 8, _sequence(first) + 1)
+
+    restarted = sidecar.PolicySnapshot(path)
+    assert _sequence(restarted) % 2 == 0
+    restarted.publish(_policy(2))
+
+    assert reader.read() == _policy(2)
+    assert reader._map is mapped
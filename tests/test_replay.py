@@ -0,0 +1,119 @@
+"""Tests for action-policy replay over the stored event log."""
+
+import json
+
+from switchboard.v1 import services
+from switchboard.v1.models import AgentEvent, EventStore
+
+
+def _log(client, headers, agent_id, action, times=1):
+    for _ in range(times):
+        client.post(
+            "/api/v1/events",
+            json={"agent_id": agent_id, "action": action, "target": "t"},
+            headers=headers,
+        )
+
+
+def test_stream_reader_matches_full_load(monkeypatch):
+    monkeypatch.setattr(services, "_STREAM_CHUNK", 7)  # force many boundaries
+    store = EventStore()
+    for i in range(25):
+        store.events.append(
+            AgentEvent(agent_id="a1", action=f"act_{i}", target="t", detail="x]}\"{")
+        )
+    services._save_events(store)
+
+    streamed = list(services._iter_store_records(services._EVENTS_FILE, "events"))
+    expected = json.loads(services._EVENTS_FILE.read_text())["events"]
+    assert streamed == expected
+
+
+def test_stream_reader_missing_and_empty():
+    assert list(services._iter_store_records(services._EVENTS_FILE, "events")) == []
+    services._save_events(EventStore())
+    assert list(services._iter_store_records(services._EVENTS_FILE, "events")) == []
+
+
+def test_replay_reports_newly_denied(client, admin_headers, registered_agent, bearer_headers):
+    agent_id, _ = registered_agent
+    _log(client, bearer_headers, agent_id, "file_read", times=3)
+    _log(client, bearer_headers, agent_id, "file_write", times=2)
+    _log(client, bearer_headers, agent_id, "heartbeat")
+
+    resp = client.post(
+        "/api/v1/policy/replay",
+        json={"denied_actions": ["file_write"]},
+        headers=admin_headers,
+    )
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["summary"]["events_scanned"] == 6
+    assert data["summary"]["denied"] == 2
+    assert data["summary"]["newly_denied"] == 2
+    assert data["summary"]["agents_affected"] == 1
+
+    row = data["agents"][0]
+    assert row["agent_id"] == agent_id
+    assert row["actions"] == [
+        {
+            "action": "file_write",
+            "count": 2,
+            "reason": "denied_action",
+            "newly_denied": True,
+        }
+    ]
+
+
+def test_replay_allowlist_never_blocks_heartbeat(client, admin_headers, registered_agent, bearer_headers):
+    agent_id, _ = registered_agent
+    _log(client, bearer_headers, agent_id, "heartbeat", times=2)
+    _log(client, bearer_headers, agent_id, "api_call")
+
+    data = client.post(
+        "/api/v1/policy/replay",
+        json={"allowed_actions": ["file_read"]},
+        headers=admin_headers,
+    ).json()
+    actions = data["agents"][0]["actions"]
+    assert [a["action"] for a in actions] == ["api_call"]
+    assert actions[0]["reason"] == "not_in_allowed_actions"
+
+
+def test_replay_existing_denials_are_not_new(client, admin_headers, registered_agent, bearer_headers):
+    agent_id, _ = registered_agent
+    client.put(
+        f"/api/v1/agents/{agent_id}/policy",
+        json={"denied_actions": ["delete_records"]},
+        headers=admin_headers,
+    )
+    _log(client, bearer_headers, agent_id, "delete_records")
+
+    data = client.post(
+        "/api/v1/policy/replay", json={}, headers=admin_headers
+    ).json()
+    assert data["summary"]["denied"] == 1
+    assert data["summary"]["newly_denied"] == 0
+    assert data["agents"][0]["actions"][0]["newly_denied"] is False
+
+
+def test_replay_reports_missing_agents(client, admin_headers, registered_agent):
+    data = client.post(
+        "/api/v1/policy/replay",
+        json={"agent_ids": ["ghost"], "denied_actions": ["x"]},
+        headers=admin_headers,
+    ).json()
+    assert data["missing"] == ["ghost"]
+    assert data["agents"] == []
+
+
+def test_replay_unreadable_event_log_is_503(client, admin_headers, registered_agent, bearer_headers):
+    agent_id, _ = registered_agent
+    _log(client, bearer_headers, agent_id, "file_read")
+    services._EVENTS_FILE.write_text('{"events": [{"agent_id": "test-agent", "act')
+
+    resp = client.post(
+        "/api/v1/policy/replay", json={"denied_actions": ["file_read"]}, headers=admin_headers
+    )
+    assert resp.status_code == 503
+    assert resp.json()["detail"] == "Event log could not be read"
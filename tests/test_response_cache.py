@@ -0,0 +1,127 @@
+"""Tests for the generation-keyed response cache on public fleet endpoints."""
+
+import json
+import time
+
+import pytest
+
+from switchboard.v1 import services
+from switchboard.v1.cache import ResponseCache
+
+
+@pytest.fixture
+def agent_loads(monkeypatch):
+    """Count registry loads so cache hits are observable."""
+    calls = {"n": 0}
+    real = services._load_agents
+
+    def counting():
+        calls["n"] += 1
+        return real()
+
+    monkeypatch.setattr(services, "_load_agents", counting)
+    return calls
+
+
+def test_lru_evicts_oldest_within_byte_budget():
+    cache = ResponseCache(max_bytes=10)
+    cache.put(("a",), b"1234")
+    cache.put(("b",), b"1234")
+    assert cache.get(("a",)) == b"1234"  # a is now most recent
+    cache.put(("c",), b"1234")
+    assert cache.get(("b",)) is None
+    assert cache.get(("a",)) == b"1234"
+    cache.put(("huge",), b"x" * 11)  # larger than the whole budget
+    assert cache.get(("huge",)) is None
+    assert cache.stats()["bytes"] == 8
+    assert cache.stats()["evictions"] == 1
+
+
+def test_expired_entries_are_misses(monkeypatch):
+    cache = ResponseCache(max_bytes=100)
+    cache.put(("k",), b"v", expires_at=time.time() + 60)
+    assert cache.get(("k",)) == b"v"
+    monkeypatch.setattr(time, "time", lambda: 1e12)
+    assert cache.get(("k",)) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_repeat_polls_are_served_from_cache(client, registered_agent, agent_loads):
+    first = client.get("/api/v1/fleet/health")
+    loads = agent_loads["n"]
+    second = client.get("/api/v1/fleet/health")
+    assert second.content == first.content
+    assert agent_loads["n"] == loads
+    assert second.json()["total"] == 1
+
+
+def test_ingest_invalidates(client, registered_agent, bearer_headers):
+    agent_id, _ = registered_agent
+    before = client.get("/api/v1/fleet/status").json()["agents"][0]
+    assert before["status"] == "inactive"
+
+    client.post(
+        "/api/v1/events",
+        json={"agent_id": agent_id, "action": "heartbeat", "target": "sidecar"},
+        headers=bearer_headers,
+    )
+    after = client.get("/api/v1/fleet/status").json()["agents"][0]
+    assert after["status"] == "active"
+
+    timeline = client.get("/api/v1/fleet/telemetry").json()
+    assert timeline["count"] == 0
+    client.post(
+        "/api/v1/telemetry",
+        json={"agent_id": agent_id, "network_rtt_ms": 5.0},
+        headers=bearer_headers,
+    )
+    assert client.get("/api/v1/fleet/telemetry").json()["count"] == 1
+
+
+def test_policy_change_invalidates(client, admin_headers, registered_agent):
+    agent_id, _ = registered_agent
+    assert client.get("/api/v1/fleet/status").json()["agents"][0]["tier"] == "L1"
+    client.put(
+        f"/api/v1/agents/{agent_id}/policy",
+        json={"tier": "L3"},
+        headers=admin_headers,
+    )
+    assert client.get("/api/v1/fleet/status").json()["agents"][0]["tier"] == "L3"
+
+
+def test_foreign_edit_invalidates(client, registered_agent):
+    client.get("/api/v1/fleet/status")
+    data = json.loads(services._AGENTS_FILE.read_text())
+    data["agents"]["test-agent"]["display_name"] = "Edited By Hand Elsewhere"
+    services._AGENTS_FILE.write_text(json.dumps(data))
+
+    agents = client.get("/api/v1/fleet/status").json()["agents"]
+    assert agents[0]["display_name"] == "Edited By Hand Elsewhere"
+
+
+def test_status_entries_expire_at_heartbeat_timeout(
+    client, monkeypatch, registered_agent, bearer_headers, agent_loads
+):
+    agent_id, _ = registered_agent
+    client.post(
+        "/api/v1/events",
+        json={"agent_id": agent_id, "action": "heartbeat", "target": "sidecar"},
+        headers=bearer_headers,
+    )
+    client.get("/api/v1/fleet/health")
+    loads = agent_loads["n"]
+
+    deadline = time.time() + services._HEARTBEAT_TIMEOUT.total_seconds()
+    monkeypatch.setattr(time, "time", lambda: deadline + 1)
+    client.get("/api/v1/fleet/health")
+    assert agent_loads["n"] > loads
+
+
+def test_polling_status_does_not_rewrite_registry(client, registered_agent):
+    client.get("/api/v1/fleet/status")  # persists the initial refresh, if any
+    stamp = services._AGENTS_FILE.stat().st_mtime_ns
+    generation = services._generations["agents"]
+    services._response_cache.clear()
+    client.get("/api/v1/fleet/status")
+    assert services._AGENTS_FILE.stat().st_mtime_ns == stamp
+    assert services._generations["agents"] == generation
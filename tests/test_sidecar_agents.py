@@ -0,0 +1,57 @@
+"""Tests for host-daemon agent files."""
+
+import json
+import types
+
+
+def test_load_agents_skips_unsafe_ids(sidecar, tmp_path):
+    agents_dir = tmp_path / "agents"
+    agents_dir.mkdir()
+    files = {
+        "ci-runner_1.json": {"sidecar_token": "t1"},
+        "named.json": {"agent_id": "build.v2", "sidecar_token": "t2"},
+        "escape.json": {"agent_id": "../../etc", "sidecar_token": "t3"},
+        "dots.json": {"agent_id": "..", "sidecar_token": "t4"},
+        "dot.json": {"agent_id": ".", "sidecar_token": "t5"},
+        "slash.json": {"agent_id": "a/b", "sidecar_token": "t6"},
+        "space.json": {"agent_id": "a b", "sidecar_token": "t7"},
+    }
+    for name, body in files.items():
+        (agents_dir / name).write_text(json.dumps(body))
+    config = {"agents_dir": str(agents_dir), "policy_path": str(tmp_path / "policy.json")}
+
+    agents = sidecar.load_agents(config)
+
+    assert sorted(a["agent_id"] for a in agents) == ["build.v2", "ci-runner_1"]
+    by_id = {a["agent_id"]: a for a in agents}
+    assert by_id["build.v2"]["policy_path"] == str(tmp_path / "build.v2" / "policy.json")
+
+
+def test_bulk_pull_sends_a_token_switchboard_still_accepts(sidecar, monkeypatch):
+    bearers = []
+    replies = [
+        (200, {}, b'{"policies": {}, "unchanged": ["a2"], "forbidden": ["a1"]}'),
+        (403, {}, b'{"detail": "Token not valid for any listed agent"}'),
+        (200, {}, b'{"policies": {}, "unchanged": ["a1", "a2"], "forbidden": []}'),
+    ]
+
+    def fake_open(config, method, path, body, headers=None, **kwargs):
+        bearers.append(headers["Authorization"])
+        return replies.pop(0)
+
+    monkeypatch.setattr(sidecar, "_switchboard_open", fake_open)
+    agents = [
+        types.SimpleNamespace(
+            agent_id=agent_id,
+            config={"sidecar_token": f"t-{agent_id}"},
+            decider=sidecar.PolicyDecider(),
+            token_refused=False,
+        )
+        for agent_id in ("a1", "a2")
+    ]
+
+    assert sidecar.pull_policies({}, agents) == (200, 0)  # a1's token listed as forbidden
+    assert sidecar.pull_policies({}, agents) == (403, 0)  # so a2's is sent, and refused
+    assert sidecar.pull_policies({}, agents) == (200, 0)  # none left: back to the first
+    assert bearers == ["Bearer t-a1", "Bearer t-a2", "Bearer t-a1"]
+    assert not any(agent.token_refused for agent in agents)
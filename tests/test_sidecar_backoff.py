@@ -0,0 +1,78 @@
+"""Tests for the sidecar's circuit breaker and jittered backoff."""
+
+import pytest
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def breaker(sidecar, monkeypatch):
+    clock = _Clock()
+    # Pause for the whole ceiling, so each delay is known
+    monkeypatch.setattr(sidecar.random, "uniform", lambda low, high: high)
+    breaker = sidecar.CircuitBreaker(cap=60.0, clock=clock)
+    return breaker, clock
+
+
+def test_opens_after_threshold_failures(sidecar, breaker):
+    breaker, clock = breaker
+    for _ in range(sidecar._BREAKER_THRESHOLD - 1):
+        breaker.failure()
+        assert breaker.allow()
+        assert not breaker.opened_since_success()
+
+    breaker.failure()
+    assert not breaker.allow()
+    assert breaker.opened_since_success()
+    clock.now += 1.99
+    assert not breaker.allow()
+
+
+def test_half_open_trial_reopens_or_closes(sidecar, breaker):
+    breaker, clock = breaker
+    for _ in range(sidecar._BREAKER_THRESHOLD):
+        breaker.failure()
+    clock.now += 1.99  # the first pause is 2 s
+    assert not breaker.allow()
+    clock.now += 0.01
+    assert breaker.allow()  # half-open: a trial call may go through
+
+    # A failed trial reopens at once, for twice as long
+    breaker.failure()
+    assert not breaker.allow()
+    clock.now += 3.99
+    assert not breaker.allow()
+    clock.now += 0.01
+    assert breaker.allow()
+
+    # A successful trial closes the circuit and resets the count
+    breaker.success()
+    assert breaker.allow()
+    assert not breaker.opened_since_success()
+    breaker.failure()
+    assert breaker.allow()
+
+
+def test_backoff_full_jitter_bounds(sidecar):
+    backoff = sidecar.Backoff(base=1.0, cap=10.0)
+    for attempt in range(40):
+        ceiling = min(10.0, 2.0 ** attempt)
+        assert 0 <= backoff.next() <= ceiling
+    assert backoff.attempts == 40
+
+    backoff.reset()
+    assert backoff.next() <= 1.0
+
+
+def test_backoff_ceiling_doubles_up_to_cap(sidecar, monkeypatch):
+    monkeypatch.setattr(sidecar.random, "uniform", lambda low, high: (low, high))
+    backoff = sidecar.Backoff(base=0.5, cap=5.0)
+    assert [backoff.next() for _ in range(6)] == [
+        (0, 0.5), (0, 1.0), (0, 2.0), (0, 4.0), (0, 5.0), (0, 5.0),
+    ]
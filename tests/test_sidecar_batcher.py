@@ -0,0 +1,108 @@
+"""Tests for the sidecar's event batching and forwarding."""
+
+import threading
+import time
+
+OK = (202, {}, b"{}")
+
+
+def _events(start: int, count: int) -> list[dict]:
+    return [
+        {"agent_id": "a1", "action": "file_read", "target": f"/e/{i}"}
+        for i in range(start, start + count)
+    ]
+
+
+def _batcher(sidecar, monkeypatch, answer, spool=None, **config):
+    """An EventBatcher whose upstream replies with ``answer(path, body)``."""
+    calls = []
+
+    def fake_open(config, method, path, body, use_token=False, **kwargs):
+        reply = answer(path, body)
+        calls.append((path, body, reply))
+        return reply
+
+    monkeypatch.setattr(sidecar, "_switchboard_open", fake_open)
+    settings = {
+        "event_queue_size": 100,
+        "event_batch_size": 10,
+        "event_linger_ms": 0,
+        "backoff_max": 0.05,
+        **config,
+    }
+    return sidecar.EventBatcher(settings, spool), calls
+
+
+def _delivered(calls) -> list[str]:
+    return [e["target"] for _, body, reply in calls if reply is OK for e in body["events"]]
+
+
+def _wait_for(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_batches_fill_to_size(sidecar, monkeypatch):
+    batcher, _ = _batcher(
+        sidecar, monkeypatch, lambda *_: OK, event_batch_size=3, event_linger_ms=200
+    )
+    for event in _events(0, 7):
+        batcher.submit(event)
+
+    started = time.monotonic()
+    assert [len(batcher._next_batch()) for _ in range(2)] == [3, 3]
+    assert time.monotonic() - started < 0.15  # full batches do not linger
+    assert len(batcher._next_batch()) == 1
+    assert time.monotonic() - started >= 0.15  # a short one waits out the linger
+
+
+def test_linger_gathers_late_events(sidecar, monkeypatch):
+    batcher, _ = _batcher(sidecar, monkeypatch, lambda *_: OK, event_linger_ms=300)
+    batcher.submit(_events(0, 1)[0])
+    threading.Timer(0.05, batcher.submit, args=(_events(1, 1)[0],)).start()
+
+    assert [e["target"] for e in batcher._next_batch()] == ["/e/0", "/e/1"]
+
+
+def test_invalid_batch_falls_back_to_single_events(sidecar, monkeypatch):
+    replies = iter([(422, {}, b"{}"), OK, (400, {}, b"{}"), OK])
+    batcher, calls = _batcher(sidecar, monkeypatch, lambda *_: next(replies))
+
+    assert batcher.send(_events(0, 3)) is True
+    assert [path for path, _, _ in calls] == [
+        "/api/v1/events/batch", "/api/v1/events", "/api/v1/events", "/api/v1/events",
+    ]
+    assert [body["target"] for _, body, _ in calls[1:]] == ["/e/0", "/e/1", "/e/2"]
+    assert batcher.batch_endpoint is True  # the next batch is tried whole again
+
+
+def test_events_stay_in_order_across_an_outage(sidecar, monkeypatch, tmp_path):
+    down = threading.Event()
+    down.set()
+
+    def answer(path, body):
+        return None if down.is_set() else OK
+
+    spool = sidecar.EventSpool(tmp_path, max_bytes=1 << 20)
+    batcher, calls = _batcher(sidecar, monkeypatch, answer, spool=spool, event_batch_size=2)
+    batcher.start()
+    try:
+        for event in _events(0, 3):
+            batcher.submit(event)
+        _wait_for(lambda: spool.pending >= 2)
+        # Queued behind the backlog, so they go to disk after it
+        for event in _events(3, 3):
+            batcher.submit(event)
+        _wait_for(lambda: spool.pending == 6)
+
+        down.clear()
+        _wait_for(lambda: spool.pending == 0)
+        # Once drained, new events are forwarded directly again
+        batcher.submit(_events(6, 1)[0])
+        _wait_for(lambda: "/e/6" in _delivered(calls))
+    finally:
+        batcher.close()
+
+    assert _delivered(calls) == [f"/e/{i}" for i in range(7)]
@@ -0,0 +1,47 @@
+"""Tests for the sidecar's check-in loop."""
+
+import types
+
+import pytest
+
+
+class _OneRound:
+    """A stop event that lets ``checkin_loop`` run a single round."""
+
+    def __init__(self):
+        self.waits = 0
+
+    def is_set(self) -> bool:
+        return self.waits > 1
+
+    def wait(self, timeout=None) -> bool:
+        self.waits += 1
+        return self.waits > 1
+
+
+@pytest.mark.parametrize("reply, rescheduled", [({"ok": True}, True), (None, False)])
+def test_fallback_reschedules_telemetry_only_when_posted(sidecar, monkeypatch, reply, rescheduled):
+    posts = []
+
+    def request(config, method, path, body=None, use_token=False):
+        posts.append(path)
+        return reply
+
+    monkeypatch.setattr(sidecar, "_checkin", lambda config, telemetry: (404, None))
+    monkeypatch.setattr(sidecar, "_send_heartbeat", lambda config: None)
+    monkeypatch.setattr(sidecar, "probe_switchboard", lambda config: {})
+    monkeypatch.setattr(sidecar, "_telemetry_sample", lambda config, probe: {"agent_id": "a1"})
+    monkeypatch.setattr(sidecar, "switchboard_request", request)
+    monkeypatch.setattr(sidecar, "refresh_policy", lambda agent: None)
+    agent = types.SimpleNamespace(
+        config={"agent_id": "a1"},
+        decider=sidecar.PolicyDecider(),
+        batcher=types.SimpleNamespace(last_delivered=0.0),
+        next_telemetry=0.0,
+    )
+    config = {"heartbeat_interval": 30, "telemetry_interval": 60, "policy_wait": 0}
+
+    sidecar.checkin_loop(config, _OneRound(), [agent])
+
+    assert posts == ["/api/v1/telemetry"]
+    assert (agent.next_telemetry > 0) is rescheduled
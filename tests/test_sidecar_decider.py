@@ -0,0 +1,45 @@
+"""Tests for the sidecar's local policy decisions."""
+
+
+def _decider(sidecar, **policy):
+    decider = sidecar.PolicyDecider()
+    decider.update({"version": 1, **policy})
+    return decider
+
+
+def test_no_policy_denies_all_but_heartbeat(sidecar):
+    decider = sidecar.PolicyDecider()
+    assert decider.check("file_read") == {
+        "action": "file_read", "allowed": False, "reason": "no_policy",
+    }
+    assert decider.check("heartbeat")["allowed"] is True
+
+
+def test_allowed_and_denied_actions(sidecar):
+    decider = _decider(
+        sidecar, allowed_actions=["file_read", "file_write"], denied_actions=["file_write"]
+    )
+    assert decider.check("file_read") == {"action": "file_read", "allowed": True, "reason": None}
+    assert decider.check("file_write")["reason"] == "denied_action"
+    assert decider.check("shell_exec")["reason"] == "not_in_allowed_actions"
+    assert decider.check("heartbeat")["allowed"] is True
+
+
+def test_empty_allowed_actions_allows_anything_not_denied(sidecar):
+    decider = _decider(sidecar, allowed_actions=[], denied_actions=["shell_exec"])
+    assert decider.check("file_read")["allowed"] is True
+    assert decider.check("shell_exec")["reason"] == "denied_action"
+
+
+def test_rate_limits(sidecar):
+    decider = _decider(
+        sidecar, rate_limits={"events_per_minute": 3, "external_api_calls_per_minute": 1}
+    )
+    decider.record("api_call")
+    assert decider.check("file_read")["allowed"] is True
+    assert decider.check("api_call")["reason"] == "external_api_calls_per_minute"
+
+    decider.record("file_read")
+    decider.record("file_read")
+    assert decider.check("file_read")["reason"] == "events_per_minute"
+    assert decider.check("heartbeat")["allowed"] is True
@@ -0,0 +1,153 @@
+"""Tests for the Claude Code hook: the relay script and the sidecar's mapping."""
+
+import importlib.util
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+_HOOK = Path(__file__).resolve().parent.parent / "examples" / "hooks" / "claude-code-hook.py"
+SESSION = "0123456789abcdef"
+
+
+@pytest.fixture(scope="module")
+def hook():
+    """examples/hooks/claude-code-hook.py as a module."""
+    spec = importlib.util.spec_from_file_location("claude_code_hook", _HOOK)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def handler(sidecar):
+    """An EventHandler serving agent ``a1``, whose batcher only queues."""
+    batcher = sidecar.EventBatcher(
+        {"event_queue_size": 100, "event_batch_size": 10, "event_linger_ms": 0}
+    )
+    agent = SimpleNamespace(agent_id="a1", batcher=batcher, decider=sidecar.PolicyDecider())
+    return type("Handler", (sidecar.EventHandler,), {"agents": {"a1": agent}})
+
+
+def _payload(name: str, tool: str | None = None, **tool_input) -> dict:
+    payload = {"hook_event_name": name, "session_id": SESSION, "cwd": "/repo"}
+    if tool is not None:
+        payload["tool_name"] = tool
+        payload["tool_input"] = tool_input
+    return payload
+
+
+@pytest.mark.parametrize(
+    ("payload", "expected"),
+    [
+        (
+            _payload("PreToolUse", "Bash", command="pytest -q"),
+            ("Bash", "pytest -q", "pending", "session:0123456789ab cwd:/repo"),
+        ),
+        (
+            _payload("PreToolUse", "Read", file_path="/repo/app.py"),
+            ("Read", "/repo/app.py", "pending", "session:0123456789ab cwd:/repo"),
+        ),
+        (
+            _payload("PreToolUse", "Grep", pattern="TODO", path="src"),
+            ("Grep", "grep:TODO in src", "pending", "session:0123456789ab cwd:/repo"),
+        ),
+        (
+            _payload("PreToolUse", "NotebookEdit", notebook_path="/n.ipynb", cell="1"),
+            ("NotebookEdit", "cell", "pending", "session:0123456789ab cwd:/repo"),
+        ),
+        (
+            _payload("PreToolUse", "Bash"),
+            ("Bash", "-", "pending", "session:0123456789ab cwd:/repo"),
+        ),
+        (
+            _payload("PostToolUse", "Edit", file_path="/repo/app.py"),
+            ("Edit", "/repo/app.py", "success", "session:0123456789ab"),
+        ),
+        (
+            _payload("PostToolUseFailure", "Bash", command="make"),
+            ("Bash", "make", "failure", "session:0123456789ab"),
+        ),
+        (
+            _payload("Stop"),
+            ("turn_complete", "session:0123456789ab", "success", "cwd:/repo"),
+        ),
+        (
+            _payload("SessionStart"),
+            ("session_start", "a1", "success", "cwd:/repo"),
+        ),
+        (
+            _payload("SessionEnd"),
+            ("session_end", "a1", "success", "session:0123456789ab"),
+        ),
+        (
+            {**_payload("PreToolUse", "Bash"), "tool_input": "not a dict"},
+            ("Bash", "-", "pending", "session:0123456789ab cwd:/repo"),
+        ),
+        (_payload("Notification"), None),
+    ],
+    ids=lambda value: value["hook_event_name"] if isinstance(value, dict) else None,
+)
+def test_hook_event_mapping(sidecar, payload, expected):
+    event = sidecar.hook_event(payload, "a1")
+    if expected is None:
+        assert event is None
+        return
+    action, target, result, detail = expected
+    assert event == {
+        "agent_id": "a1",
+        "action": action,
+        "target": target,
+        "result": result,
+        "detail": detail,
+    }
+
+
+def test_hook_payload_is_mapped_before_it_is_queued(handler):
+    status, reply = handler._enqueue(_payload("Stop"), "")
+    assert (status, reply) == (202, {"ok": True, "queued": True})
+    event = handler.agents["a1"].batcher.queue.get_nowait()
+    assert event["action"] == "turn_complete"
+    assert event["agent_id"] == "a1"
+    assert "hook_event_name" not in event
+
+
+def test_unreported_hook_is_acknowledged_not_queued(handler):
+    status, reply = handler._enqueue(_payload("Notification"), "")
+    assert (status, reply) == (200, {"ok": True, "queued": False})
+    assert handler.agents["a1"].batcher.depth() == 0
+
+
+def test_other_events_pass_through_unchanged(handler):
+    event = {"action": "file_read", "target": "/a", "result": "success", "extra": [1]}
+    status, _ = handler._enqueue(dict(event), "")
+    assert status == 202
+    queued = handler.agents["a1"].batcher.queue.get_nowait()
+    assert queued.pop("timestamp")
+    assert queued == {**event, "agent_id": "a1"}
+
+
+def test_event_line_appends_the_agent(hook, monkeypatch):
+    monkeypatch.setattr(hook, "AGENT_ID", 'dev "box"')
+    payload = json.dumps({**_payload("Stop"), "agent_id": "other"}, indent=2).encode()
+    line = hook.event_line(payload + b"\n")
+    assert line.endswith(b"}\n")
+    assert line.count(b"\n") == 1
+    # The appended key comes last, so it wins over the payload's own
+    assert json.loads(line)["agent_id"] == 'dev "box"'
+    assert json.loads(line)["hook_event_name"] == "Stop"
+
+
+@pytest.mark.parametrize(
+    "payload", [b"", b"not json", b'{"event": "Stop"}', b'["hook_event_name"]']
+)
+def test_event_line_skips_other_payloads(hook, payload):
+    assert hook.event_line(payload) is None
+
+
+def test_event_line_is_mapped_by_the_sidecar(hook, sidecar):
+    line = hook.event_line(json.dumps(_payload("PreToolUse", "Read", file_path="/x")).encode())
+    event = sidecar.hook_event(json.loads(line), json.loads(line)["agent_id"])
+    assert event["agent_id"] == hook.AGENT_ID
+    assert (event["action"], event["target"]) == ("Read", "/x")
@@ -0,0 +1,84 @@
+"""Tests for the sidecar's local listener and its bounded worker pool."""
+
+import socket
+import threading
+import time
+
+import pytest
+
+
+@pytest.fixture
+def listener(sidecar):
+    """Start a one-worker TCP listener; yields ``start(handler_timeout)``."""
+    servers = []
+
+    def start(timeout: float = 2.0):
+        handler = type("Handler", (sidecar.EventHandler,), {"timeout": timeout})
+        server = sidecar.ListenerServer(("127.0.0.1", 0), handler, workers=1)
+        threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def _connect(server) -> socket.socket:
+    return socket.create_connection(server.server_address, timeout=5)
+
+
+def _wait_for(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def _get(sock: socket.socket, path: str) -> bytes:
+    sock.sendall(f"GET {path} HTTP/1.0\r\n\r\n".encode())
+    chunks = []
+    while chunk := sock.recv(65536):
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def test_full_pool_answers_503_at_once(listener):
+    server = listener(timeout=2.0)
+    busy = threading.Event()
+    finish_request = server.finish_request
+
+    def serve(request, client_address):
+        busy.set()
+        finish_request(request, client_address)
+
+    server.finish_request = serve
+    idle = [_connect(server)]  # holds the only worker
+    assert busy.wait(5)
+    for _ in range(server.backlog.maxsize):
+        idle.append(_connect(server))
+    _wait_for(server.backlog.full)
+
+    started = time.monotonic()
+    with _connect(server) as sock:
+        reply = sock.recv(65536)
+    assert time.monotonic() - started < 0.5  # not after the idle timeout
+    assert reply.startswith(b"HTTP/1.0 503 ")
+    assert b"Retry-After: 1" in reply
+    assert b'"Listener busy"' in reply
+    for sock in idle:
+        sock.close()
+
+
+def test_idle_connection_releases_its_worker(listener):
+    server = listener(timeout=0.2)
+    idle = _connect(server)  # sends nothing
+
+    started = time.monotonic()
+    with _connect(server) as sock:
+        reply = _get(sock, "/metrics")
+    assert reply.startswith(b"HTTP/1.0 200 ")
+    assert 0.1 < time.monotonic() - started < 1.5
+    assert idle.recv(1) == b""  # the listener hung up on it
+    idle.close()
@@ -0,0 +1,75 @@
+"""Tests for the sidecar's Prometheus metrics."""
+
+import http.client
+import threading
+
+import pytest
+
+
+def test_counter_and_histogram_text(sidecar):
+    registry = sidecar.Metrics(buckets=(0.01, 0.1))
+    registry.describe("reqs_total", "counter", "Requests by path")
+    registry.describe("req_seconds", "histogram", "Request time")
+    registry.inc("reqs_total", path="/events")
+    registry.inc("reqs_total", 2, path="/events")
+    registry.inc("reqs_total", path="/check")
+    for seconds in (0.005, 0.05, 0.5):
+        registry.observe("req_seconds", seconds, path="/events")
+
+    lines = registry.render().splitlines()
+    assert lines[:2] == ["# HELP reqs_total Requests by path", "# TYPE reqs_total counter"]
+    assert 'reqs_total{path="/events"} 3' in lines
+    assert 'reqs_total{path="/check"} 1' in lines
+    assert "# TYPE req_seconds histogram" in lines
+    assert [line for line in lines if line.startswith("req_seconds")] == [
+        'req_seconds_bucket{path="/events",le="0.01"} 1',
+        'req_seconds_bucket{path="/events",le="0.1"} 2',
+        'req_seconds_bucket{path="/events",le="+Inf"} 3',
+        'req_seconds_sum{path="/events"} 0.555',
+        'req_seconds_count{path="/events"} 3',
+    ]
+
+
+def test_label_values_are_escaped(sidecar):
+    registry = sidecar.Metrics()
+    registry.describe("odd_total", "counter", "Odd labels")
+    registry.inc("odd_total", agent_id='a"b\\c\nd', z="1")
+    assert 'odd_total{agent_id="a\\"b\\\\c\\nd",z="1"} 1' in registry.render().splitlines()
+
+
+def test_gauges_are_read_at_scrape_time(sidecar):
+    registry = sidecar.Metrics()
+    registry.describe("depth", "gauge", "Queue depth")
+    depth = [3]
+    registry.callback("depth", lambda: depth[0])
+    registry.callback("depth", lambda: None, queue="unused")
+    assert "depth 3" in registry.render().splitlines()
+    depth[0] = 0
+    lines = registry.render().splitlines()
+    assert "depth 0" in lines
+    assert not any("unused" in line for line in lines)
+
+
+@pytest.fixture
+def listener(sidecar):
+    server = sidecar.ListenerServer(("127.0.0.1", 0), sidecar.EventHandler, workers=1)
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_listener_serves_the_registry(sidecar, listener):
+    sidecar.metrics.inc("switchboard_sidecar_checks_total", result="allowed")
+    conn = http.client.HTTPConnection("127.0.0.1", listener.server_port, timeout=5)
+    conn.request("GET", "/metrics")
+    resp = conn.getresponse()
+    text = resp.read().decode()
+    conn.close()
+
+    assert resp.status == 200
+    assert resp.getheader("Content-Type") == "text/plain; version=0.0.4; charset=utf-8"
+    assert "# TYPE switchboard_sidecar_upstream_requests_total counter" in text
+    assert "# TYPE switchboard_sidecar_upstream_request_seconds histogram" in text
+    assert 'switchboard_sidecar_checks_total{result="allowed"}' in text
+    assert text.endswith("\n")
@@ -0,0 +1,88 @@
+"""Tests for the sidecar's keep-alive connection pool."""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    timeout = 0.2  # close connections idle this long, like a keep-alive window
+
+    def _serve(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        self.rfile.read(length)
+        seen = self.server.seen
+        seen.append((self.command, self.path, self.client_address[1]))
+        drop = self.path == "/drop" or (
+            self.path == "/drop-once" and [s[1] for s in seen].count("/drop-once") == 1
+        )
+        if drop:
+            self.close_connection = True  # acted on, but never answered
+            return
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    do_GET = do_POST = _serve
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def upstream():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.seen = []
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def pool(sidecar, upstream):
+    pool = sidecar.ConnectionPool(f"http://127.0.0.1:{upstream.server_port}", size=2)
+    yield pool
+    pool.close()
+
+
+def _ports(upstream) -> set[int]:
+    return {port for _, _, port in upstream.seen}
+
+
+def test_requests_reuse_one_connection(pool, upstream):
+    for _ in range(3):
+        assert pool.request("GET", "/ok", None, {}, 5)[0] == 200
+    assert pool.request("POST", "/ok", b"{}", {"Content-Length": "2"}, 5)[0] == 200
+    assert len(upstream.seen) == 4
+    assert len(_ports(upstream)) == 1
+
+
+def test_connection_closed_while_idle_is_replaced_before_sending(pool, upstream):
+    pool.request("GET", "/ok", None, {}, 5)
+    time.sleep(0.5)  # the server closes the idle connection
+
+    assert pool.request("POST", "/ok", b"{}", {"Content-Length": "2"}, 5)[0] == 200
+    assert [m for m, _, _ in upstream.seen] == ["GET", "POST"]
+    assert len(_ports(upstream)) == 2
+
+
+def test_post_dropped_after_sending_is_not_resent(pool, upstream):
+    pool.request("GET", "/ok", None, {}, 5)
+
+    with pytest.raises(OSError):
+        pool.request("POST", "/drop", b"{}", {"Content-Length": "2"}, 5)
+    assert [(m, p) for m, p, _ in upstream.seen] == [("GET", "/ok"), ("POST", "/drop")]
+
+
+def test_get_dropped_on_a_reused_connection_is_retried_once(pool, upstream):
+    pool.request("GET", "/ok", None, {}, 5)
+
+    assert pool.request("GET", "/drop-once", None, {}, 5)[0] == 200
+    assert [p for _, p, _ in upstream.seen] == ["/ok", "/drop-once", "/drop-once"]
+    assert len(_ports(upstream)) == 2
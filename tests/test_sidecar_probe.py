@@ -0,0 +1,112 @@
+"""Tests for the sidecar's RTT probe."""
+
+import socket
+import types
+
+import pytest
+
+
+class _Pool:
+    """Stands in for ConnectionPool: ``ping`` answers from ``replies`` by path."""
+
+    def __init__(self, replies):
+        self.replies = replies
+        self.paths = []
+        self.failures = 0
+        self.breaker = types.SimpleNamespace(allow=lambda: True, failure=self._fail)
+
+    def _fail(self):
+        self.failures += 1
+
+    def ping(self, path, count):
+        self.paths.append(path)
+        reply = self.replies[path]
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+
+@pytest.fixture
+def probe(sidecar, monkeypatch):
+    def run(replies, pings=5):
+        pool = _Pool(replies)
+        monkeypatch.setattr(sidecar, "_switchboard_pool", lambda config: pool)
+        config = {"probe_pings": pings, "switchboard_url": "http://switchboard"}
+        return sidecar.probe_switchboard(config), pool
+
+    return run
+
+
+def test_median_min_and_jitter(probe):
+    rtts = [10.0, 14.0, 11.0, 30.0, 12.0]
+    result, pool = probe({"/probe": (3.5, [(200, rtt) for rtt in rtts])})
+
+    assert pool.paths == ["/probe"]
+    assert result == {
+        "network_rtt_ms": 12.0,
+        "network_rtt_min_ms": 10.0,
+        # mean |difference| of consecutive pings: (4 + 3 + 19 + 18) / 4
+        "network_jitter_ms": 11.0,
+        "network_connect_ms": 3.5,
+    }
+
+
+def test_failed_pings_are_left_out_and_one_ping_has_no_jitter(probe):
+    result, _ = probe({"/probe": (None, [(503, 1.0), (200, 8.0), (500, 2.0)])})
+    assert result["network_rtt_ms"] == result["network_rtt_min_ms"] == 8.0
+    assert result["network_jitter_ms"] == 0.0
+    assert result["network_connect_ms"] is None  # a pooled connection was reused
+
+
+def test_falls_back_to_health_without_a_probe_endpoint(probe):
+    result, pool = probe({"/probe": (None, [(404, 1.0)]), "/health": (None, [(200, 6.0)])})
+    assert pool.paths == ["/probe", "/health"]
+    assert result["network_rtt_ms"] == 6.0
+
+
+def test_unreachable_reports_nothing(probe):
+    result, pool = probe({"/probe": ConnectionRefusedError()})
+    assert set(result.values()) == {None}
+    assert pool.failures == 1
+
+
+def test_ping_keeps_connection_setup_out_of_the_rtt(sidecar, monkeypatch):
+    clock = types.SimpleNamespace(now=0.0)
+    # A real, quiet socket, so the pool sees an idle connection as still open
+    ours, theirs = socket.socketpair()
+
+    class Connection:
+        """Fake HTTP connection: connecting takes 40 ms, each ping 5 ms more than the last."""
+
+        def __init__(self, host, port):
+            self.sock = None
+            self.pings = 0
+
+        def connect(self):
+            clock.now += 0.040
+            self.sock = ours
+
+        def request(self, method, path):
+            self.pings += 1
+            clock.now += 0.005 * self.pings
+
+        def getresponse(self):
+            return types.SimpleNamespace(status=200, will_close=False, read=lambda: b"")
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr(sidecar, "perf_counter", lambda: clock.now)
+    pool = sidecar.ConnectionPool("http://switchboard")
+    pool._connection_class = Connection
+
+    connect_ms, samples = pool.ping("/probe", 3)
+    assert connect_ms == pytest.approx(40.0)
+    assert [status for status, _ in samples] == [200, 200, 200]
+    assert [rtt for _, rtt in samples] == pytest.approx([5.0, 10.0, 15.0])
+
+    # The next probe reuses the pooled connection: no setup time
+    connect_ms, _ = pool.ping("/probe", 1)
+    assert connect_ms is None
+    ours.close()
+    theirs.close()
@@ -0,0 +1,142 @@
+"""Tests for the sidecar's on-disk event spool and replay."""
+
+import pytest
+
+
+def _events(start: int, count: int) -> list[dict]:
+    return [
+        {"agent_id": "a1", "action": "file_read", "target": f"/e/{i}"}
+        for i in range(start, start + count)
+    ]
+
+
+def _targets(entries) -> list[str]:
+    return [event["target"] for event, _ in entries]
+
+
+def test_append_peek_commit(sidecar, tmp_path):
+    spool = sidecar.EventSpool(tmp_path, max_bytes=1 << 20)
+    spool.append(_events(0, 3))
+    assert spool.pending == 3
+
+    first = spool.peek(2)
+    assert _targets(first) == ["/e/0", "/e/1"]
+    assert _targets(spool.peek(2)) == ["/e/0", "/e/1"]  # peeking does not consume
+    spool.commit(first)
+    assert spool.pending == 1
+    assert _targets(spool.peek(10)) == ["/e/2"]
+
+    spool.commit(spool.peek(10))
+    assert spool.stats() == {"pending": 0, "bytes": 0, "spooled": 3, "replayed": 3, "dropped": 0}
+    assert list(tmp_path.glob("*.ndjson")) == []  # drained spools start over
+
+
+def test_restart_resumes_from_cursor(sidecar, tmp_path):
+    spool = sidecar.EventSpool(tmp_path, max_bytes=1 << 20)
+    spool.append(_events(0, 5))
+    spool.commit(spool.peek(2))
+    spool._writer.close()
+
+    reopened = sidecar.EventSpool(tmp_path, max_bytes=1 << 20)
+    assert (tmp_path / "cursor").read_text().split()[0] == "1"
+    assert reopened.pending == 3
+    assert _targets(reopened.peek(10)) == ["/e/2", "/e/3", "/e/4"]
+
+    # A torn final write from a crash is not replayed
+    with open(next(tmp_path.glob("*.ndjson")), "ab") as fh:
+        fh.write(b'{"agent_id": "a1", "act')
+    assert sidecar.EventSpool(tmp_path, max_bytes=1 << 20).pending == 3
+
+
+def test_cap_drops_oldest_segment(sidecar, tmp_path):
+    # Each event is ~60 bytes; segments rotate past 128 bytes; cap is two segments
+    spool = sidecar.EventSpool(tmp_path, max_bytes=0, segment_bytes=128)
+    for i in range(20):
+        spool.append(_events(i, 1))
+
+    assert spool.size() <= spool.max_bytes
+    dropped = spool.counters["dropped"]
+    assert dropped > 0
+    assert spool.pending == 20 - dropped
+    # What survives is the newest events, still in order
+    assert _targets(spool.peek(100)) == [f"/e/{i}" for i in range(dropped, 20)]
+
+
+def _batcher(sidecar, tmp_path, monkeypatch, responses):
+    """An EventBatcher over a spool whose upstream answers from ``responses``."""
+    sent = []
+
+    def fake_open(config, method, path, body, use_token=False, **kwargs):
+        answer = responses.pop(0) if responses else (202, {}, b"{}")
+        if answer is not None:
+            sent.append(body)
+        return answer
+
+    monkeypatch.setattr(sidecar, "_switchboard_open", fake_open)
+    config = {
+        "event_queue_size": 100,
+        "event_batch_size": 10,
+        "event_linger_ms": 0,
+        "backoff_max": 1,
+    }
+    batcher = sidecar.EventBatcher(config, sidecar.EventSpool(tmp_path, max_bytes=1 << 20))
+    return batcher, sent
+
+
+def test_partial_replay_stops_at_first_failed_send(sidecar, tmp_path, monkeypatch):
+    ok = (202, {}, b"{}")
+    # Batch refused as invalid, so events go singly: two land, then an outage
+    batcher, sent = _batcher(sidecar, tmp_path, monkeypatch, [(422, {}, b"{}"), ok, ok, None])
+    batcher.spool.append(_events(0, 5))
+
+    assert batcher._replay() is False
+    assert [e["target"] for e in sent[1:]] == ["/e/0", "/e/1"]
+    assert batcher.spool.pending == 3
+    assert _targets(batcher.spool.peek(10)) == ["/e/2", "/e/3", "/e/4"]
+
+    # Recovery resumes at the first unsent event, in order
+    sent.clear()
+    assert batcher._replay() is True
+    assert [e["target"] for e in sent[0]["events"]] == ["/e/2", "/e/3", "/e/4"]
+    assert batcher.spool.pending == 0
+    assert batcher.spool.counters["replayed"] == 5
+
+
+def test_failed_batch_replay_keeps_everything(sidecar, tmp_path, monkeypatch):
+    batcher, _ = _batcher(sidecar, tmp_path, monkeypatch, [None])
+    batcher.spool.append(_events(0, 4))
+
+    assert batcher._replay() is False
+    assert batcher.spool.pending == 4
+    assert _targets(batcher.spool.peek(10))[0] == "/e/0"
+
+
+def test_unparseable_lines_are_committed_as_dropped(sidecar, tmp_path, monkeypatch):
+    batcher, sent = _batcher(sidecar, tmp_path, monkeypatch, [])
+    batcher.spool.append(_events(0, 1))
+    batcher.spool._writer.write(b"not json\n")
+    batcher.spool._writer.flush()
+    batcher.spool.pending += 1
+    batcher.spool.append(_events(1, 1))
+
+    assert batcher._replay() is True
+    assert [e["target"] for e in sent[0]["events"]] == ["/e/0", "/e/1"]
+    assert batcher.spool.counters == {"spooled": 2, "replayed": 2, "dropped": 1}
+
+
+@pytest.mark.parametrize("status", [401, 403])
+def test_rejected_token_keeps_the_batch(sidecar, tmp_path, monkeypatch, status):
+    batcher, _ = _batcher(sidecar, tmp_path, monkeypatch, [(status, {}, b"{}")])
+    batcher.spool.append(_events(0, 3))
+
+    assert batcher._replay() is False
+    assert batcher.spool.pending == 3
+    assert batcher.spool.counters["dropped"] == 0
+
+
+def test_invalid_batch_is_refused_not_retried(sidecar, tmp_path, monkeypatch):
+    batcher, _ = _batcher(sidecar, tmp_path, monkeypatch, [(400, {}, b"{}")])
+    batcher.spool.append(_events(0, 3))
+
+    assert batcher._replay() is True
+    assert batcher.spool.pending == 0
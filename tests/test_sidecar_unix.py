@@ -0,0 +1,136 @@
+"""Tests for the sidecar's Unix socket listener and its NDJSON mode."""
+
+import json
+import socket
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+
+@pytest.fixture
+def agent(sidecar):
+    """A hosted agent whose batcher queues events without forwarding them."""
+    batcher = sidecar.EventBatcher(
+        {"event_queue_size": 100, "event_batch_size": 10, "event_linger_ms": 0}
+    )
+    return SimpleNamespace(agent_id="a1", batcher=batcher, decider=sidecar.PolicyDecider())
+
+
+@pytest.fixture
+def listener(sidecar, agent, tmp_path):
+    """Start a one-worker listener on ``tmp_path``; yields ``start()``."""
+    handler = type("Handler", (sidecar.EventHandler,), {"agents": {"a1": agent}})
+    path = str(tmp_path / "sidecar.sock")
+    servers = []
+
+    def start():
+        server = sidecar.UnixListenerServer(path, handler, workers=1)
+        threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def _connect(server) -> socket.socket:
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(5)
+    sock.connect(server.server_address)
+    return sock
+
+
+def _replies(sock: socket.socket, count: int) -> list[dict]:
+    data = b""
+    while data.count(b"\n") < count:
+        chunk = sock.recv(65536)
+        assert chunk, f"closed after {data!r}"
+        data += chunk
+    return [json.loads(line) for line in data.splitlines()]
+
+
+def test_one_reply_line_per_request_line(listener, agent):
+    server = listener()
+    with _connect(server) as sock:
+        # Several lines in one write, then one split across writes
+        sock.sendall(b'{"action": "file_read", "target": "/a"}\n\n'
+                     b'{"action": "file_read", "target": "/b"}\n{"action": "sh')
+        time.sleep(0.05)
+        sock.sendall(b'ell", "target": "ls"}\n')
+        assert _replies(sock, 3) == [{"ok": True, "queued": True}] * 3
+
+    events = [agent.batcher.queue.get_nowait() for _ in range(agent.batcher.depth())]
+    assert [e["target"] for e in events] == ["/a", "/b", "ls"]
+    assert {e["agent_id"] for e in events} == {"a1"}
+
+
+def test_malformed_lines_are_answered_and_the_connection_kept(listener, agent):
+    server = listener()
+    with _connect(server) as sock:
+        sock.sendall(b'{"action": \n[1, 2]\n{"action": "file_read"}\n')
+        error = {"ok": False, "error": "Event must be a JSON object"}
+        assert _replies(sock, 3) == [error, error, {"ok": True, "queued": True}]
+    assert agent.batcher.depth() == 1
+
+
+def test_last_line_is_answered_after_the_agent_stops_sending(listener):
+    server = listener()
+    with _connect(server) as sock:
+        sock.sendall(b'{"action": "file_read"}')  # no trailing newline
+        sock.shutdown(socket.SHUT_WR)
+        assert _replies(sock, 1) == [{"ok": True, "queued": True}]
+        assert sock.recv(1) == b""
+
+
+def test_socket_is_removed_and_rebound_on_restart(listener, tmp_path):
+    path = tmp_path / "sidecar.sock"
+    server = listener()
+    assert path.is_socket()
+    server.shutdown()
+    server.server_close()
+    assert not path.exists()
+
+    # A crashed run leaves its socket file behind
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(str(path))
+    stale.close()
+    assert path.is_socket()
+
+    server = listener()
+    with _connect(server) as sock:
+        sock.sendall(b'{"action": "file_read"}\n')
+        assert _replies(sock, 1) == [{"ok": True, "queued": True}]
+
+
+def test_open_connections_do_not_hold_workers(listener):
+    server = listener()
+    held = [_connect(server) for _ in range(4)]
+    for sock in held:
+        sock.sendall(b'{"action": "file_read"}\n')
+        assert _replies(sock, 1) == [{"ok": True, "queued": True}]
+
+    # All four stay open while the only worker serves HTTP
+    started = time.monotonic()
+    with _connect(server) as sock:
+        sock.sendall(b"GET /health HTTP/1.0\r\n\r\n")
+        assert sock.recv(65536).startswith(b"HTTP/1.0 ")
+    assert time.monotonic() - started < 1.0
+    for sock in held:
+        sock.sendall(b'{"action": "file_read"}\n')
+        assert _replies(sock, 1) == [{"ok": True, "queued": True}]
+        sock.close()
+
+
+def test_idle_connection_is_closed(listener):
+    server = listener()
+    server.ndjson.idle_timeout = 0.2
+    with _connect(server) as sock:
+        sock.sendall(b'{"action": "file_read"}\n')
+        assert _replies(sock, 1) == [{"ok": True, "queued": True}]
+        started = time.monotonic()
+        assert sock.recv(1) == b""
+        assert time.monotonic() - started < 2
@@ -0,0 +1,146 @@
+"""Tests for the vectorized integrity-policy what-if simulator."""
+
+import random
+
+import pytest
+
+from switchboard.v1 import simulation
+from switchboard.v1.models import (
+    AgentPolicy,
+    AgentTelemetry,
+    IntegrityPolicy,
+)
+from switchboard.v1.services import _assess_integrity
+
+pytestmark = pytest.mark.skipif(
+    not simulation.available(), reason="numpy not installed"
+)
+
+
+def _random_policy(rng: random.Random) -> IntegrityPolicy:
+    return IntegrityPolicy(
+        expected_providers=rng.choice([[], ["anthropic"], ["anthropic", "openai"]]),
+        expected_models=rng.choice([[], ["claude-3"]]),
+        expected_regions=rng.choice([[], ["us-east-1"], ["eu-west-1"]]),
+        max_network_rtt_ms=rng.choice([None, 50.0, 120.0]),
+        max_network_jitter_ms=rng.choice([None, 10.0, 30.0]),
+        allow_remote_session=rng.random() < 0.3,
+    )
+
+
+def _random_telemetry(rng: random.Random, agent_id: str) -> AgentTelemetry:
+    return AgentTelemetry(
+        agent_id=agent_id,
+        is_remote_session=rng.random() < 0.2,
+        network_rtt_ms=rng.choice([None, 5.0, 60.0, 100.0, 240.0, 300.0]),
+        network_jitter_ms=rng.choice([None, 1.0, 15.0, 20.0, 45.0]),
+        observed_provider=rng.choice([None, "", " anthropic ", "openai", "other"]),
+        observed_model=rng.choice([None, "claude-3", "gpt-4"]),
+        observed_region=rng.choice([None, "us-east-1", "eu-west-1"]),
+        sensor_hid_rtt_ms=rng.choice([None, None, 30.0]),
+    )
+
+
+def test_vectorized_scores_match_scalar_assessor():
+    rng = random.Random(7)
+    agent_ids = [f"a{i}" for i in range(6)]
+    policies = [_random_policy(rng) for _ in agent_ids]
+    samples = [_random_telemetry(rng, rng.choice(agent_ids)) for _ in range(2_000)]
+
+    index = {agent_id: i for i, agent_id in enumerate(agent_ids)}
+    columns = simulation.telemetry_columns(samples, index)
+    scores, status = simulation.score_columns(columns, policies)
+
+    for i, sample in enumerate(samples):
+        policy = AgentPolicy(
+            agent_id=sample.agent_id, integrity=policies[index[sample.agent_id]]
+        )
+        expected = _assess_integrity(policy, sample)
+        assert scores[i] == expected.score
+        assert simulation.STATUS_ORDER[status[i]] == expected.status
+
+
+def test_unregistered_samples_are_skipped():
+    samples = [
+        AgentTelemetry(agent_id="a1", network_rtt_ms=5.0),
+        AgentTelemetry(agent_id="ghost", network_rtt_ms=5.0),
+    ]
+    columns = simulation.telemetry_columns(samples, {"a1": 0})
+    assert columns["agent"].tolist() == [0]
+
+
+def test_latest_index_tracks_most_recent_sample():
+    columns = simulation.telemetry_columns(
+        [
+            AgentTelemetry(agent_id="a", network_rtt_ms=1.0),
+            AgentTelemetry(agent_id="b", network_rtt_ms=1.0),
+            AgentTelemetry(agent_id="a", network_rtt_ms=1.0),
+        ],
+        {"a": 0, "b": 1, "c": 2},
+    )
+    assert simulation.latest_index(columns["agent"], 3).tolist() == [2, 1, -1]
+
+
+def _send(client, token, agent_id, **fields):
+    client.post(
+        "/api/v1/telemetry",
+        json={"agent_id": agent_id, **fields},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+
+def test_simulate_preset_reports_flips(client, admin_headers, registered_agent):
+    agent_id, token = registered_agent
+    for rtt in (20.0, 90.0, 150.0):
+        _send(client, token, agent_id, network_rtt_ms=rtt, network_jitter_ms=1.0)
+
+    resp = client.post(
+        "/api/v1/policy/simulate",
+        json={"preset": "strict"},
+        headers=admin_headers,
+    )
+    assert resp.status_code == 200
+    data = resp.json()
+    summary = data["summary"]
+    assert summary["samples"] == 3
+    # No thresholds today → all normal. Strict (70ms): 90ms costs 20 points
+    # (still normal), 150ms is >2x and costs 35 (elevated).
+    assert summary["current"]["normal"] == 3
+    assert summary["candidate"] == {
+        "normal": 2, "elevated": 1, "degraded": 0, "unknown": 0
+    }
+    assert summary["samples_flipped_to_alert"] == 1
+    assert summary["agents_flipped_to_alert"] == 1
+
+    row = data["agents"][0]
+    assert row["agent_id"] == agent_id
+    assert row["latest_status"] == {"current": "normal", "candidate": "elevated"}
+
+
+def test_simulate_does_not_modify_policy(client, admin_headers, registered_agent):
+    agent_id, token = registered_agent
+    _send(client, token, agent_id, network_rtt_ms=500.0)
+
+    resp = client.post(
+        "/api/v1/policy/simulate",
+        json={"integrity": {"max_network_rtt_ms": 100.0}},
+        headers=admin_headers,
+    )
+    data = resp.json()
+    assert data["summary"]["agents_flipped_to_alert"] == 1
+    assert data["agents"][0]["latest_status"]["candidate"] == "elevated"
+
+    agent = client.get(f"/api/v1/agents/{agent_id}", headers=admin_headers).json()
+    assert agent["policy"]["version"] == 1
+    assert agent["policy"]["integrity"]["max_network_rtt_ms"] is None
+
+
+def test_simulate_requires_exactly_one_candidate(client, admin_headers):
+    resp = client.post("/api/v1/policy/simulate", json={}, headers=admin_headers)
+    assert resp.status_code == 400
+    assert "exactly one" in resp.json()["detail"]
+
+
+def test_simulate_requires_admin(client, admin_key):
+    resp = client.post("/api/v1/policy/simulate", json={"preset": "strict"})
+    assert resp.status_code == 401
@@ -110,3 +110,114 @@ def test_missing_file_returns_empty():
     assert services._load_agents().agents == {}
     assert services._load_events().events == []
     assert services._load_telemetry().telemetry == []
+
+
+def _full_agent_store() -> AgentStore:
+    from switchboard.v1.models import (
+        AgentPolicy,
+        AgentRecord,
+        IntegrityAssessment,
+        IntegrityPolicy,
+        IntegrityStatus,
+        TelemetryMode,
+        TelemetryProbeSource,
+    )
+
+    store = AgentStore()
+    store.agents["a1"] = AgentRecord(
+        agent_id="a1",
+        display_name="Agent One",
+        policy=AgentPolicy(
+            agent_id="a1",
+            tier="L2",
+            denied_actions=["rm"],
+            integrity=IntegrityPolicy(expected_providers=["anthropic"]),
+        ),
+        integrity=IntegrityAssessment(status=IntegrityStatus.elevated, reasons=["x"]),
+        last_probe_source=TelemetryProbeSource.sensor,
+        last_telemetry_mode=TelemetryMode.sidecar_plus_sensor,
+        last_network_rtt_ms=12.5,
+        token="swb_sk_test",
+    )
+    store.agents["a2"] = AgentRecord(
+        agent_id="a2", display_name="Two", policy=AgentPolicy(agent_id="a2")
+    )
+    return store
+
+
+def test_trusted_load_matches_validated_load():
+    """Our own files skip validation but produce identical models."""
+    store = _full_agent_store()
+    services._save_agents(store)
+    raw = services._AGENTS_FILE.read_bytes()
+    assert raw.startswith(b'{"schema_version": 1, "schema": "')
+
+    loaded = services._load_agents()
+    validated = AgentStore.model_validate_json(raw)
+    assert loaded == validated == store
+    assert loaded.model_dump_json() == store.model_dump_json()
+    record = loaded.agents["a1"]
+    assert record.policy.tier.value == "L2"
+    assert record.last_probe_source.value == "sensor"
+
+    # Trusted models stay ordinary, mutable pydantic models
+    record.display_name = "Renamed"
+    services._save_agents(loaded)
+    assert services._load_agents().agents["a1"].display_name == "Renamed"
+
+
+def test_trusted_models_do_not_share_fields_set():
+    services._save_agents(_full_agent_store())
+    agents = services._load_agents().agents
+    one, two = agents["a1"], agents["a2"]
+
+    assert one.model_fields_set is not two.model_fields_set
+    one.model_fields_set.discard("display_name")
+    assert "display_name" in two.model_fields_set
+    one.policy.model_fields_set.discard("tier")
+    assert "tier" in two.policy.model_fields_set
+
+
+def test_trusted_load_falls_back_to_model_construct(monkeypatch):
+    """An unexpected pydantic slot layout still loads, through model_construct."""
+    store = _full_agent_store()
+    services._save_agents(store)
+    monkeypatch.setattr(services.trusted, "_slot_setters", None)
+
+    loaded = services._load_agents()
+    assert loaded == store
+    assert loaded.agents["a1"].policy.tier.value == "L2"
+
+
+def test_foreign_edit_is_validated(caplog):
+    """A body that no longer matches its checksum goes through validation."""
+    store = EventStore()
+    store.events.append(AgentEvent(agent_id="a1", action="read", target="/tmp"))
+    services._save_events(store)
+
+    raw = services._EVENTS_FILE.read_bytes()
+    services._EVENTS_FILE.write_bytes(raw.replace(b'"success"', b'"bogus"'))
+    assert services._load_events().events == []  # invalid result rejected
+    assert "modified outside Switchboard" in caplog.text
+
+    services._EVENTS_FILE.write_bytes(raw.replace(b'"/tmp"', b'"/var"'))
+    assert services._load_events().events[0].target == "/var"
+
+
+def test_other_schema_or_legacy_files_are_validated(monkeypatch):
+    store = TelemetryStore()
+    store.telemetry.append(AgentTelemetry(agent_id="a1", network_rtt_ms=4.0))
+    services._save_telemetry(store)
+
+    # Written under a different model layout: not trusted
+    constructed = []
+    monkeypatch.setattr(
+        services.trusted, "construct", lambda *a: constructed.append(a)
+    )
+    monkeypatch.setattr(services.trusted, "fingerprint", lambda cls: "0" * 16)
+    assert services._load_telemetry().telemetry[0].network_rtt_ms == 4.0
+    assert constructed == []
+
+    # Pre-header files still load
+    services._TELEMETRY_FILE.write_text(store.model_dump_json(), encoding="utf-8")
+    assert services._load_telemetry().telemetry[0].network_rtt_ms == 4.0
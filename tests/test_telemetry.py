@@ -42,6 +42,32 @@ def test_telemetry_updates_agent_record(client, admin_headers, registered_agent,
     assert data["last_network_rtt_ms"] == 3.0
 
 
+def test_probe_breakdown_is_reported(client, admin_headers, registered_agent, bearer_headers):
+    agent_id, _ = registered_agent
+    for connect_ms in (None, 30.0):
+        client.post(
+            "/api/v1/telemetry",
+            json={
+                "agent_id": agent_id,
+                "network_rtt_ms": 3.0,
+                "network_rtt_min_ms": 2.5,
+                "network_connect_ms": connect_ms,
+            },
+            headers=bearer_headers,
+        )
+
+    agent = client.get(f"/api/v1/agents/{agent_id}", headers=admin_headers).json()
+    assert agent["last_network_rtt_min_ms"] == 2.5
+    assert agent["last_network_connect_ms"] == 30.0
+    listed = client.get("/api/v1/agents", headers=admin_headers).json()["agents"][0]
+    assert listed["last_network_rtt_min_ms"] == 2.5
+
+    metrics = client.get("/api/v1/fleet/telemetry").json()["summary"]["metrics"]
+    assert metrics["network_rtt_min_ms"]["latest"] == 2.5
+    assert metrics["network_connect_ms"]["max"] == 30.0
+    assert metrics["network_connect_ms"]["mean"] == 30.0  # samples without a reconnect are skipped
+
+
 def test_telemetry_high_rtt_lowers_score(client, admin_headers, registered_agent, bearer_headers):
     agent_id, _ = registered_agent
     # Set a policy with RTT limit
@@ -138,3 +164,50 @@ def test_ingest_telemetry_unknown_agent_404(client, bearer_headers):
     )
     # Token won't match nonexistent agent
     assert resp.status_code == 403
+
+
+def test_checkin_records_liveness_and_telemetry(client, admin_headers, registered_agent, bearer_headers):
+    agent_id, _ = registered_agent
+    resp = client.post(
+        "/api/v1/checkin",
+        json={
+            "agent_id": agent_id,
+            "telemetry": {"agent_id": agent_id, "network_rtt_ms": 4.0},
+        },
+        headers=bearer_headers,
+    )
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["status"] == "active"
+    assert data["integrity_status"] == "normal"
+    etag = client.get(f"/api/v1/agents/{agent_id}/policy", headers=bearer_headers).headers["etag"]
+    assert (data["policy_version"], data["policy_etag"]) == (1, etag)
+
+    agent = client.get(f"/api/v1/agents/{agent_id}", headers=admin_headers).json()
+    assert agent["last_heartbeat"] is not None
+    assert agent["last_network_rtt_ms"] == 4.0
+    assert client.get("/api/v1/fleet/telemetry").json()["count"] == 1
+    # Liveness only: nothing is added to the audit log
+    assert client.get("/api/v1/events").json()["count"] == 0
+
+    client.put(
+        f"/api/v1/agents/{agent_id}/policy",
+        json={"denied_actions": ["bash"]},
+        headers=admin_headers,
+    )
+    bare = client.post("/api/v1/checkin", json={"agent_id": agent_id}, headers=bearer_headers)
+    assert bare.json()["policy_version"] == 2
+    assert "integrity_status" not in bare.json()
+    assert client.get("/api/v1/fleet/telemetry").json()["count"] == 1
+
+
+def test_checkin_rejects_foreign_telemetry(client, registered_agent, bearer_headers):
+    agent_id, _ = registered_agent
+    resp = client.post(
+        "/api/v1/checkin",
+        json={"agent_id": agent_id, "telemetry": {"agent_id": "someone-else"}},
+        headers=bearer_headers,
+    )
+    assert resp.status_code == 400
+    resp = client.post("/api/v1/checkin", json={"agent_id": "nobody"}, headers=bearer_headers)
+    assert resp.status_code == 403